@@ -1,10 +1,11 @@
 import pandas as pd
 import numpy as np
 from sklearn.feature_selection import f_classif
+from dataset import load_dataset
 
 # Load dataset
 def load_data(filepath: str) -> pd.DataFrame:
-    df = pd.read_csv(filepath)
+    df = load_dataset(filepath)
     df['Hazardous'] = df['Hazardous'].astype(int)
     return df
 
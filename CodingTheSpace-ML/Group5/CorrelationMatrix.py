@@ -1,15 +1,9 @@
 import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
-
-# Read your cleaned data
-df = pd.read_csv('cleaned_nasa_data1.csv')
-
-# Check Hazardous Distribution
-print(df['Hazardous'].value_counts())
-
-# Convert 'Hazardous' to binary numeric for correlation (if not already 0/1)
-df['Hazardous_numeric'] = df['Hazardous'].apply(lambda x: 1 if x == 1 else 0)
+from dataset import load_dataset
+import plotting
+from correlation import accumulate
 
 # Select numeric columns including the newly mapped ones
 numeric_cols = [
@@ -30,13 +24,30 @@ numeric_cols = [
     'Hazardous_numeric'
 ]
 
-# Drop NA values for numeric analysis
-df_clean = df[numeric_cols].dropna()
+def correlation_figure(df: pd.DataFrame) -> plt.Figure:
+    # Convert 'Hazardous' to binary numeric for correlation (if not already 0/1)
+    df = df.assign(Hazardous_numeric=(df['Hazardous'] == 1).astype(int))
+
+    # Drop NA values for numeric analysis
+    df_clean = df[numeric_cols].dropna()
+
+    # Correlation Matrix, accumulated over row chunks
+    corr = accumulate(df_clean).matrix()
+
+    fig = plt.figure(figsize=(14, 12))
+    sns.heatmap(corr, annot=True, cmap='coolwarm', fmt=".2f")
+    plt.title('Correlation Matrix Including Hazardous')
+    plt.tight_layout()
+    return fig
+
+def main():
+    # Read your cleaned data
+    df = load_dataset('cleaned_nasa_data1.csv')
+
+    # Check Hazardous Distribution
+    print(df['Hazardous'].value_counts())
 
-# Correlation Matrix
-corr = df_clean.corr()
+    plotting.show(correlation_figure(df), "correlation_matrix")
 
-plt.figure(figsize=(14, 12))
-sns.heatmap(corr, annot=True, cmap='coolwarm', fmt=".2f")
-plt.title('Correlation Matrix Including Hazardous')
-plt.show()
+if __name__ == "__main__":
+    main()
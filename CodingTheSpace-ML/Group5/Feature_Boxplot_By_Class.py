@@ -1,23 +1,34 @@
 import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
+from dataset import load_dataset
+import plotting
 
 # Load the dataset
 def load_data(filepath: str) -> pd.DataFrame:
-    return pd.read_csv(filepath)
+    return load_dataset(filepath)
+
+# Box plot of one feature by class
+def boxplot_figure(df: pd.DataFrame, feature: str, target_col: str = 'Hazardous') -> plt.Figure:
+    fig, ax = plt.subplots(figsize=(8, 5))
+    if len(df) > plotting.BOX_MAX_POINTS:
+        # Exact quartiles and whiskers, but only a sample of the fliers is drawn
+        plotting.boxplot_by_class(ax, df, feature, target_col)
+    else:
+        sns.boxplot(x=target_col, y=feature, data=df, palette='Set2', ax=ax)
+    plt.title(f'Box Plot of {feature} by {target_col} Status')
+    plt.xlabel(f'{target_col} (0 = No, 1 = Yes)')
+    plt.ylabel(feature)
+    plt.grid(True)
+    plt.tight_layout()
+    return fig
 
 # Plot boxplots for specified features 
 def plot_boxplots(df: pd.DataFrame, features: list, target_col: str = 'Hazardous') -> None:
     sns.set(style="whitegrid")
     for feature in features:
-        plt.figure(figsize=(8, 5))
-        sns.boxplot(x=target_col, y=feature, data=df, palette='Set2')
-        plt.title(f'Box Plot of {feature} by {target_col} Status')
-        plt.xlabel(f'{target_col} (0 = No, 1 = Yes)')
-        plt.ylabel(feature)
-        plt.grid(True)
-        plt.tight_layout()
-        plt.show()
+        fig = boxplot_figure(df, feature, target_col)
+        plotting.show(fig, f"boxplot_{feature}")
 
 def main():
     filepath = "cleaned_nasa_data1.csv"
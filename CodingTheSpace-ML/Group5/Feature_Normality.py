@@ -1,29 +1,44 @@
 import pandas as pd
-import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 from scipy.stats import probplot
+from dataset import load_dataset
+import plotting
 
 # Load the cleaned NASA dataset
 def load_data(filepath: str) -> pd.DataFrame:
-    return pd.read_csv(filepath)
+    return load_dataset(filepath)
+
+# Histogram + KDE and Q-Q Plot of one feature
+def normality_figure(data: pd.Series, feature: str) -> plt.Figure:
+    fig = plt.figure(figsize=(10, 4))
+    plt.subplot(1, 2, 1)
+    # Large inputs: the KDE is fitted on a sample, which keeps the shape of the histogram
+    sample = plotting.sample_values(data, plotting.KDE_MAX_POINTS)
+    sns.histplot(sample, kde=True, color='steelblue')
+    suffix = f" (sample of {len(sample):,})" if len(sample) < len(data) else ""
+    plt.title(f"{feature} - Histogram & KDE{suffix}")
+    plt.xlabel(feature)
+    plt.ylabel("Frequency")
+    plt.subplot(1, 2, 2)
+    if len(data) > plotting.QQ_POINTS:
+        theoretical, ordered, slope, intercept = plotting.qq_points(data)
+        plt.plot(theoretical, ordered, 'o', markersize=3)
+        plt.plot(theoretical, slope * theoretical + intercept, 'r-')
+        plt.xlabel("Theoretical quantiles")
+        plt.ylabel("Ordered Values")
+    else:
+        probplot(data, dist="norm", plot=plt)
+    plt.title(f"{feature} - Q-Q Plot")
+    plt.tight_layout()
+    return fig
 
 # Generate Histogram + KDE and Q-Q Plot for each feature
 def plot_normality(df: pd.DataFrame, features: list) -> None:
     sns.set(style="whitegrid")
     for feature in features:
-        data = df[feature].dropna()
-        plt.figure(figsize=(10, 4))
-        plt.subplot(1, 2, 1)
-        sns.histplot(data, kde=True, color='steelblue')
-        plt.title(f"{feature} - Histogram & KDE")
-        plt.xlabel(feature)
-        plt.ylabel("Frequency")
-        plt.subplot(1, 2, 2)
-        probplot(data, dist="norm", plot=plt)
-        plt.title(f"{feature} - Q-Q Plot")
-        plt.tight_layout()
-        plt.show()
+        fig = normality_figure(df[feature].dropna(), feature)
+        plotting.show(fig, f"normality_{feature}")
 
 def main():
     filepath = "cleaned_nasa_data1.csv"
@@ -1,16 +1,19 @@
 import pandas as pd
+from dataset import load_dataset
+from streaming_stats import summarize_frame
 
 # Load dataset from a CSV file
 def load_data(filepath: str) -> pd.DataFrame:
-    return pd.read_csv(filepath)
+    return load_dataset(filepath)
 
-# Generate summary statistics (mean, median, min, max, std) for selected features
+# Generate summary statistics (mean, median, min, max, std) for selected features.
+# One pass over the rows with mergeable accumulators instead of describe().
 def summarize_features(df: pd.DataFrame, features: list) -> pd.DataFrame:
     summary = (
-        df[features]
-        .describe()
-        .loc[['mean', '50%', 'min', 'max', 'std']]
-        .rename(index={'50%': 'median'})
+        summarize_frame(df, features)
+        .summary()
+        .loc[['mean', 'median', 'min', 'max', 'std']]
+        .astype(float)
         .round(2)
     )
     return summary
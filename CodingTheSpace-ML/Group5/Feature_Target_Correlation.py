@@ -1,15 +1,17 @@
 import pandas as pd
-from scipy.stats import pointbiserialr
+from dataset import load_dataset
+from stat_tests import ClassBlocks, point_biserial
 
 # Load dataset
 def load_data(filepath: str) -> pd.DataFrame:
-    return pd.read_csv(filepath)
+    return load_dataset(filepath)
 
 #  Compute Point Biserial Correlation between binary target and continuous features
 def compute_point_biserial(df: pd.DataFrame, target_col: str, features: list) -> pd.DataFrame:
+    # All features in one vectorized pass over the class-sorted rows
+    coefs, p_values = point_biserial(ClassBlocks.from_frame(df, target_col, features))
     results = []
-    for feature in features:
-        coef, p_value = pointbiserialr(df[target_col], df[feature])
+    for feature, coef, p_value in zip(features, coefs, p_values):
         results.append({
             'Feature': feature,
             'Correlation Coefficient': round(coef, 4),
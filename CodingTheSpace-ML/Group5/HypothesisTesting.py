@@ -1,8 +1,9 @@
 import pandas as pd
-from scipy import stats
+from dataset import load_dataset
+from stat_tests import feature_target_tests
 
 # Load and prepare the data
-df = pd.read_csv('cleaned_nasa_data1.csv')
+df = load_dataset('cleaned_nasa_data1.csv')
 
 # Ensure correct types
 df['Hazardous'] = df['Hazardous'].astype(int)
@@ -26,18 +27,16 @@ features_to_test = [
 ]
 
 
+# Welch's t-test for every feature in one vectorized call
+# (NaNs are dropped per feature; N-Positive/N-Negative are the samples left per class)
+tests = feature_target_tests(df, 'Hazardous', features_to_test)
+
 # Store results
 results = []
-
-# Perform t-tests
-for feature in features_to_test:
-    # Drop rows with NaN for current feature
-    subset = df[['Hazardous', feature]].dropna()
-    group1 = subset[subset['Hazardous'] == 1][feature].astype(float)
-    group0 = subset[subset['Hazardous'] == 0][feature].astype(float)
-    
+for feature, n1, n0, t_stat, p_val in zip(tests['Feature'], tests['N-Positive'], tests['N-Negative'],
+                                          tests['T-Statistic'], tests['T-P-Value']):
     # Check sample sizes
-    if len(group1) < 10 or len(group0) < 10:
+    if n1 < 10 or n0 < 10:
         results.append({
             'Feature': feature,
             'T-Statistic': None,
@@ -45,10 +44,7 @@ for feature in features_to_test:
             'Conclusion': 'Too few samples'
         })
         continue
-    
-    # Perform Welch's t-test
-    t_stat, p_val = stats.ttest_ind(group1, group0, equal_var=False)
-    
+
     results.append({
         'Feature': feature,
         'T-Statistic': round(t_stat, 3),
@@ -1,20 +1,20 @@
-from scipy.stats import levene
 import pandas as pd
-import numpy as np
-df = pd.read_csv('cleaned_nasa_data1.csv')
+from dataset import load_dataset
+from stat_tests import feature_target_tests
+df = load_dataset('cleaned_nasa_data1.csv')
 
 # Keep only numeric columns and exclude 'Hazardous'
 features_to_test = df.select_dtypes(include='number').columns.tolist()
 features_to_test = [f for f in features_to_test if f != 'Hazardous']
 
-variance_results = []
+# Brown-Forsythe (median-centred Levene, scipy's default) for every feature at once
+tests = feature_target_tests(df, 'Hazardous', features_to_test)
 
-for feature in features_to_test:
-    subset = df[['Hazardous', feature]].dropna()
-    group1 = subset[subset['Hazardous'] == 1][feature].astype(float)
-    group0 = subset[subset['Hazardous'] == 0][feature].astype(float)
+variance_results = []
 
-    if len(group1) < 10 or len(group0) < 10:
+for feature, n1, n0, stat, p_val in zip(tests['Feature'], tests['N-Positive'], tests['N-Negative'],
+                                        tests['Brown-Forsythe-Stat'], tests['Brown-Forsythe-P-Value']):
+    if n1 < 10 or n0 < 10:
         variance_results.append({
             'Feature': feature,
             'Levene_Stat': None,
@@ -23,7 +23,6 @@ for feature in features_to_test:
         })
         continue
 
-    stat, p_val = levene(group1, group0)
     variance_results.append({
         'Feature': feature,
         'Levene_Stat': round(stat, 3),
@@ -1,12 +1,8 @@
 import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
-
-# Read your cleaned data
-df = pd.read_csv('cleaned_nasa_data1.csv')
-
-# Check Hazardous Distribution
-print(df['Hazardous'].value_counts())
+from dataset import load_dataset
+import plotting
 
 vars_set1 = ['Absolute Magnitude', 'Avg_Diameter_KM', 'Relative Velocity km per sec', 'Miss Dist.(kilometers)']
 vars_set2 = ['Orbit Uncertainity',
@@ -18,17 +14,27 @@ vars_set3=['Inclination',
     'Perihelion Distance',
     'Perihelion Arg',]
 vars_set4=['Perihelion Time',
-    'Mean Anomaly',
-    'Hazardous_numeric']
+    'Mean Anomaly']
+
+var_sets = [vars_set1, vars_set2, vars_set3, vars_set4]
+
+def pairplot_figure(df: pd.DataFrame, vars: list, hue: str = 'Hazardous') -> plt.Figure:
+    # Too many points to scatter: plot a sample that keeps the class ratio
+    sample = plotting.sample_rows(df[vars + [hue]], plotting.SCATTER_MAX_POINTS, by=hue)
+    grid = sns.pairplot(sample, hue=hue, vars=vars, height=3, aspect=1)
+    if len(sample) < len(df):
+        grid.figure.suptitle(f"Sample of {len(sample):,} of {len(df):,} rows", y=1.01)
+    return grid.figure
 
-sns.pairplot(df, hue='Hazardous', vars=vars_set1, height=3, aspect=1)
-plt.show()
+def main():
+    # Read your cleaned data
+    df = load_dataset('cleaned_nasa_data1.csv')
 
-sns.pairplot(df, hue='Hazardous', vars=vars_set2, height=3, aspect=1)
-plt.show()
+    # Check Hazardous Distribution
+    print(df['Hazardous'].value_counts())
 
-sns.pairplot(df, hue='Hazardous', vars=vars_set3, height=3, aspect=1)
-plt.show()
+    for i, vars in enumerate(var_sets, start=1):
+        plotting.show(pairplot_figure(df, vars), f"pairplot_set{i}")
 
-sns.pairplot(df, hue='Hazardous', vars=vars_set4, height=3, aspect=1)
-plt.show()
+if __name__ == "__main__":
+    main()
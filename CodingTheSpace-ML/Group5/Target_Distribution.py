@@ -1,8 +1,9 @@
 import pandas as pd
+from dataset import load_dataset
 
 # Load the dataset from CSV file
 def load_data(filepath: str) -> pd.DataFrame:
-    return pd.read_csv(filepath)
+    return load_dataset(filepath)
 
 # Compute count and percentage distribution of classes in the target column
 def compute_class_distribution(df: pd.DataFrame, target_col: str = 'Hazardous') -> pd.DataFrame:
@@ -0,0 +1,217 @@
+"""
+Admission control for /predict and /predict/stream.
+
+Before a request's body is read, its row count is estimated from
+Content-Length and the measured bytes per row. The request then has to
+reserve that many rows from a per-worker row budget before it may parse and
+score. Waiting requests queue in two lanes:
+- small (up to ADMIT_SMALL_ROWS rows): always served before waiting large
+  ones, and may use the whole budget;
+- large: may hold at most ADMIT_LARGE_SHARE of the budget together, so
+  interactive requests from index.html always find room. A request larger
+  than that share is charged the share and runs on its own.
+
+Requests are rejected before anything is read:
+- 429 when their lane already has ADMIT_MAX_QUEUE requests waiting;
+- 503 when the estimated wait exceeds ADMIT_MAX_WAIT seconds (or it ran out
+  while queued).
+Both carry a Retry-After estimate: the rows in flight and queued ahead,
+divided by the rows per second measured on completed requests.
+
+Admission is off by default, like micro-batching: with the default single
+request thread per worker there is nothing to queue for. Set ADMISSION=1 when
+running with GUNICORN_THREADS > 1.
+"""
+import math
+import os
+import threading
+import time
+from collections import deque
+
+from metrics import REGISTRY, ROW_BUCKETS
+
+ADMISSION_ENABLED = os.environ.get("ADMISSION", "0") == "1"
+ADMIT_MAX_ROWS = int(os.environ.get("ADMIT_MAX_ROWS", 1_000_000))
+ADMIT_SMALL_ROWS = int(os.environ.get("ADMIT_SMALL_ROWS", 5_000))
+ADMIT_LARGE_SHARE = float(os.environ.get("ADMIT_LARGE_SHARE", 0.75))
+ADMIT_MAX_QUEUE = int(os.environ.get("ADMIT_MAX_QUEUE", 32))
+ADMIT_MAX_WAIT = float(os.environ.get("ADMIT_MAX_WAIT", 30))
+# Starting estimates, replaced by measurements as requests complete
+ADMIT_ROWS_PER_SECOND = float(os.environ.get("ADMIT_ROWS_PER_SECOND", 50_000))
+ADMIT_BYTES_PER_ROW = float(os.environ.get("ADMIT_BYTES_PER_ROW", 200))
+
+# Weight of the history in the throughput and bytes-per-row estimates (about the last 10 requests)
+DECAY = 0.9
+LANES = ('small', 'large')
+
+ADMISSION_WAIT_SECONDS = REGISTRY.histogram(
+    'admission_wait_seconds', 'Time admitted requests waited for row budget.', ['lane'])
+ADMISSION_REJECTED = REGISTRY.counter(
+    'admission_rejected_total', 'Requests rejected by admission control.', ['lane', 'reason'])
+ADMISSION_ROWS = REGISTRY.histogram(
+    'admission_estimated_rows', 'Estimated rows per request at admission.', ['lane'], ROW_BUCKETS)
+
+class Rejected(Exception):
+    """Admission refused; status is 429 or 503 and retry_after is in seconds."""
+
+    def __init__(self, message, status, retry_after, lane, reason):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+        self.lane = lane
+        self.reason = reason
+
+class Ticket:
+    __slots__ = ('lane', 'rows', 'cost', 'admitted')
+
+    def __init__(self, lane, rows, cost):
+        self.lane = lane
+        self.rows = rows
+        self.cost = cost
+        self.admitted = None
+
+class AdmissionController:
+    """Row-budget semaphore with a priority lane for small requests and bounded queues."""
+
+    def __init__(self, max_rows=ADMIT_MAX_ROWS, small_rows=ADMIT_SMALL_ROWS, large_share=ADMIT_LARGE_SHARE,
+                 max_queue=ADMIT_MAX_QUEUE, max_wait=ADMIT_MAX_WAIT):
+        self.max_rows = max_rows
+        self.small_rows = small_rows
+        self.large_rows = max(1, int(max_rows * large_share))
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.in_flight = 0        # rows charged against the budget
+        self.large_in_flight = 0
+        self.active = []          # admitted tickets
+        self.queues = {lane: deque() for lane in LANES}
+        self.admitted = 0
+        self.rejected = 0
+        # Decayed completed rows over decayed busy seconds, seeded with the starting estimate
+        self._done_rows = ADMIT_ROWS_PER_SECOND
+        self._busy_seconds = 1.0
+        self._busy_since = None
+        self.bytes_per_row = ADMIT_BYTES_PER_ROW
+        self._cond = threading.Condition()
+
+    def rows_per_second(self):
+        return self._done_rows / self._busy_seconds
+
+    def estimate_rows(self, content_length):
+        """Row estimate for a body of content_length bytes (None for chunked uploads)."""
+        if not content_length:
+            # Unknown size: queue it as the smallest large request
+            return self.small_rows + 1 if content_length is None else 1
+        return max(1, math.ceil(content_length / self.bytes_per_row))
+
+    def _wait_estimate(self, lane, cost):
+        """
+        Seconds until a new request in lane could start: the rows queued ahead
+        of it, plus the rows running in its pool when they leave no room for it.
+        """
+        queued = [ticket for other in LANES[:LANES.index(lane) + 1] for ticket in self.queues[other]]
+        ahead = sum(ticket.rows for ticket in queued)
+        if lane == 'small':
+            running, used, limit = self.active, self.in_flight, self.max_rows
+        else:
+            running = [ticket for ticket in self.active if ticket.lane == 'large']
+            used, limit = self.large_in_flight, self.large_rows
+        if used + sum(ticket.cost for ticket in queued) + cost > limit:
+            ahead += sum(ticket.rows for ticket in running)
+        return ahead / self.rows_per_second()
+
+    def _reject(self, message, status, retry_after, lane, reason):
+        self.rejected += 1
+        ADMISSION_REJECTED.inc(lane=lane, reason=reason)
+        return Rejected(message, status, max(1, math.ceil(retry_after)), lane, reason)
+
+    def _can_run(self, ticket):
+        queue = self.queues[ticket.lane]
+        if queue[0] is not ticket or self.in_flight + ticket.cost > self.max_rows:
+            return False
+        if ticket.lane == 'large':
+            return not self.queues['small'] and self.large_in_flight + ticket.cost <= self.large_rows
+        return True
+
+    def _mark_busy(self, now):
+        # Called after every change to active: throughput is measured over the
+        # time at least one request was admitted
+        if self._busy_since is not None:
+            self._busy_seconds += now - self._busy_since
+        self._busy_since = now if self.active else None
+
+    def acquire(self, rows, cost=None):
+        """
+        Wait for budget for a request of about rows rows and return its Ticket.
+        cost caps what it is charged (streams only hold one chunk at a time).
+        Raises Rejected without waiting when the lane is full or the
+        estimated wait is too long.
+        """
+        lane = 'small' if rows <= self.small_rows else 'large'
+        limit = self.max_rows if lane == 'small' else self.large_rows
+        ticket = Ticket(lane, rows, min(rows if cost is None else cost, limit))
+        ADMISSION_ROWS.observe(rows, lane=lane)
+        start = time.monotonic()
+        with self._cond:
+            queue = self.queues[lane]
+            if len(queue) >= self.max_queue:
+                raise self._reject(f"Too many {lane} requests queued; retry later.", 429,
+                                   self._wait_estimate(lane, ticket.cost), lane, 'queue_full')
+            estimate = self._wait_estimate(lane, ticket.cost)
+            if estimate > self.max_wait:
+                raise self._reject(f"Server is overloaded (estimated wait {estimate:.0f}s); retry later.", 503,
+                                   estimate, lane, 'overloaded')
+            queue.append(ticket)
+            deadline = start + self.max_wait
+            try:
+                while not self._can_run(ticket):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise self._reject("Timed out waiting for capacity; retry later.", 503,
+                                           self._wait_estimate(lane, ticket.cost), lane, 'timeout')
+                    self._cond.wait(remaining)
+            except BaseException:
+                queue.remove(ticket)
+                self._cond.notify_all()
+                raise
+            queue.popleft()
+            now = time.monotonic()
+            self.in_flight += ticket.cost
+            if lane == 'large':
+                self.large_in_flight += ticket.cost
+            self.active.append(ticket)
+            self._mark_busy(now)
+            self.admitted += 1
+            ticket.admitted = now
+            # The next small request may fit as well
+            self._cond.notify_all()
+        ADMISSION_WAIT_SECONDS.observe(now - start, lane=lane)
+        return ticket
+
+    def release(self, ticket, rows=0, nbytes=0):
+        """Return a ticket's budget; rows and nbytes are what the request actually processed."""
+        with self._cond:
+            self.active.remove(ticket)
+            self.in_flight -= ticket.cost
+            if ticket.lane == 'large':
+                self.large_in_flight -= ticket.cost
+            self._mark_busy(time.monotonic())
+            self._done_rows = self._done_rows * DECAY + rows
+            self._busy_seconds *= DECAY
+            if rows and nbytes:
+                self.bytes_per_row = self.bytes_per_row * DECAY + (nbytes / rows) * (1 - DECAY)
+            self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            return {
+                'max_rows': self.max_rows,
+                'large_rows': self.large_rows,
+                'small_rows': self.small_rows,
+                'in_flight_rows': self.in_flight,
+                'active': len(self.active),
+                'queued': {lane: len(queue) for lane, queue in self.queues.items()},
+                'admitted': self.admitted,
+                'rejected': self.rejected,
+                'rows_per_second': round(self.rows_per_second(), 1),
+                'bytes_per_row': round(self.bytes_per_row, 1),
+            }
@@ -1,113 +1,456 @@
-from flask import Flask, request, jsonify
-import joblib
+from flask import Flask, Request, Response, g, request, jsonify, stream_with_context
 import pandas as pd
+import csv_reader
 from flask_cors import CORS
 from validation import (
-    validate_required_columns,
-    validate_numeric_columns,
-    validate_missing_values,
-    validate_row_count,
-    remove_duplicates,
+    UPLOAD_DTYPES,
+    ValidationError,
+    iter_csv_chunks,
+    unparsed_row_keys,
+    validate_chunk,
 )
+from inference import build_feature_matrix, positive_class_proba
+import model_store
+from model_store import get_model
+from registry import default_registry
+from shadow import ShadowScorer
+from prediction_cache import PredictionCache
+from batcher import MicroBatcher, MICROBATCH_ENABLED
+from admission import ADMISSION_ENABLED, AdmissionController, Rejected
+from metrics import CONTENT_TYPE, REGISTRY, RequestTimer, record_validation_error
+from profiler import PROFILING_ENABLED, ProfileStore
+from response_formats import MEDIA_TYPES, NotAcceptable, echo_requested, encode, negotiate
+import functools
+import hmac
 import io
+import json
+import os
+import threading
+
+class UploadRequest(Request):
+    """
+    Request that leaves uploads marked as detached open when the view returns,
+    so a streamed response can keep reading them; the response closes them.
+    """
+    detached_uploads = ()
+
+    def close(self):
+        files = self.__dict__.get("files")
+        for upload in (files.values() if files else ()):
+            if upload not in self.detached_uploads:
+                upload.close()
 
 app = Flask(__name__)
+app.request_class = UploadRequest
 CORS(app)  # Enable CORS for all routes
 
-# Load the model once when the backend starts
-try:
-    model = joblib.load("final_rf_model.joblib")
-    print("✅ Model loaded successfully from final_rf_model.joblib")
-except Exception as e:
-    print(f"❌ Error loading model: {e}")
-    raise
+# The model is loaded lazily by model_store.get_model() on first use (or in the
+# gunicorn master, see gunicorn.conf.py), not at import time. Each request takes
+# one reference to it, so a hot swap never changes the model under a request.
+
+# Per-row prediction cache shared by all requests in this worker
+prediction_cache = PredictionCache()
+REGISTRY.callback('prediction_cache_hits_total', 'Rows answered from the prediction cache.',
+                  lambda: prediction_cache.hits, 'counter')
+REGISTRY.callback('prediction_cache_misses_total', 'Rows sent past the prediction cache.',
+                  lambda: prediction_cache.misses, 'counter')
+REGISTRY.callback('prediction_cache_rows', 'Rows held in the prediction cache.',
+                  lambda: prediction_cache.stats()['size'])
+
+# Row budget and priority lanes in front of parsing and inference (see admission.py)
+admission = AdmissionController() if ADMISSION_ENABLED else None
+if admission is not None:
+    for lane in ('small', 'large'):
+        REGISTRY.callback(f'admission_queue_depth_{lane}', f'Requests waiting in the {lane} admission lane.',
+                          lambda lane=lane: len(admission.queues[lane]))
+    REGISTRY.callback('admission_rows_in_flight', 'Rows charged against the admission budget.',
+                      lambda: admission.in_flight)
+    REGISTRY.callback('admission_rows_per_second', 'Measured rows per second used for Retry-After.',
+                      lambda: admission.rows_per_second())
+
+# Profiles of requests sent with "X-Profile: 1" (only when PROFILING_ENABLED=1)
+profiles = ProfileStore()
+
+def score_features(X, model):
+    """Score a validated float32 feature matrix through the cache with the given model."""
+    return prediction_cache.predict_with_proba(model, X)
+
+# With MICROBATCH=1, concurrent requests are merged into one model call per flush
+batcher = MicroBatcher(score_features) if MICROBATCH_ENABLED else None
 
-def validate_input_data(csv_string):
+# Candidate model scoring a sample of live traffic off the request path (see shadow.py)
+shadow = None
+
+def score(X, model):
+    labels, proba = batcher.predict_with_proba(X, model) if batcher is not None else score_features(X, model)
+    if shadow is not None:
+        shadow.offer(X, labels, proba, model)
+    return labels, proba
+
+def start_shadow(version, rate):
+    """Load a registry version as the shadow candidate of this worker, replacing any previous one."""
+    global shadow
+    path, name = model_store.model_source(version)
+    candidate = ShadowScorer(model_store.load_model(path, name=name), rate)
+    previous, shadow = shadow, candidate
+    if previous is not None:
+        previous.stop()
+    return candidate
+
+def configure_shadow():
+    # SHADOW_VERSION=<registry version> (and SHADOW_RATE) enables shadow scoring in every worker
+    version = os.environ.get("SHADOW_VERSION")
+    if version:
+        start_shadow(version, float(os.environ.get("SHADOW_RATE", 0.1)))
+
+# Rows per chunk for /predict/stream; bounds peak memory independently of file size
+STREAM_CHUNK_ROWS = int(os.environ.get("PREDICT_CHUNK_ROWS", 50_000))
+
+def parse_csv(csv_data, columns=None):
+    # Parse only the given columns (all when None), with normalized names and pinned dtypes.
+    # Uploads stay bytes: decoding them to str would only add copies.
+    if isinstance(csv_data, str):
+        csv_data = csv_data.encode('utf-8')
+    try:
+        return csv_reader.read_csv(io.BytesIO(csv_data), columns, UPLOAD_DTYPES)
+    except Exception as e:
+        raise ValidationError(str(e), "unreadable") from e
+
+def validate_input_data(csv_data, plan, timer=None):
     """
-    Uses the imported validation functions to validate and clean the CSV data string.
-    Returns a cleaned DataFrame ready for prediction.
+    Uses the compiled validation plan to validate and clean the CSV data (bytes or str).
+    Returns a cleaned DataFrame ready for prediction. Only the plan's columns are
+    parsed up front. The other uploaded columns are parsed only when rows repeat
+    in those, so duplicates are still whole-row duplicates.
     """
-    # Define required columns and their default mean values
-    required_columns = [
-        'Minimum Orbit Intersection',
-        'Absolute Magnitude',
-        'Avg_Diameter_KM',
-        'Perihelion Distance',
-        'Orbit Uncertainity',
-        'Inclination'
-    ]
-
-    default_means = {
-        'Minimum Orbit Intersection': 0.4768977851980138,
-        'Absolute Magnitude': 0.1591059336579516,
-        'Avg_Diameter_KM': 0.13758845293463146,
-        'Perihelion Distance': 0.0479985661169944,
-        'Orbit Uncertainity': 0.04306290759519788,
-        'Inclination': 0.04022213144882968
-    }
-
-    numeric_columns = required_columns
-
-    # Load CSV from string
-    df = pd.read_csv(io.StringIO(csv_string))
-    df.columns = df.columns.str.strip()  # Normalize columns
-
-    # Use imported validators
-    df = validate_required_columns(df, required_columns, default_means)
-    df = validate_missing_values(df, default_means)
-    validate_numeric_columns(df, numeric_columns)
-    validate_row_count(df)
-    df = remove_duplicates(df)
-
-    # Return only the required columns in the correct order
-    final_columns = [col for col in required_columns if col in df.columns]
-    return df[final_columns]
+    timer = timer or RequestTimer('offline')
+    if isinstance(csv_data, str):
+        csv_data = csv_data.encode('utf-8')
+    # Load CSV from bytes
+    with timer.stage('parse'):
+        df = parse_csv(csv_data, plan.columns)
+        other_keys = unparsed_row_keys(csv_data, plan.columns)
+
+    # Missing columns/values, numeric types, scaling, row count and duplicates in
+    # one pass; the plan returns only the required columns in the correct order
+    with timer.stage('validate'):
+        return plan.apply(df, other_keys=other_keys)
+
+def instrumented(endpoint):
+    """
+    Record the view's latency, status, rows and bytes under endpoint, and
+    sample-profile it when asked with "X-Profile: 1". Streamed responses
+    are recorded when their body has been sent.
+    """
+    def decorate(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            timer = g.timer = RequestTimer(endpoint)
+            timer.bytes = request.content_length or 0
+            profile = None
+            if PROFILING_ENABLED and request.headers.get('X-Profile') == '1':
+                profile = profiles.start()
+            response = app.make_response(view(*args, **kwargs))
+
+            def finish():
+                timer.finish(response.status_code)
+                if profile is not None:
+                    profiles.finish(*profile)
+
+            if profile is not None:
+                response.headers['X-Profile-Id'] = profile[0]
+            if response.is_streamed:
+                response.call_on_close(finish)
+            else:
+                finish()
+            return response
+        return wrapper
+    return decorate
+
+def admitted(cost=None):
+    """
+    Hold admission budget for the view, estimated from Content-Length before
+    the body is read; rejected requests get 429/503 with Retry-After. Streamed
+    responses keep their budget until the body has been sent.
+    """
+    def decorate(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if admission is None:
+                return view(*args, **kwargs)
+            try:
+                ticket = admission.acquire(admission.estimate_rows(request.content_length), cost)
+            except Rejected as e:
+                response = jsonify({'error': str(e), 'retry_after': e.retry_after})
+                response.status_code = e.status
+                response.headers['Retry-After'] = str(e.retry_after)
+                return response
+            timer = g.timer
+
+            def release():
+                admission.release(ticket, timer.rows, timer.bytes)
+
+            try:
+                response = app.make_response(view(*args, **kwargs))
+            except BaseException:
+                release()
+                raise
+            if response.is_streamed:
+                response.call_on_close(release)
+            else:
+                release()
+            return response
+        return wrapper
+    return decorate
+
+def request_plan(model):
+    # ?units=raw uploads are standardized with the scaler bundled with the model
+    return model.validation_plan(request.args.get('units', 'scaled'))
 
 @app.route('/predict', methods=['POST'])
+@instrumented('predict')
+@admitted()
 def predict():
+    timer = g.timer
     try:
+        # Response layout from ?format= or Accept; ?echo=0 leaves the cleaned data out
+        fmt = negotiate(request.args, request.accept_mimetypes)
+        echo = echo_requested(request.args)
+        model = get_model()
+        plan = request_plan(model)
+
         # Handle incoming request data
         if request.is_json:
             # If JSON, get 'processedData' list and convert to DataFrame
-            data = request.json.get('processedData', [])
-            df = pd.DataFrame(data)
+            with timer.stage('read'):
+                data = request.json.get('processedData', [])
+            with timer.stage('parse'):
+                df = pd.DataFrame(data)
+            if plan.mean is not None:
+                with timer.stage('validate'):
+                    df = plan.apply(df)
         else:
             # If form-data with file or raw CSV text
-            if 'file' in request.files:
-                file = request.files['file']
-                csv_string = file.read().decode('utf-8')
-            else:
-                csv_string = request.data.decode('utf-8')
+            with timer.stage('read'):
+                if 'file' in request.files:
+                    file = request.files['file']
+                    csv_data = file.read()
+                else:
+                    csv_data = request.data
 
             # Validate and clean CSV data
-            df = validate_input_data(csv_string)
-
-        required_features = [
-            'Minimum Orbit Intersection',
-            'Absolute Magnitude',
-            'Avg_Diameter_KM',
-            'Perihelion Distance',
-            'Orbit Uncertainity',
-            'Inclination'
-        ]
-
-        # Confirm all required features exist
-        for feature in required_features:
-            if feature not in df.columns:
-                raise ValueError(f"Required feature '{feature}' missing after validation")
-
-        # Predict with the loaded model
-        predictions = model.predict(df[required_features]).tolist()
-
-        # Respond with predictions and cleaned data
-        return jsonify({
-            'predictions': predictions,
-            'data': df[required_features].to_dict('records')
-        })
+            df = validate_input_data(csv_data, plan, timer)
 
+        # Pack the features once into a float32 matrix and score it in sub-batches
+        with timer.stage('features'):
+            X = build_feature_matrix(df, model.feature_order)
+        with timer.stage('inference'):
+            predictions, proba = score(X, model)
+        timer.rows = len(X)
+
+        # Respond with predictions, hazard probabilities and cleaned data
+        probabilities = positive_class_proba(model, proba)
+        with timer.stage('serialize'):
+            if fmt != 'json':
+                body = encode(fmt, predictions, probabilities, df if echo else None, model.feature_order)
+                return Response(body, mimetype=MEDIA_TYPES[fmt])
+            body = {
+                'predictions': predictions.tolist(),
+                'probabilities': probabilities.tolist(),
+            }
+            if echo:
+                body['data'] = df[model.feature_order].to_dict('records')
+            return jsonify(body)
+
+    except NotAcceptable as e:
+        return jsonify({'error': str(e)}), 406
     except Exception as e:
         # Return error message and HTTP 400 for any issues
+        record_validation_error(e)
+        return jsonify({'error': str(e)}), 400
+
+def generate_ndjson_predictions(chunks, model, plan, timer=None, echo=True):
+    """
+    Validates and scores each chunk, yielding the NDJSON lines (one per row)
+    of one chunk at a time. The first chunk is validated eagerly so header
+    and schema errors can still be answered with HTTP 400 before streaming starts.
+    """
+    timer = timer or RequestTimer('offline')
+
+    def next_chunk():
+        # Reading and parsing happen inside the chunk iterator
+        with timer.stage('parse'):
+            return next(chunks, None)
+
+    def score_chunk(chunk):
+        with timer.stage('validate'):
+            df = validate_chunk(chunk, plan)
+        with timer.stage('features'):
+            X = build_feature_matrix(df, model.feature_order)
+        with timer.stage('inference'):
+            predictions, proba = score(X, model)
+        timer.rows += len(X)
+        return df, predictions, positive_class_proba(model, proba)
+
+    first = next_chunk()
+    if first is None or len(first) == 0:
+        raise ValidationError("CSV file contains no rows.", "empty")
+    first_scored = score_chunk(first)
+
+    def lines():
+        scored = first_scored
+        try:
+            while scored is not None:
+                df, predictions, probabilities = scored
+                with timer.stage('serialize'):
+                    if echo:
+                        rows = zip(predictions.tolist(), probabilities.tolist(), df[model.feature_order].to_dict('records'))
+                        block = ''.join(json.dumps({'prediction': prediction, 'probability': probability, 'data': row}) + '\n'
+                                        for prediction, probability, row in rows)
+                    else:
+                        block = ''.join(json.dumps({'prediction': prediction, 'probability': probability}) + '\n'
+                                        for prediction, probability in zip(predictions.tolist(), probabilities.tolist()))
+                yield block
+                chunk = next_chunk()
+                scored = score_chunk(chunk) if chunk is not None else None
+        except Exception as e:
+            # Headers are already sent, so report the failure in-band and stop
+            record_validation_error(e)
+            yield json.dumps({'error': str(e)}) + '\n'
+
+    return lines()
+
+@app.route('/predict/stream', methods=['POST'])
+@instrumented('predict_stream')
+@admitted(cost=STREAM_CHUNK_ROWS)  # a stream holds one chunk at a time
+def predict_stream():
+    try:
+        model = get_model()
+        plan = request_plan(model)
+
+        # Read straight from the upload stream instead of decoding it into a string
+        if 'file' in request.files:
+            upload = request.files['file']
+            request.detached_uploads = (upload,)
+            source = upload.stream
+        else:
+            upload = None
+            source = request.stream
+
+        # All columns are parsed: chunks cannot be re-read, and the others count for duplicates
+        chunks = iter_csv_chunks(source, chunksize=STREAM_CHUNK_ROWS)
+        try:
+            body = generate_ndjson_predictions(chunks, model, plan, g.timer, echo_requested(request.args))
+        except Exception:
+            if upload is not None:
+                upload.close()
+            raise
+        response = Response(stream_with_context(body), mimetype='application/x-ndjson')
+        if upload is not None:
+            response.call_on_close(upload.close)
+        return response
+
+    except Exception as e:
+        record_validation_error(e)
         return jsonify({'error': str(e)}), 400
 
+@app.route('/healthz', methods=['GET'])
+def healthz():
+    # Liveness: the process is up and serving, whether or not the model is loaded
+    return jsonify({'status': 'ok'})
+
+@app.route('/readyz', methods=['GET'])
+def readyz():
+    # Readiness: 503 until the model is loaded, so load balancers hold traffic back
+    if not model_store.is_loaded():
+        body = {'status': 'error', 'error': model_store.load_error} if model_store.load_error else {'status': 'loading'}
+        response = jsonify(body)
+        response.status_code = 503
+        response.headers['Retry-After'] = '1'
+        return response
+    model = get_model()
+    return jsonify({'status': 'ready', 'model': model.name, 'sha256': model.version})
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
+
+@app.route('/debug/profile/<profile_id>', methods=['GET'])
+def profile(profile_id):
+    # Collapsed stacks of a profiled request, for flamegraph.pl or speedscope
+    found = profiles.get(profile_id) if PROFILING_ENABLED else None
+    if found is None:
+        return jsonify({'error': 'Unknown profile id.'}), 404
+    response = Response(found.collapsed(), mimetype='text/plain')
+    response.headers['X-Profile-Samples'] = str(found.samples)
+    return response
+
+# Admin endpoints need "Authorization: Bearer $ADMIN_TOKEN"; without ADMIN_TOKEN they are off
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+
+def admin_allowed():
+    supplied = request.headers.get('Authorization', '').removeprefix('Bearer ')
+    return bool(ADMIN_TOKEN) and hmac.compare_digest(supplied, ADMIN_TOKEN)
+
+def model_info(model):
+    return {'name': model.name, 'sha256': model.version, 'path': model.path, 'load_seconds': model.load_seconds}
+
+@app.route('/admin/model', methods=['GET', 'POST'])
+def admin_model():
+    if not admin_allowed():
+        return jsonify({'error': 'Forbidden.'}), 403
+    registry = default_registry()
+    if request.method == 'GET':
+        return jsonify({
+            'serving': model_info(get_model()),
+            'active': registry.current() if registry else None,
+            'versions': registry.versions() if registry else [],
+        })
+
+    # Activate (registry) and load in the background; /predict keeps using the old
+    # model until the new one is swapped in. Other workers follow via their watcher.
+    version = (request.get_json(silent=True) or {}).get('version')
+    try:
+        if version is not None:
+            if registry is None:
+                raise ValueError("MODEL_REGISTRY is not set")
+            registry.activate(version)
+    except (ValueError, OSError) as e:
+        return jsonify({'error': str(e)}), 400
+    threading.Thread(target=model_store.reload_model, args=(version,), name='model-reload', daemon=True).start()
+    return jsonify({'status': 'loading', 'version': version}), 202
+
+@app.route('/admin/shadow', methods=['GET', 'POST', 'DELETE'])
+def admin_shadow():
+    # Shadow scoring is per worker: these calls only affect the worker that answers them
+    global shadow
+    if not admin_allowed():
+        return jsonify({'error': 'Forbidden.'}), 403
+    if request.method == 'POST':
+        body = request.get_json(silent=True) or {}
+        try:
+            start_shadow(body['version'], float(body.get('rate', 0.1)))
+        except (KeyError, ValueError, OSError) as e:
+            return jsonify({'error': f"Cannot start shadow scoring: {e}"}), 400
+    elif request.method == 'DELETE' and shadow is not None:
+        shadow.stop()
+        shadow = None
+    return jsonify(shadow.stats() if shadow is not None else {'enabled': False})
+
+@app.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    return jsonify(prediction_cache.stats())
+
+@app.route('/admission/stats', methods=['GET'])
+def admission_stats():
+    return jsonify(admission.stats() if admission is not None else {'enabled': False})
+
+@app.route('/batcher/stats', methods=['GET'])
+def batcher_stats():
+    return jsonify(batcher.stats() if batcher is not None else {'enabled': False})
+
 if __name__ == '__main__':
+    model_store.warm_up_async()  # /healthz and /readyz answer while the model loads
+    model_store.start_watcher()
+    configure_shadow()
     app.run(debug=True)
@@ -0,0 +1,178 @@
+"""
+Offline batch scoring of large NEO CSV files on all cores.
+
+    python batch_score.py catalog.csv --out scored/ --workers 8
+    cat scored/part-*.csv > scored.csv
+
+The input is split into byte ranges that start and end on line boundaries.
+Each shard is validated with the rules validate_input_data applies, through
+the same ValidationPlan filled (and, with --units raw, scaled) from the
+model's bundled preprocessing. Shards are then scored in a process pool.
+
+Workers memory-map the compiled forest read-only, so they all share one
+copy of the model in the page cache. The compiled forest is built once in
+the parent before the pool starts.
+
+Each shard is written to out/part-NNNNN.csv under a temporary name. Only
+part-00000 carries the header, so concatenating the parts in name order
+gives one CSV in input order. Parts left in out/ by an earlier run are
+deleted first. Duplicate rows are dropped within a shard, across its chunks
+(the shard keeps the 64-bit fingerprint of every row it wrote), but not
+across shards.
+"""
+import argparse
+import io
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import csv_reader
+
+# Rows parsed and scored at a time inside a shard; bounds worker memory
+SHARD_CHUNK_ROWS = 200_000
+
+def read_header(path):
+    """The header line and its raw column names."""
+    with open(path, 'rb') as f:
+        header = f.readline()
+    return header, csv_reader.parse_header(header)
+
+def shard_ranges(path, n_shards):
+    """Byte ranges (start, end) covering the data lines, each starting at a line start."""
+    header, _ = read_header(path)
+    size = os.path.getsize(path)
+    data_start = len(header)
+    bounds = [data_start]
+    with open(path, 'rb') as f:
+        for i in range(1, n_shards):
+            target = data_start + (size - data_start) * i // n_shards
+            if target <= bounds[-1]:
+                continue
+            f.seek(target - 1)
+            f.readline()  # finish the line containing target - 1
+            position = f.tell()
+            if bounds[-1] < position < size:
+                bounds.append(position)
+    bounds.append(size)
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if end > start]
+
+class RangeReader(io.RawIOBase):
+    """Read-only file view limited to bytes [start, end)."""
+
+    def __init__(self, path, start, end):
+        self._file = open(path, 'rb')
+        self._file.seek(start)
+        self._remaining = end - start
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        n = self._file.readinto(memoryview(buffer)[:min(len(buffer), self._remaining)])
+        self._remaining -= n
+        return n
+
+    def close(self):
+        self._file.close()
+        super().close()
+
+_model = None
+_plan = None
+
+def _init_worker(model_path, name, units):
+    global _model, _plan
+    from model_store import load_model
+
+    _model = load_model(model_path, engine='compiled', name=name)
+    _plan = _model.validation_plan(units)
+
+def score_shard(path, index, start, end, out_dir, chunk_rows=SHARD_CHUNK_ROWS):
+    """Validate and score one byte range; returns (index, rows read, rows written)."""
+    from cleaning_stream import RowDeduplicator
+    from inference import build_feature_matrix, positive_class_proba
+    from validation import UPLOAD_DTYPES
+
+    _, names = read_header(path)
+    passthrough = ['Hazardous'] if 'Hazardous' in [name.strip() for name in names] else []
+    final = os.path.join(out_dir, f"part-{index:05d}.csv")
+    tmp = final + f".tmp{os.getpid()}"
+    rows_in = rows_out = 0
+    dedup = RowDeduplicator()
+    with open(tmp, 'w', newline='') as out, \
+            io.BufferedReader(RangeReader(path, start, end), buffer_size=1 << 20) as source:
+        header = index == 0
+        # Every column is parsed, as the other columns count for duplicates; the model's get pinned dtypes
+        chunks = csv_reader.iter_csv(source, None, UPLOAD_DTYPES, chunk_rows, names) if end > start else []
+        for chunk in chunks:
+            rows_in += len(chunk)
+            try:
+                df = _plan.apply(chunk, passthrough=passthrough)
+            except ValueError as e:
+                raise ValueError(f"Shard {index} (bytes {start}-{end}): {e}") from e
+            # apply only drops duplicates within the chunk; these are repeats of earlier chunks
+            others = [col for col in chunk.columns if col not in df.columns]
+            keep = dedup.first_occurrences(pd.concat([df, chunk.loc[df.index, others]], axis=1))
+            if not keep.all():
+                df = df[keep]
+            labels, proba = _model.predict_with_proba(build_feature_matrix(df, _model.feature_order))
+            scored = df[_model.feature_order + passthrough].assign(
+                prediction=labels, probability=positive_class_proba(_model, proba))
+            scored.to_csv(out, index=False, header=header)
+            header = False
+            rows_out += len(scored)
+        if header:
+            # Empty first shard: still write the header so the parts concatenate to a valid CSV
+            pd.DataFrame(columns=_model.feature_order + passthrough + ['prediction', 'probability']) \
+                .to_csv(out, index=False)
+    os.replace(tmp, final)
+    return index, rows_in, rows_out
+
+def batch_score(path, out_dir, workers=None, shards=None, units='scaled', chunk_rows=SHARD_CHUNK_ROWS):
+    from model_store import ensure_compiled, file_checksum, model_source
+
+    workers = workers or os.cpu_count()
+    os.makedirs(out_dir, exist_ok=True)
+    # Parts of an earlier run with more shards would otherwise be concatenated with these
+    for filename in os.listdir(out_dir):
+        if filename.startswith('part-'):
+            os.remove(os.path.join(out_dir, filename))
+    model_path, name = model_source()
+    ensure_compiled(model_path, file_checksum(model_path))  # compile once, workers only map it
+
+    # A few shards per worker so uneven shards still balance across the pool
+    # A header-only file still gets one (empty) shard, so part-00000 carries the header
+    ranges = shard_ranges(path, shards or workers * 4) or [(os.path.getsize(path),) * 2]
+    context = multiprocessing.get_context('fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                             initargs=(model_path, name, units)) as pool:
+        futures = [pool.submit(score_shard, path, i, start, end, out_dir, chunk_rows)
+                   for i, (start, end) in enumerate(ranges)]
+        results = [future.result() for future in futures]
+    return {
+        'shards': len(ranges),
+        'rows_read': int(np.sum([r[1] for r in results])),
+        'rows_written': int(np.sum([r[2] for r in results])),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a large NEO CSV on all cores.")
+    parser.add_argument('input')
+    parser.add_argument('--out', default='scored')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--shards', type=int, default=None, help='default: 4 per worker')
+    parser.add_argument('--units', choices=['scaled', 'raw'], default='scaled')
+    parser.add_argument('--chunk-rows', type=int, default=SHARD_CHUNK_ROWS)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    summary = batch_score(args.input, args.out, args.workers, args.shards, args.units, args.chunk_rows)
+    seconds = time.perf_counter() - start
+    print(f"Scored {summary['rows_written']:,} of {summary['rows_read']:,} rows in {summary['shards']} shards "
+          f"in {seconds:.1f}s ({summary['rows_read'] / seconds:,.0f} rows/s) -> {args.out}/part-*.csv")
+
+if __name__ == "__main__":
+    main()
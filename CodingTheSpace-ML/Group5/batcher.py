@@ -0,0 +1,127 @@
+"""
+Micro-batching for concurrent /predict requests.
+
+Request threads submit their validated float32 feature matrices and block on a
+Future. A single background thread collects submissions until either
+max_batch_rows rows are queued or the oldest one has waited max_wait_ms. It
+then scores the merged batch with one call and hands each request its own
+slice of the labels and probabilities.
+"""
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+
+MICROBATCH_ENABLED = os.environ.get("MICROBATCH", "0") == "1"
+MICROBATCH_MAX_ROWS = int(os.environ.get("MICROBATCH_MAX_ROWS", 4096))
+MICROBATCH_MAX_WAIT_MS = float(os.environ.get("MICROBATCH_MAX_WAIT_MS", 5))
+
+class _Submission:
+    __slots__ = ('X', 'args', 'future', 'enqueued')
+
+    def __init__(self, X, args):
+        self.X = X
+        self.args = args
+        self.future = Future()
+        self.enqueued = time.monotonic()
+
+class MicroBatcher:
+    """Coalesces concurrent scoring calls into merged batches on a worker thread."""
+
+    def __init__(self, score, max_batch_rows=MICROBATCH_MAX_ROWS, max_wait_ms=MICROBATCH_MAX_WAIT_MS):
+        self.score = score
+        self.max_batch_rows = max_batch_rows
+        self.max_wait = max_wait_ms / 1000.0
+        self.batches = 0
+        self.rows = 0
+        self.requests = 0
+        self._pending = deque()
+        self._pending_rows = 0
+        self._cond = threading.Condition()
+        self._thread = None
+        self._pid = None
+
+    def _ensure_worker(self):
+        # Threads do not survive fork, so (re)start lazily in whichever process submits
+        if self._thread is None or self._pid != os.getpid():
+            self._pending.clear()
+            self._pending_rows = 0
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+            self._thread.start()
+
+    def submit(self, X, *args):
+        """
+        Queue X for the next merged batch and return a Future of (labels, proba).
+        Extra args (the model) are passed on to score; only submissions with the
+        same args are merged.
+        """
+        submission = _Submission(X, args)
+        with self._cond:
+            self._ensure_worker()
+            self._pending.append(submission)
+            self._pending_rows += len(X)
+            self._cond.notify()
+        return submission.future
+
+    def predict_with_proba(self, X, *args):
+        # Requests that fill a batch on their own gain nothing from waiting
+        if len(X) >= self.max_batch_rows:
+            return self.score(X, *args)
+        return self.submit(X, *args).result()
+
+    def _next_batch(self):
+        with self._cond:
+            while not self._pending:
+                self._cond.wait()
+            deadline = self._pending[0].enqueued + self.max_wait
+            while self._pending_rows < self.max_batch_rows:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            batch, rows = [], 0
+            while self._pending and (not batch or (rows + len(self._pending[0].X) <= self.max_batch_rows
+                                                   and self._pending[0].args == batch[0].args)):
+                submission = self._pending.popleft()
+                batch.append(submission)
+                rows += len(submission.X)
+            self._pending_rows -= rows
+            return batch, rows
+
+    def _run(self):
+        while True:
+            batch, rows = self._next_batch()
+            try:
+                X = batch[0].X if len(batch) == 1 else np.concatenate([s.X for s in batch])
+                labels, proba = self.score(X, *batch[0].args)
+            except Exception as e:
+                for submission in batch:
+                    submission.future.set_exception(e)
+                continue
+
+            start = 0
+            for submission in batch:
+                stop = start + len(submission.X)
+                submission.future.set_result((labels[start:stop], proba[start:stop]))
+                start = stop
+            self.batches += 1
+            self.rows += rows
+            self.requests += len(batch)
+
+    def stats(self):
+        return {
+            'enabled': True,
+            'max_batch_rows': self.max_batch_rows,
+            'max_wait_ms': self.max_wait * 1000.0,
+            'batches': self.batches,
+            'requests': self.requests,
+            'rows': self.rows,
+            'mean_batch_rows': self.rows / self.batches if self.batches else 0.0,
+            'mean_requests_per_batch': self.requests / self.batches if self.batches else 0.0,
+            'queued_rows': self._pending_rows,
+        }
@@ -0,0 +1,50 @@
+"""
+Compare the compiled flat-array forest with sklearn's predict_proba.
+
+    python -m benchmarks.bench_forest --sizes 1 100 10000 1000000
+"""
+import argparse
+import time
+
+import joblib
+import numpy as np
+
+from forest_compiler import compile_forest
+from inference import model_feature_order
+
+# Time fn(X) repeatedly for at least min_time seconds and return the best call
+def best_time(fn, X, min_time=0.5, max_repeat=50):
+    timings = []
+    start = time.perf_counter()
+    while len(timings) < max_repeat and (not timings or time.perf_counter() - start < min_time):
+        t0 = time.perf_counter()
+        fn(X)
+        timings.append(time.perf_counter() - t0)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--model', default='final_rf_model.joblib')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 100, 10_000, 1_000_000])
+    args = parser.parse_args()
+
+    model = joblib.load(args.model)
+    compile_start = time.perf_counter()
+    forest = compile_forest(model)
+    print(f"compiled {forest.n_trees} trees / {forest.meta['n_nodes']:,} nodes "
+          f"into {forest.buffer.nbytes / 1024:.0f} KiB in {time.perf_counter() - compile_start:.3f}s")
+
+    rng = np.random.default_rng(42)
+    n_features = len(model_feature_order(model))
+    print(f"{'batch':>10} {'sklearn ms':>12} {'compiled ms':>12} {'speedup':>8}  match")
+    for size in args.sizes:
+        X = rng.standard_normal((size, n_features)).astype(np.float32)
+        match = np.array_equal(model.predict_proba(X), forest.predict_proba(X)) and \
+            np.array_equal(model.predict(X), forest.predict(X))
+        sklearn_time = best_time(model.predict_proba, X)
+        compiled_time = best_time(forest.predict_proba, X)
+        print(f"{size:>10,} {sklearn_time * 1e3:>12.2f} {compiled_time * 1e3:>12.2f} "
+              f"{sklearn_time / compiled_time:>7.2f}x  {match}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Report model cold-start time and per-worker memory for the ways the backend can load it.
+
+    python -m benchmarks.bench_startup --workers 4
+
+Each scenario runs in a fresh interpreter. "per-worker load" forks the workers
+first and loads the model in each one, as gunicorn does without preload_app.
+"preloaded" loads once in the parent before forking, as gunicorn.conf.py does.
+Memory comes from /proc/self/smaps_rollup (Linux): PSS splits shared pages
+between the processes that map them, so it is the per-worker cost that adds up.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+_SCENARIO = r'''
+import json, os, sys, time
+import numpy as np
+
+def memory():
+    fields = {}
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            for line in f:
+                parts = line.split()
+                if parts[0] in ('Rss:', 'Pss:', 'Private_Clean:', 'Private_Dirty:'):
+                    fields[parts[0][:-1]] = int(parts[1])
+    except OSError:
+        import resource
+        fields['Rss'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    fields['Private'] = fields.pop('Private_Clean', 0) + fields.pop('Private_Dirty', 0)
+    return {k: round(v / 1024, 1) for k, v in fields.items()}
+
+def load(mode):
+    start = time.perf_counter()
+    if mode == 'joblib':
+        import joblib
+        model = joblib.load(MODEL_PATH)
+        score = lambda X: model.predict_proba(X)
+    else:
+        import model_store
+        loaded = model_store.load_model(MODEL_PATH, engine=mode)
+        score = lambda X: loaded.predict_with_proba(X)
+    return score, time.perf_counter() - start
+
+def work(score):
+    X = np.random.default_rng(os.getpid()).standard_normal((100, 6)).astype(np.float32)
+    score(X)
+
+MODEL_PATH, mode, workers, preload = sys.argv[1], sys.argv[2], int(sys.argv[3]), sys.argv[4] == '1'
+import sklearn.ensemble  # import cost is shared by every scenario, keep it out of the timing
+result = {'mode': mode, 'preload': preload, 'workers': []}
+if preload:
+    score, result['load_seconds'] = load(mode)
+
+readers = []
+for _ in range(workers):
+    r, w = os.pipe()
+    if os.fork() == 0:
+        os.close(r)
+        report = {}
+        if not preload:
+            score, report['load_seconds'] = load(mode)
+        work(score)
+        report.update(memory())
+        os.write(w, json.dumps(report).encode())
+        os._exit(0)
+    os.close(w)
+    readers.append(r)
+for r in readers:
+    with os.fdopen(r) as f:
+        result['workers'].append(json.loads(f.read()))
+    os.wait()
+print(json.dumps(result))
+'''
+
+SCENARIOS = [
+    ('joblib', False),
+    ('joblib', True),
+    ('auto', False),
+    ('auto', True),
+    ('compiled', False),
+    ('compiled', True),
+]
+
+def run_scenario(model_path, mode, workers, preload):
+    out = subprocess.run([sys.executable, '-c', _SCENARIO, model_path, mode, str(workers), '1' if preload else '0'],
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--model', default='final_rf_model.joblib')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--json', action='store_true', help='print raw results as JSON')
+    args = parser.parse_args()
+    if not hasattr(os, 'fork'):
+        sys.exit("This benchmark needs os.fork (Linux/macOS).")
+
+    # Build the compiled artifact up front so no scenario pays for compilation
+    import model_store
+    model_store.load_model(args.model, engine='compiled')
+
+    results = [run_scenario(args.model, mode, args.workers, preload) for mode, preload in SCENARIOS]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'engine':>9} {'loading':>15} {'cold start s':>13} {'RSS MiB':>8} {'PSS MiB':>8} {'private MiB':>12}")
+    for result in results:
+        workers = result['workers']
+        load_seconds = result.get('load_seconds') or max(w['load_seconds'] for w in workers)
+        mean = lambda key: sum(w.get(key, 0) for w in workers) / len(workers)
+        where = 'preloaded' if result['preload'] else 'per-worker load'
+        print(f"{result['mode']:>9} {where:>15} {load_seconds:>13.3f} {mean('Rss'):>8.1f} "
+              f"{mean('Pss'):>8.1f} {mean('Private'):>12.1f}")
+
+if __name__ == "__main__":
+    main()
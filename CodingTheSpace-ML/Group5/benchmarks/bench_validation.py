@@ -0,0 +1,67 @@
+"""
+Compare the step-by-step validation chain with the compiled ValidationPlan.
+
+    python -m benchmarks.bench_validation --rows 1000000
+"""
+import argparse
+import contextlib
+import io
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic import make_neo_frame
+from validation import (
+    REQUIRED_COLUMNS,
+    DEFAULT_MEANS,
+    ValidationPlan,
+    validate_required_columns,
+    validate_missing_values,
+    validate_numeric_columns,
+    validate_row_count,
+    remove_duplicates,
+)
+
+# The function chain backend.validate_input_data used before the plan
+def run_chain(df):
+    df = validate_required_columns(df, REQUIRED_COLUMNS, DEFAULT_MEANS)
+    df = validate_missing_values(df, DEFAULT_MEANS)
+    validate_numeric_columns(df, REQUIRED_COLUMNS)
+    validate_row_count(df)
+    df = remove_duplicates(df)
+    return df[REQUIRED_COLUMNS]
+
+def run_plan(df, plan):
+    return plan.apply(df)
+
+def best_of(fn, df, repeat):
+    timings = []
+    for _ in range(repeat):
+        frame = df.copy()
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = fn(frame)
+            timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    # Only the required columns carry gaps: the chain rejects gaps in columns without a default
+    df = make_neo_frame(args.rows, missing_columns=REQUIRED_COLUMNS)
+    plan = ValidationPlan(REQUIRED_COLUMNS, DEFAULT_MEANS)
+
+    chain_time, chain_df = best_of(run_chain, df, args.repeat)
+    plan_time, plan_df = best_of(lambda frame: run_plan(frame, plan), df, args.repeat)
+    pd.testing.assert_frame_equal(chain_df, plan_df)
+
+    print(f"rows: {args.rows:,}  kept after de-duplication: {len(plan_df):,}")
+    print(f"function chain:  {chain_time:.3f}s")
+    print(f"validation plan: {plan_time:.3f}s")
+    print(f"speedup: {chain_time / plan_time:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Cold-start import time of the entry-point modules, with baseline checks.
+
+    python -m benchmarks.importtime
+    python -m benchmarks.importtime --baseline benchmarks/importtime_baseline.json   # exit 1 on regressions
+    python -m benchmarks.importtime --save-baseline benchmarks/importtime_baseline.json
+
+Each module is imported --repeat times in a fresh interpreter under
+`python -X importtime`. The best cumulative time of the module itself is
+reported, together with its heaviest direct imports, so a regression points
+at the dependency that caused it. Byte-code caches are warm after the first
+run, so this measures process cold start, not a cold disk.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+MODULES = ['backend', 'cleaning', 'validation']
+TOP_IMPORTS = 5
+
+def parse_importtime(stderr):
+    """(name, level, self_us, cumulative_us) for each line of -X importtime output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # the header line
+        name = fields[2][1:]
+        level = (len(name) - len(name.lstrip(' '))) // 2
+        rows.append((name.strip(), level, int(fields[0]), int(fields[1])))
+    return rows
+
+def import_once(module, cwd):
+    """Import module in a fresh interpreter; returns its own cumulative ms and its direct imports."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=cwd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    rows = parse_importtime(result.stderr)
+    # Lines are printed when an import finishes, so the module's children come right before it
+    for i, (name, level, _, cumulative) in enumerate(rows):
+        if name == module and level == 0:
+            children = []
+            for child, child_level, _, child_cumulative in reversed(rows[:i]):
+                if child_level == 0:
+                    break
+                if child_level == 1:
+                    children.append((child, child_cumulative / 1e3))
+            return cumulative / 1e3, sorted(children, key=lambda item: -item[1])
+    raise RuntimeError(f"No importtime line for {module}")
+
+def measure(module, repeat, cwd):
+    runs = [import_once(module, cwd) for _ in range(repeat)]
+    best_ms, children = min(runs, key=lambda run: run[0])
+    return {
+        'module': module,
+        'import_ms': round(best_ms, 1),
+        'heaviest': [[name, round(ms, 1)] for name, ms in children[:TOP_IMPORTS]],
+    }
+
+def regressions(results, baseline, tolerance, min_ms):
+    """Modules whose import time grew by more than tolerance (and min_ms) over the baseline."""
+    stored = {r['module']: r for r in baseline['results']}
+    found = []
+    for result in results:
+        before = stored.get(result['module'])
+        if before is None:
+            continue
+        if result['import_ms'] > before['import_ms'] * (1 + tolerance) and \
+                result['import_ms'] - before['import_ms'] > min_ms:
+            found.append({'module': result['module'], 'import_ms': [before['import_ms'], result['import_ms']]})
+    return found
+
+def main():
+    from benchmarks.suite import environment
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--modules', nargs='+', default=MODULES)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--out', help='write the results JSON here instead of stdout')
+    parser.add_argument('--baseline', help='compare against this results JSON and fail on regressions')
+    parser.add_argument('--save-baseline', help='write the results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed relative slowdown')
+    parser.add_argument('--min-ms', type=float, default=25.0, help='ignore smaller absolute slowdowns')
+    args = parser.parse_args()
+
+    cwd = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    results = []
+    for module in args.modules:
+        result = measure(module, args.repeat, cwd)
+        heaviest = ', '.join(f"{name} {ms:.0f}" for name, ms in result['heaviest'])
+        print(f"{module:>12} {result['import_ms']:>8.1f} ms   ({heaviest})", file=sys.stderr)
+        results.append(result)
+
+    report = {'environment': environment(), 'results': results}
+    if args.baseline:
+        with open(args.baseline) as f:
+            report['regressions'] = regressions(results, json.load(f), args.tolerance, args.min_ms)
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            f.write(text + '\n')
+
+    if report.get('regressions'):
+        for item in report['regressions']:
+            print(f"REGRESSION import {item['module']}: {item['import_ms'][0]:.1f} -> {item['import_ms'][1]:.1f} ms",
+                  file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Load-test /predict with many small concurrent uploads, with and without micro-batching.
+
+    python -m benchmarks.load_test --clients 32 --requests 20 --rows 5
+    python -m benchmarks.load_test --url http://localhost:5000/predict
+
+Without --url both modes run in-process through the Flask test client, with
+backend.batcher switched on and off. With --url the harness only measures the
+running server as it is configured (start it with MICROBATCH=1 to compare).
+The prediction cache is disabled in-process so every row reaches the model.
+"""
+import argparse
+import threading
+import time
+import urllib.request
+
+import numpy as np
+
+from benchmarks.synthetic import make_neo_frame
+
+def make_payloads(n, rows, seed=0):
+    """Distinct small CSV uploads so no two requests share rows."""
+    frame = make_neo_frame(n * rows, missing_rate=0.0, duplicate_rate=0.0, seed=seed)
+    return [frame.iloc[i * rows:(i + 1) * rows].to_csv(index=False).encode() for i in range(n)]
+
+def in_process_poster():
+    import backend
+    client = backend.app.test_client()
+
+    def post(body):
+        response = client.post('/predict', data=body, content_type='text/csv')
+        if response.status_code != 200:
+            raise RuntimeError(response.get_data(as_text=True))
+    return post
+
+def http_poster(url):
+    def post(body):
+        request = urllib.request.Request(url, data=body, headers={'Content-Type': 'text/csv'})
+        with urllib.request.urlopen(request) as response:
+            response.read()
+    return post
+
+def run(post, payloads, clients):
+    """Fire payloads from `clients` threads and return wall time and per-request latencies."""
+    latencies = []
+    lock = threading.Lock()
+    shares = [payloads[i::clients] for i in range(clients)]
+
+    def client(share):
+        mine = []
+        for body in share:
+            start = time.perf_counter()
+            post(body)
+            mine.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(mine)
+
+    threads = [threading.Thread(target=client, args=(share,)) for share in shares]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, np.array(latencies)
+
+def report(label, wall, latencies, rows):
+    n = len(latencies)
+    print(f"{label:>14}: {n / wall:8.1f} req/s {n * rows / wall:10.1f} rows/s  "
+          f"p50 {np.percentile(latencies, 50) * 1e3:7.1f} ms  p99 {np.percentile(latencies, 99) * 1e3:7.1f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=20, help='requests per client')
+    parser.add_argument('--rows', type=int, default=5, help='rows per request')
+    parser.add_argument('--url', help='load-test a running server instead of the in-process app')
+    args = parser.parse_args()
+
+    payloads = make_payloads(args.clients * args.requests, args.rows)
+    if args.url:
+        wall, latencies = run(http_poster(args.url), payloads, args.clients)
+        report('server', wall, latencies, args.rows)
+        return
+
+    import backend
+    from batcher import MicroBatcher
+
+    backend.prediction_cache.max_rows = 0
+    backend.get_model()
+    post = in_process_poster()
+    run(post, payloads[:args.clients], args.clients)  # warm-up
+
+    backend.batcher = None
+    wall, latencies = run(post, payloads, args.clients)
+    report('unbatched', wall, latencies, args.rows)
+
+    backend.batcher = MicroBatcher(backend.score_features)
+    wall, latencies = run(post, payloads, args.clients)
+    report('micro-batched', wall, latencies, args.rows)
+    stats = backend.batcher.stats()
+    print(f"{stats['batches']} model calls for {stats['requests']} requests "
+          f"(mean {stats['mean_requests_per_batch']:.1f} requests, {stats['mean_batch_rows']:.0f} rows per call)")
+
+if __name__ == "__main__":
+    main()
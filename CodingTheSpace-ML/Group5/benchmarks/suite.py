@@ -0,0 +1,276 @@
+"""
+End-to-end benchmark suite for the hazard prediction path, with baseline checks.
+
+    python -m benchmarks.suite --sizes 1k 100k --out results.json
+    python -m benchmarks.suite --baseline benchmarks/baseline.json     # exit 1 on regressions
+    python -m benchmarks.suite --save-baseline benchmarks/baseline.json
+
+For each size (1k, 100k, 10M rows; 10M is opt-in) a synthetic NEO CSV with
+injected gaps and duplicates is written once to --data-dir. These stages are
+then timed on their own:
+- validation.validate_input_data (offline file validation);
+- backend.validate_input_data (the /predict CSV path);
+- every cleaning.main step, on a raw nasa.csv-shaped frame (input copies untimed);
+- model.predict with final_rf_model.joblib;
+- the Flask /predict route through the test client, with the prediction cache off.
+
+Each case reports:
+- best wall time over --repeat runs, and throughput in rows/s;
+- peak RSS while it ran (sampled from /proc);
+- peak Python allocations (tracemalloc, measured in one extra run).
+
+Results are written as JSON. With --baseline, a case regresses when its time
+or allocation peak grows by more than --tolerance over the stored result
+(times under --min-seconds are ignored as noise).
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import make_neo_frame, make_raw_nasa_frame
+
+SIZES = {'1k': 1_000, '100k': 100_000, '10M': 10_000_000}
+DEFAULT_SIZES = ['1k', '100k']
+MODEL_PATH = 'final_rf_model.joblib'
+
+def current_rss():
+    """Resident set size of this process in bytes."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        # No /proc (macOS): fall back to the lifetime peak
+        scale = 1 if sys.platform == 'darwin' else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+class RssSampler:
+    """Track the peak RSS of this process while a block runs."""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.start_rss = self.peak = current_rss()
+        self._stop = threading.Event()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, current_rss())
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, current_rss())
+
+def measure(fn, repeat, setup=None):
+    """
+    Best wall time, peak RSS and RSS growth over repeat runs, plus a traced
+    run for allocations. With setup, fn gets a fresh setup() result each run
+    and setup itself is not timed.
+    """
+    timings = []
+    with RssSampler() as rss:
+        for _ in range(repeat):
+            args = (setup(),) if setup is not None else ()
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                fn(*args)
+                timings.append(time.perf_counter() - start)
+    args = (setup(),) if setup is not None else ()
+    tracemalloc.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            fn(*args)
+        _, alloc_peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    mib = 1024 * 1024
+    return {
+        'seconds': min(timings),
+        'peak_rss_mb': round(rss.peak / mib, 1),
+        'rss_growth_mb': round((rss.peak - rss.start_rss) / mib, 1),
+        'alloc_peak_mb': round(alloc_peak / mib, 2),
+    }
+
+def dataset_paths(size, rows, data_dir):
+    """Cleaned-schema and raw-schema CSVs for one size, generated once and reused."""
+    os.makedirs(data_dir, exist_ok=True)
+    paths = {}
+    for kind, make in (('cleaned', make_neo_frame), ('raw', make_raw_nasa_frame)):
+        path = os.path.join(data_dir, f"neo_{kind}_{size}.csv")
+        if not os.path.exists(path):
+            tmp = path + '.tmp'
+            make(rows).to_csv(tmp, index=False)
+            os.replace(tmp, path)
+        paths[kind] = path
+    return paths
+
+def validation_cases(paths):
+    import backend
+    import validation
+    from model_store import get_model
+
+    plan = get_model().validation_plan('scaled')
+    with open(paths['cleaned'], 'rb') as f:
+        csv_data = f.read()  # /predict hands the upload bytes to the parser
+    return [
+        ('validation.validate_input_data', lambda: validation.validate_input_data(paths['cleaned'])),
+        ('backend.validate_input_data', lambda: backend.validate_input_data(csv_data, plan)),
+    ]
+
+def cleaning_cases(paths):
+    import cleaning
+
+    raw = pd.read_csv(paths['raw'])
+    # Each step starts from the output of the previous one, as in cleaning.main
+    steps = [
+        ('drop_irrelevant_features', cleaning.drop_irrelevant_features),
+        ('handle_missing_values', cleaning.handle_missing_values),
+        ('remove_duplicates', cleaning.remove_duplicates),
+        ('convert_data_types', cleaning.convert_data_types),
+        ('create_features', cleaning.create_features),
+        ('drop_highly_correlated_features', cleaning.drop_highly_correlated_features),
+        ('standardize_features', cleaning.standardize_features),
+    ]
+    cases, frame = [], raw
+    for name, step in steps:
+        # The steps work in place, so every run gets a fresh (untimed) copy of its input
+        cases.append((f"cleaning.{name}", step, frame.copy))
+        with contextlib.redirect_stdout(io.StringIO()):
+            frame = step(frame.copy())
+    return cases
+
+def model_cases(paths):
+    import joblib
+    from inference import build_feature_matrix, model_feature_order
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        model = joblib.load(MODEL_PATH)
+    df = pd.read_csv(paths['cleaned']).fillna(0.0)
+    X = build_feature_matrix(df, model_feature_order(model))
+    return [('model.predict', lambda: model.predict(X))]
+
+def flask_cases(paths):
+    import backend
+
+    backend.prediction_cache.max_rows = 0
+    client = backend.app.test_client()
+    with open(paths['cleaned'], 'rb') as f:
+        body = f.read()
+
+    def post():
+        response = client.post('/predict', data=body, content_type='text/csv')
+        if response.status_code != 200:
+            raise RuntimeError(response.get_data(as_text=True))
+    return [('flask./predict', post)]
+
+CASE_GROUPS = {
+    'validation': validation_cases,
+    'cleaning': cleaning_cases,
+    'model': model_cases,
+    'flask': flask_cases,
+}
+
+def run_suite(sizes, groups, repeat, data_dir):
+    results = []
+    for size in sizes:
+        rows = SIZES[size]
+        paths = dataset_paths(size, rows, data_dir)
+        for group in groups:
+            for case, fn, *setup in CASE_GROUPS[group](paths):
+                result = {'case': case, 'size': size, 'rows': rows, **measure(fn, repeat, *setup)}
+                result['rows_per_sec'] = round(rows / result['seconds'], 1)
+                print(f"{case:>45} {size:>5} {result['seconds'] * 1e3:>10.1f} ms "
+                      f"{result['rows_per_sec']:>14,.0f} rows/s {result['peak_rss_mb']:>8.1f} MiB RSS "
+                      f"{result['alloc_peak_mb']:>8.1f} MiB alloc", file=sys.stderr)
+                results.append(result)
+    return results
+
+def environment():
+    import sklearn
+
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'sklearn': sklearn.__version__,
+    }
+
+def regressions(results, baseline, tolerance, min_seconds):
+    """Cases slower or allocating more than tolerance over the baseline."""
+    stored = {(r['case'], r['size']): r for r in baseline['results']}
+    found = []
+    for result in results:
+        before = stored.get((result['case'], result['size']))
+        if before is None:
+            continue
+        slower = result['seconds'] > before['seconds'] * (1 + tolerance) and \
+            result['seconds'] - before['seconds'] > min_seconds
+        heavier = result['alloc_peak_mb'] > before['alloc_peak_mb'] * (1 + tolerance) and \
+            result['alloc_peak_mb'] - before['alloc_peak_mb'] > 1.0
+        if slower or heavier:
+            found.append({
+                'case': result['case'], 'size': result['size'],
+                'seconds': [before['seconds'], result['seconds']],
+                'alloc_peak_mb': [before['alloc_peak_mb'], result['alloc_peak_mb']],
+            })
+    return found
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', nargs='+', choices=list(SIZES), default=DEFAULT_SIZES)
+    parser.add_argument('--groups', nargs='+', choices=list(CASE_GROUPS), default=list(CASE_GROUPS))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--data-dir', default=os.path.join('benchmarks', 'data'))
+    parser.add_argument('--out', help='write the results JSON here instead of stdout')
+    parser.add_argument('--baseline', help='compare against this results JSON and fail on regressions')
+    parser.add_argument('--save-baseline', help='write the results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed relative slowdown')
+    parser.add_argument('--min-seconds', type=float, default=0.005, help='ignore smaller absolute slowdowns')
+    args = parser.parse_args()
+
+    report = {
+        'environment': environment(),
+        'results': run_suite(args.sizes, args.groups, args.repeat, args.data_dir),
+    }
+    if args.baseline:
+        with open(args.baseline) as f:
+            report['regressions'] = regressions(report['results'], json.load(f), args.tolerance, args.min_seconds)
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            f.write(text + '\n')
+
+    if report.get('regressions'):
+        for item in report['regressions']:
+            print(f"REGRESSION {item['case']} [{item['size']}]: {item['seconds'][0]:.4f}s -> "
+                  f"{item['seconds'][1]:.4f}s, {item['alloc_peak_mb'][0]} -> {item['alloc_peak_mb'][1]} MiB",
+                  file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+import numpy as np
+import pandas as pd
+
+# Columns of cleaned_nasa_data1.csv, in file order
+FEATURE_COLUMNS = [
+    'Absolute Magnitude',
+    'Relative Velocity km per sec',
+    'Miss Dist.(kilometers)',
+    'Orbit Uncertainity',
+    'Minimum Orbit Intersection',
+    'Jupiter Tisserand Invariant',
+    'Eccentricity',
+    'Inclination',
+    'Asc Node Longitude',
+    'Perihelion Distance',
+    'Perihelion Arg',
+    'Perihelion Time',
+    'Mean Anomaly',
+    'Avg_Diameter_KM'
+]
+
+# Generate a standardized NEO frame with the cleaned dataset's schema
+def make_neo_frame(n_rows, missing_rate=0.01, duplicate_rate=0.05, missing_columns=None,
+                   hazardous_rate=0.16, seed=42):
+    """
+    Build a synthetic frame matching cleaned_nasa_data1.csv. A share of rows is
+    copied over earlier rows to create duplicates and at most one value per row
+    is blanked in missing_columns (default: all features) to create gaps.
+    """
+    rng = np.random.default_rng(seed)
+    X = rng.standard_normal((n_rows, len(FEATURE_COLUMNS)))
+    y = (rng.random(n_rows) < hazardous_rate).astype(np.int64)
+
+    n_dup = int(n_rows * duplicate_rate)
+    if n_dup and n_rows > 1:
+        targets = rng.choice(np.arange(1, n_rows), size=n_dup, replace=False)
+        sources = rng.integers(0, targets)
+        X[targets] = X[sources]
+        y[targets] = y[sources]
+
+    missing_columns = missing_columns or FEATURE_COLUMNS
+    col_idx = np.array([FEATURE_COLUMNS.index(col) for col in missing_columns])
+    n_missing = int(n_rows * missing_rate)
+    if n_missing:
+        rows = rng.choice(n_rows, size=n_missing, replace=False)
+        X[rows, rng.choice(col_idx, size=n_missing)] = np.nan
+
+    df = pd.DataFrame(X, columns=FEATURE_COLUMNS)
+    df['Hazardous'] = y
+    return df
+
+# Write a synthetic frame to CSV and return the path
+def write_neo_csv(path, n_rows, **kwargs):
+    make_neo_frame(n_rows, **kwargs).to_csv(path, index=False)
+    return path
+
+# Columns of the raw Kaggle nasa.csv that cleaning.py starts from, in file order
+RAW_COLUMNS = [
+    'Neo Reference ID', 'Name', 'Absolute Magnitude',
+    'Est Dia in KM(min)', 'Est Dia in KM(max)', 'Est Dia in M(min)', 'Est Dia in M(max)',
+    'Est Dia in Miles(min)', 'Est Dia in Miles(max)', 'Est Dia in Feet(min)', 'Est Dia in Feet(max)',
+    'Close Approach Date', 'Epoch Date Close Approach', 'Relative Velocity km per sec',
+    'Relative Velocity km per hr', 'Miles per hour', 'Miss Dist.(Astronomical)', 'Miss Dist.(lunar)',
+    'Miss Dist.(kilometers)', 'Miss Dist.(miles)', 'Orbiting Body', 'Orbit ID',
+    'Orbit Determination Date', 'Orbit Uncertainity', 'Minimum Orbit Intersection',
+    'Jupiter Tisserand Invariant', 'Epoch Osculation', 'Eccentricity', 'Semi Major Axis',
+    'Inclination', 'Asc Node Longitude', 'Orbital Period', 'Perihelion Distance', 'Perihelion Arg',
+    'Aphelion Dist', 'Perihelion Time', 'Mean Anomaly', 'Mean Motion', 'Equinox', 'Hazardous'
+]
+
+# Generate a frame with the raw nasa.csv schema and physically related columns
+def make_raw_nasa_frame(n_rows, missing_rate=0.01, duplicate_rate=0.05, seed=42):
+    """
+    Build a synthetic raw NEO catalogue. Unit conversions and orbital relations
+    are derived from a few base quantities, so cleaning.py finds the same highly
+    correlated columns as in the real data. Gaps are injected into a few numeric
+    columns and a share of rows duplicates earlier ones.
+    """
+    rng = np.random.default_rng(seed)
+    magnitude = rng.normal(22.3, 2.9, n_rows)
+    dia_min = 10 ** (3.1295 - 0.2 * magnitude) / np.sqrt(0.25)
+    dia_max = dia_min * 2.2361
+    velocity = rng.gamma(4.0, 3.5, n_rows)
+    miss_au = rng.uniform(0.0001, 0.5, n_rows)
+    eccentricity = rng.beta(2.5, 3.5, n_rows)
+    perihelion = rng.uniform(0.1, 1.3, n_rows)
+    semi_major = perihelion / (1 - eccentricity)
+    period = 365.25 * semi_major ** 1.5
+    inclination = rng.gamma(1.6, 8.0, n_rows)
+    tisserand = 5.2 / semi_major + 2 * np.sqrt((1 - eccentricity ** 2) * semi_major / 5.2) * np.cos(np.radians(inclination))
+    hazardous = (rng.random(n_rows) < 0.16) | ((magnitude < 22) & (rng.random(n_rows) < 0.5))
+
+    df = pd.DataFrame({
+        'Neo Reference ID': rng.integers(2_000_000, 4_000_000, n_rows),
+        'Name': rng.integers(2_000_000, 4_000_000, n_rows),
+        'Absolute Magnitude': magnitude,
+        'Est Dia in KM(min)': dia_min,
+        'Est Dia in KM(max)': dia_max,
+        'Est Dia in M(min)': dia_min * 1e3,
+        'Est Dia in M(max)': dia_max * 1e3,
+        'Est Dia in Miles(min)': dia_min * 0.621371,
+        'Est Dia in Miles(max)': dia_max * 0.621371,
+        'Est Dia in Feet(min)': dia_min * 3280.84,
+        'Est Dia in Feet(max)': dia_max * 3280.84,
+        'Close Approach Date': '1995-01-01',
+        'Epoch Date Close Approach': rng.integers(788_947_200_000, 1_473_318_000_000, n_rows),
+        'Relative Velocity km per sec': velocity,
+        'Relative Velocity km per hr': velocity * 3600,
+        'Miles per hour': velocity * 2236.94,
+        'Miss Dist.(Astronomical)': miss_au,
+        'Miss Dist.(lunar)': miss_au * 389.17,
+        'Miss Dist.(kilometers)': miss_au * 149_597_870.7,
+        'Miss Dist.(miles)': miss_au * 92_955_807.3,
+        'Orbiting Body': 'Earth',
+        'Orbit ID': rng.integers(1, 200, n_rows),
+        'Orbit Determination Date': '2017-04-06 08:36:37',
+        'Orbit Uncertainity': rng.integers(0, 10, n_rows),
+        'Minimum Orbit Intersection': rng.exponential(0.08, n_rows),
+        'Jupiter Tisserand Invariant': tisserand,
+        'Epoch Osculation': rng.uniform(2_450_000.5, 2_458_000.5, n_rows),
+        'Eccentricity': eccentricity,
+        'Semi Major Axis': semi_major,
+        'Inclination': inclination,
+        'Asc Node Longitude': rng.uniform(0, 360, n_rows),
+        'Orbital Period': period,
+        'Perihelion Distance': perihelion,
+        'Perihelion Arg': rng.uniform(0, 360, n_rows),
+        'Aphelion Dist': semi_major * (1 + eccentricity),
+        'Perihelion Time': rng.normal(2_457_700, 800, n_rows),
+        'Mean Anomaly': rng.uniform(0, 360, n_rows),
+        'Mean Motion': 360 / period,
+        'Equinox': 'J2000',
+        'Hazardous': hazardous,
+    })[RAW_COLUMNS]
+
+    n_dup = int(n_rows * duplicate_rate)
+    if n_dup and n_rows > 1:
+        targets = rng.choice(np.arange(1, n_rows), size=n_dup, replace=False)
+        df.iloc[targets] = df.iloc[rng.integers(0, targets)].to_numpy()
+        df = df.astype({col: dtype for col, dtype in zip(df.columns, df.infer_objects().dtypes)})
+
+    for col in ['Relative Velocity km per sec', 'Inclination', 'Jupiter Tisserand Invariant']:
+        rows = rng.random(n_rows) < missing_rate
+        df.loc[rows, col] = np.nan
+    return df
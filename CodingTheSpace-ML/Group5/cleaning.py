@@ -1,23 +1,27 @@
 import pandas as pd
-import numpy as np
-from sklearn.preprocessing import StandardScaler
-import matplotlib.pyplot as plt
-import seaborn as sns
+
+import csv_reader
+from correlation import accumulate
+from preprocessing import Preprocessing
 
 def load_data(filepath):
-    return pd.read_csv(filepath)
+    # The columns drop_irrelevant_features removes are never parsed
+    columns = [col for col in csv_reader.header_columns(filepath) if col not in IRRELEVANT_COLUMNS]
+    return csv_reader.read_csv(filepath, columns)
+
+# Identifiers, dates and unit duplicates of other columns
+IRRELEVANT_COLUMNS = [
+    'Neo Reference ID', 'Name', 'Orbit ID', 'Orbit Determination Date',
+    'Epoch Osculation', 'Equinox', 'Epoch Date Close Approach', 'Close Approach Date',
+    'Est Dia in M(min)', 'Est Dia in M(max)',
+    'Est Dia in Miles(min)', 'Est Dia in Miles(max)',
+    'Est Dia in Feet(min)', 'Est Dia in Feet(max)',
+    'Relative Velocity km per hr', 'Miles per hour',
+    'Miss Dist.(Astronomical)', 'Miss Dist.(lunar)', 'Miss Dist.(miles)'
+]
 
 def drop_irrelevant_features(df):
-    columns_to_drop = [
-        'Neo Reference ID', 'Name', 'Orbit ID', 'Orbit Determination Date',
-        'Epoch Osculation', 'Equinox', 'Epoch Date Close Approach', 'Close Approach Date',
-        'Est Dia in M(min)', 'Est Dia in M(max)',
-        'Est Dia in Miles(min)', 'Est Dia in Miles(max)',
-        'Est Dia in Feet(min)', 'Est Dia in Feet(max)',
-        'Relative Velocity km per hr', 'Miles per hour',
-        'Miss Dist.(Astronomical)', 'Miss Dist.(lunar)', 'Miss Dist.(miles)'
-    ]
-    df.drop(columns=columns_to_drop, inplace=True, errors='ignore')
+    df.drop(columns=IRRELEVANT_COLUMNS, inplace=True, errors='ignore')
     return df
 
 def print_missing_values(df):
@@ -25,12 +29,19 @@ def print_missing_values(df):
     missing = df.isnull().sum()
     print(missing[missing > 0] if not missing[missing > 0].empty else "No missing values found.")
 
-def handle_missing_values(df):
+def numeric_fill_values(df):
+    # Medians of the numerical columns, saved with the preprocessing artifact
+    num_cols = df.select_dtypes(include=['float64', 'int64']).columns
+    return df[num_cols].median()
+
+def handle_missing_values(df, fill_values=None):
     print_missing_values(df)
 
     # Fill numerical missing values with median
+    if fill_values is None:
+        fill_values = numeric_fill_values(df)
     num_cols = df.select_dtypes(include=['float64', 'int64']).columns
-    df[num_cols] = df[num_cols].fillna(df[num_cols].median())
+    df[num_cols] = df[num_cols].fillna(fill_values)
 
     # Drop categorical columns with more than 50% missing values
     threshold = 0.5 * len(df)
@@ -62,42 +73,61 @@ def create_features(df):
     return df
 
 def drop_highly_correlated_features(df, threshold=0.9):
-    corr_matrix = df.drop(columns=['Hazardous']).corr().abs()
-    upper = corr_matrix.where(np.triu(np.ones(corr_matrix.shape), k=1).astype(bool))
-    to_drop = [col for col in upper.columns if any(upper[col] > threshold)]
+    # A column is dropped when any earlier column correlates above the threshold
+    to_drop = accumulate(df.drop(columns=['Hazardous'])).correlated_columns(threshold)
     df.drop(columns=to_drop, inplace=True)
     return df
 
-def standardize_features(df):
+def fit_scaler(df):
+    from sklearn.preprocessing import StandardScaler  # deferred: importing sklearn takes about a second
+
     features = df.select_dtypes(include=['float64', 'int64']).drop(columns=['Hazardous']).columns
-    scaler = StandardScaler()
-    scaled_data = scaler.fit_transform(df[features])
+    return StandardScaler().fit(df[features])
+
+def standardize_features(df, scaler=None):
+    scaler = scaler or fit_scaler(df)
+    features = scaler.feature_names_in_
+    scaled_data = scaler.transform(df[features])
     df_scaled = pd.DataFrame(scaled_data, columns=features)
     df_scaled['Hazardous'] = df['Hazardous'].values
     return df_scaled
 
 def check_class_balance(df):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    import plotting
+
     print("\nClass distribution:")
     print(df['Hazardous'].value_counts(normalize=True))
     sns.countplot(x='Hazardous', data=df)
     plt.title("Class Distribution (Hazardous vs Non-Hazardous)")
-    plt.show()
+    plotting.show(name="class_distribution")
 
 def main():
     # Load and preprocess data step by step
     df = load_data("nasa.csv")
+    raw_columns = list(df.columns)
     df = drop_irrelevant_features(df)
-    df = handle_missing_values(df)  # Now prints missing values before fixing
+    fill_values = numeric_fill_values(df)
+    df = handle_missing_values(df, fill_values)  # Now prints missing values before fixing
     df = remove_duplicates(df)
     df = convert_data_types(df)
     df = create_features(df)
     df = drop_highly_correlated_features(df)
-    df_scaled = standardize_features(df)
+    scaler = fit_scaler(df)
+    df_scaled = standardize_features(df, scaler)
     check_class_balance(df_scaled)
 
     # Save cleaned data
     df_scaled.to_csv("cleaned_nasa_data1.csv", index=False)
 
+    # Save the fitted statistics so inference can reuse them
+    # (bundle with the model with: python preprocessing.py bundle preprocessing.json <model>)
+    fill_values = {col: fill_values.get(col, df[col].median()) for col in scaler.feature_names_in_}
+    dropped = [col for col in raw_columns if col not in df.columns]
+    Preprocessing.from_scaler(scaler, fill_values, dropped).save("preprocessing.json")
+
     print("\nFinal features used:")
     print(list(df_scaled.columns))
 
@@ -0,0 +1,237 @@
+"""
+Out-of-core version of cleaning.main for NASA catalogues larger than RAM.
+
+The raw CSV is read twice in fixed-size chunks and memory stays bounded by the
+chunk size:
+
+1. The first pass feeds every numeric column into a mergeable quantile sketch
+   (medians), counts categories (modes) and fingerprints rows to find
+   duplicates. For first occurrences it accumulates NaN-aware cross-products.
+   Those give the exact sums and cross-products of the median-filled columns
+   once the medians are known. The correlation filter and the StandardScaler
+   mean/variance are derived from them, including for Avg_Diameter_KM, which
+   is a linear combination of two raw columns.
+2. The second pass fills, de-duplicates, derives, drops and standardizes each
+   chunk and appends it to the output CSV.
+
+Differences from the in-memory pipeline: medians are exact up to the sketch
+size (8192 values per column) and approximate beyond it. Duplicates are found
+on the raw rows before filling, so two rows that only become equal through
+filling are both kept. The duplicate fingerprints are the only state that
+grows with the catalogue: a sorted uint64 array of 8 bytes per unique row, plus
+a temporary copy while a chunk's new fingerprints are merged in.
+
+    python cleaning_stream.py nasa.csv cleaned_nasa_data1.csv --chunksize 100000
+"""
+import argparse
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+import csv_reader
+from cleaning import IRRELEVANT_COLUMNS
+from preprocessing import Preprocessing
+from sketches import QuantileSketch
+
+TARGET = 'Hazardous'
+DIAMETER_SOURCES = ['Est Dia in KM(min)', 'Est Dia in KM(max)']
+DIAMETER_FEATURE = 'Avg_Diameter_KM'
+
+def read_chunks(path, chunksize):
+    """Yield raw chunks without the irrelevant columns, which are never parsed."""
+    columns = [col for col in csv_reader.header_columns(path) if col not in IRRELEVANT_COLUMNS]
+    with open(path, 'rb') as f:
+        yield from csv_reader.iter_csv(f, columns, chunksize=chunksize)
+
+class RowDeduplicator:
+    """Keeps the 64-bit fingerprint of every row seen so far, as a sorted uint64 array."""
+
+    def __init__(self):
+        self.seen = np.empty(0, dtype=np.uint64)
+
+    def first_occurrences(self, chunk):
+        """Boolean mask of the rows in chunk that were not seen before (in this or earlier chunks)."""
+        hashes = pd.util.hash_pandas_object(chunk, index=False).to_numpy(dtype=np.uint64)
+        # First occurrence of each fingerprint within the chunk
+        unique, first = np.unique(hashes, return_index=True)
+        # Of those, the ones no earlier chunk had
+        positions = np.searchsorted(self.seen, unique)
+        found = positions < len(self.seen)
+        found[found] = self.seen[positions[found]] == unique[found]
+        new = ~found
+        keep = np.zeros(len(hashes), dtype=bool)
+        keep[first[new]] = True
+        # unique is sorted, so inserting at the search positions keeps seen sorted
+        self.seen = np.insert(self.seen, positions[new], unique[new])
+        return keep
+
+class StreamingFit:
+    """Statistics gathered by the first pass and the cleaning decisions derived from them."""
+
+    def __init__(self, numeric_columns, other_columns, corr_threshold=0.9):
+        self.numeric_columns = numeric_columns
+        self.other_columns = other_columns
+        self.corr_threshold = corr_threshold
+        self.rows = 0
+        self.missing = Counter()
+        self.sketches = {col: QuantileSketch() for col in numeric_columns}
+        self.has_diameter = all(col in numeric_columns for col in DIAMETER_SOURCES)
+        if self.has_diameter:
+            self.sketches[DIAMETER_FEATURE] = QuantileSketch()
+        self.category_counts = {col: Counter() for col in other_columns}
+        self.target_counts = Counter()
+
+        # Cross-products over de-duplicated rows, on values shifted by a per-column
+        # reference to keep the sums well conditioned
+        p = len(numeric_columns)
+        self.shift = None
+        self.n = 0
+        self.sums = np.zeros(p)
+        self.present = np.zeros(p)
+        self.xx = np.zeros((p, p))   # sum x_i x_j over rows where both are present
+        self.xm = np.zeros((p, p))   # sum x_i over rows where j is missing
+        self.mm = np.zeros((p, p))   # rows where both i and j are missing
+
+    def update(self, chunk, keep):
+        self.rows += len(chunk)
+        self.missing.update(chunk.isnull().sum().to_dict())
+        X = chunk[self.numeric_columns].to_numpy(dtype=np.float64)
+        for j, col in enumerate(self.numeric_columns):
+            self.sketches[col].update(X[:, j])
+        if self.has_diameter:
+            # Fill value for the derived feature, from rows where both diameters are known
+            lo, hi = (self.numeric_columns.index(col) for col in DIAMETER_SOURCES)
+            self.sketches[DIAMETER_FEATURE].update((X[:, lo] + X[:, hi]) / 2)
+        for col in self.other_columns:
+            self.category_counts[col].update(chunk[col].dropna().tolist())
+
+        X = X[keep]
+        if self.shift is None:
+            with np.errstate(all='ignore'):
+                self.shift = np.nan_to_num(np.nanmean(X, axis=0)) if len(X) else np.zeros(X.shape[1])
+        X = X - self.shift
+        present = ~np.isnan(X)
+        X0 = np.where(present, X, 0.0)
+        absent = (~present).astype(np.float64)
+        self.n += len(X)
+        self.sums += X0.sum(axis=0)
+        self.present += present.sum(axis=0)
+        self.xx += X0.T @ X0
+        self.xm += X0.T @ absent
+        self.mm += absent.T @ absent
+        if TARGET in chunk.columns:
+            self.target_counts.update(chunk[TARGET][keep].astype(int).tolist())
+
+    def finalize(self):
+        """Derive fill values, the correlation drop list and the scaler parameters."""
+        self.medians = {col: sketch.quantile(0.5) for col, sketch in self.sketches.items()}
+        # Mode with the smallest value on ties, like Series.mode()[0]
+        self.modes = {col: min(counts.items(), key=lambda item: (-item[1], item[0]))[0]
+                      for col, counts in self.category_counts.items() if counts}
+
+        # Exact sums and cross-products of the median-filled columns (shifted units)
+        m = np.array([self.medians[col] for col in self.numeric_columns]) - self.shift
+        m = np.nan_to_num(m)
+        sums = self.sums + (self.n - self.present) * m
+        gram = self.xx + self.xm * m[np.newaxis, :] + m[:, np.newaxis] * self.xm.T + np.outer(m, m) * self.mm
+
+        # Output columns: raw numeric columns with the two diameters replaced by their mean
+        self.columns = [col for col in self.numeric_columns if col not in DIAMETER_SOURCES]
+        T = np.zeros((len(self.columns), len(self.numeric_columns)))
+        for i, col in enumerate(self.columns):
+            T[i, self.numeric_columns.index(col)] = 1.0
+        if self.has_diameter:
+            self.columns.append(DIAMETER_FEATURE)
+            row = np.zeros(len(self.numeric_columns))
+            for col in DIAMETER_SOURCES:
+                row[self.numeric_columns.index(col)] = 0.5
+            T = np.vstack([T, row])
+
+        mean_shifted = T @ sums / self.n
+        cov = T @ gram @ T.T / self.n - np.outer(mean_shifted, mean_shifted)
+        std = np.sqrt(np.clip(np.diag(cov), 0.0, None))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = np.abs(cov / np.outer(std, std))
+
+        # A column is dropped when any earlier column correlates above the threshold
+        upper = np.triu(corr > self.corr_threshold, k=1)
+        self.dropped = [col for j, col in enumerate(self.columns) if upper[:, j].any()]
+        keep = [j for j, col in enumerate(self.columns) if col not in self.dropped]
+        self.features = [self.columns[j] for j in keep]
+        self.mean = (mean_shifted + T @ self.shift)[keep]
+        scale = std[keep]
+        self.scale = np.where(scale == 0.0, 1.0, scale)
+        return self
+
+    def to_preprocessing(self, raw_columns):
+        """The fitted statistics as the artifact cleaning.main saves."""
+        dropped = [col for col in raw_columns if col not in self.features and col != TARGET]
+        return Preprocessing(self.features, dict(zip(self.features, self.mean)),
+                             dict(zip(self.features, self.scale)),
+                             {col: self.medians[col] for col in self.features}, dropped)
+
+def first_pass(path, chunksize, corr_threshold=0.9):
+    fit = None
+    dedup = RowDeduplicator()
+    for chunk in read_chunks(path, chunksize):
+        if fit is None:
+            numeric = [col for col in chunk.columns if col != TARGET
+                       and pd.api.types.is_numeric_dtype(chunk[col]) and not pd.api.types.is_bool_dtype(chunk[col])]
+            others = [col for col in chunk.columns if col != TARGET and col not in numeric]
+            fit = StreamingFit(numeric, others, corr_threshold)
+            fit.raw_columns = csv_reader.header_columns(path)
+        fit.update(chunk, dedup.first_occurrences(chunk))
+    if fit is None:
+        raise ValueError(f"'{path}' contains no rows.")
+    return fit.finalize()
+
+def second_pass(path, out_path, fit, chunksize):
+    dedup = RowDeduplicator()
+    fill = {col: value for col, value in fit.medians.items() if not np.isnan(value)}
+    written = 0
+    for i, chunk in enumerate(read_chunks(path, chunksize)):
+        chunk = chunk[dedup.first_occurrences(chunk)]
+        chunk = chunk.fillna(fill)
+        if DIAMETER_FEATURE in fit.features:
+            chunk[DIAMETER_FEATURE] = (chunk[DIAMETER_SOURCES[0]] + chunk[DIAMETER_SOURCES[1]]) / 2
+        scaled = (chunk[fit.features].to_numpy(dtype=np.float64) - fit.mean) / fit.scale
+        out = pd.DataFrame(scaled, columns=fit.features)
+        out[TARGET] = chunk[TARGET].astype(int).to_numpy()
+        out.to_csv(out_path, mode='w' if i == 0 else 'a', header=(i == 0), index=False)
+        written += len(out)
+    return written
+
+def clean_csv_streaming(path, out_path, chunksize=100_000, corr_threshold=0.9):
+    """Run both passes and return the StreamingFit with the statistics used."""
+    fit = first_pass(path, chunksize, corr_threshold)
+    fit.rows_written = second_pass(path, out_path, fit, chunksize)
+    return fit
+
+def main():
+    parser = argparse.ArgumentParser(description="Clean a raw NASA NEO catalogue in two streaming passes.")
+    parser.add_argument('input', nargs='?', default='nasa.csv')
+    parser.add_argument('output', nargs='?', default='cleaned_nasa_data1.csv')
+    parser.add_argument('--chunksize', type=int, default=100_000)
+    parser.add_argument('--threshold', type=float, default=0.9)
+    parser.add_argument('--preprocessing', default='preprocessing.json',
+                        help="where to save the fitted preprocessing artifact")
+    args = parser.parse_args()
+
+    fit = clean_csv_streaming(args.input, args.output, args.chunksize, args.threshold)
+    fit.to_preprocessing(fit.raw_columns).save(args.preprocessing)
+
+    missing = {col: count for col, count in fit.missing.items() if count}
+    print("\nMissing values per column:")
+    print(pd.Series(missing) if missing else "No missing values found.")
+    print(f"\nRows read: {fit.rows}, written after de-duplication: {fit.rows_written}")
+    print(f"Dropped highly correlated features: {fit.dropped}")
+    if fit.target_counts:
+        total = sum(fit.target_counts.values())
+        print("\nClass distribution:")
+        print(pd.Series({label: count / total for label, count in sorted(fit.target_counts.items())}))
+    print("\nFinal features used:")
+    print(fit.features + [TARGET])
+
+if __name__ == "__main__":
+    main()
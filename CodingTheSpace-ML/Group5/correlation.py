@@ -0,0 +1,171 @@
+"""
+Incremental Pearson correlation over row chunks.
+
+CorrelationAccumulator keeps, for every pair of columns (i, j), sums over
+the rows where both values are present:
+- n: the row count;
+- s: the sum of x_i;
+- q: the sum of x_i**2;
+- xx: the sum of x_i * x_j.
+
+These give the same pairwise-complete correlations as DataFrame.corr().
+Values are shifted by a per-column reference (the first chunk's mean) to
+keep the sums well conditioned.
+
+The cross-products are computed with BLAS, on column blocks of a
+Fortran-ordered chunk so each block stays in cache. When a chunk has no
+missing values only xx needs a matrix product.
+
+Adding rows only updates the sums. Accumulators from separate chunks or
+processes can be merged. Correlations are derived block by block, so
+threshold pairs are found without materializing a full p x p boolean mask.
+"""
+import numpy as np
+import pandas as pd
+
+# Columns per block and rows per sub-chunk of the cross-product updates
+BLOCK_COLUMNS = 128
+CHUNK_ROWS = 8192
+
+class CorrelationAccumulator:
+    """Mergeable sums for pairwise-complete Pearson correlations of a fixed set of columns."""
+
+    def __init__(self, columns, block=BLOCK_COLUMNS, shift=None):
+        self.columns = list(columns)
+        self.block = block
+        p = len(self.columns)
+        self.shift = None if shift is None else np.asarray(shift, dtype=np.float64)
+        self.rows = 0
+        self.n = np.zeros((p, p))
+        self.s = np.zeros((p, p))
+        self.q = np.zeros((p, p))
+        self.xx = np.zeros((p, p))
+
+    def _blocks(self):
+        p = len(self.columns)
+        return [slice(start, min(start + self.block, p)) for start in range(0, p, self.block)]
+
+    def update(self, data):
+        """Add rows from a DataFrame holding self.columns or from an (n, p) array."""
+        if isinstance(data, pd.DataFrame):
+            data = data[self.columns].to_numpy(dtype=np.float64, na_value=np.nan)
+        X = np.asarray(data, dtype=np.float64)
+        if self.shift is None:
+            with np.errstate(all='ignore'):
+                self.shift = np.nan_to_num(np.nanmean(X, axis=0)) if len(X) else np.zeros(X.shape[1])
+        for start in range(0, len(X), CHUNK_ROWS):
+            self._update_chunk(np.asfortranarray(X[start:start + CHUNK_ROWS] - self.shift))
+        self.rows += len(X)
+        return self
+
+    def _update_chunk(self, X):
+        present = ~np.isnan(X)
+        blocks = self._blocks()
+        if present.all():
+            # Every pair sees every row: the per-column sums broadcast across j
+            self.n += len(X)
+            self.s += X.sum(axis=0)[:, np.newaxis]
+            self.q += np.square(X).sum(axis=0)[:, np.newaxis]
+            for a, bi in enumerate(blocks):
+                for bj in blocks[a:]:
+                    self._add_block(self.xx, bi, bj, X[:, bi].T @ X[:, bj])
+            return
+        X0 = np.where(present, X, 0.0)
+        Q0 = np.square(X0)
+        P = present.astype(np.float64)
+        X0, Q0, P = np.asfortranarray(X0), np.asfortranarray(Q0), np.asfortranarray(P)
+        for a, bi in enumerate(blocks):
+            for bj in blocks[a:]:
+                self._add_block(self.xx, bi, bj, X0[:, bi].T @ X0[:, bj])
+                self._add_block(self.n, bi, bj, P[:, bi].T @ P[:, bj])
+                self.s[bi, bj] += X0[:, bi].T @ P[:, bj]
+                self.q[bi, bj] += Q0[:, bi].T @ P[:, bj]
+                if bi != bj:
+                    self.s[bj, bi] += X0[:, bj].T @ P[:, bi]
+                    self.q[bj, bi] += Q0[:, bj].T @ P[:, bi]
+
+    @staticmethod
+    def _add_block(target, bi, bj, values):
+        # Symmetric sums: fill both triangles from one product
+        target[bi, bj] += values
+        if bi != bj:
+            target[bj, bi] += values.T
+
+    def _reshift(self, shift):
+        # Re-express the sums for values shifted by a different reference
+        d = self.shift - shift
+        di, dj = d[:, np.newaxis], d[np.newaxis, :]
+        self.xx += dj * self.s + di * self.s.T + di * dj * self.n
+        self.q += 2 * di * self.s + di * di * self.n
+        self.s += di * self.n
+        self.shift = shift
+        return self
+
+    def merge(self, other):
+        if other.columns != self.columns:
+            raise ValueError("Cannot merge correlation accumulators over different columns")
+        if other.shift is None:
+            return self
+        if self.shift is None:
+            self.shift = other.shift.copy()
+        if not np.array_equal(other.shift, self.shift):
+            other = _copy(other)._reshift(self.shift)
+        self.rows += other.rows
+        self.n += other.n
+        self.s += other.s
+        self.q += other.q
+        self.xx += other.xx
+        return self
+
+    def corr_block(self, rows, cols):
+        """Correlations between the columns in slice rows and those in slice cols."""
+        n = self.n[rows, cols]
+        s_i, s_j = self.s[rows, cols], self.s[cols, rows].T
+        q_i, q_j = self.q[rows, cols], self.q[cols, rows].T
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cov = self.xx[rows, cols] - s_i * s_j / n
+            var_i = q_i - s_i * s_i / n
+            var_j = q_j - s_j * s_j / n
+            r = cov / np.sqrt(var_i * var_j)
+        r[(n < 2) | (var_i <= 0) | (var_j <= 0)] = np.nan
+        return np.clip(r, -1.0, 1.0)
+
+    def matrix(self):
+        """The full correlation matrix as a DataFrame, like DataFrame.corr()."""
+        p = len(self.columns)
+        r = self.corr_block(slice(0, p), slice(0, p))
+        np.fill_diagonal(r, np.where(np.diag(self.n) >= 2, 1.0, np.nan))
+        return pd.DataFrame(r, index=self.columns, columns=self.columns)
+
+    def pairs_above(self, threshold):
+        """(column_i, column_j, r) for i < j with |r| > threshold, found block by block."""
+        pairs = []
+        blocks = self._blocks()
+        for a, bi in enumerate(blocks):
+            for bj in blocks[a:]:
+                r = self.corr_block(bi, bj)
+                with np.errstate(invalid='ignore'):
+                    hits = np.abs(r) > threshold
+                if bi == bj:
+                    hits = np.triu(hits, k=1)
+                for i, j in zip(*np.nonzero(hits)):
+                    pairs.append((self.columns[bi.start + i], self.columns[bj.start + j], float(r[i, j])))
+        return pairs
+
+    def correlated_columns(self, threshold=0.9):
+        """Columns that correlate above threshold with any earlier column, in column order."""
+        later = {col_j for _, col_j, _ in self.pairs_above(threshold)}
+        return [col for col in self.columns if col in later]
+
+def _copy(acc):
+    clone = CorrelationAccumulator(acc.columns, acc.block, acc.shift.copy())
+    clone.rows = acc.rows
+    clone.n, clone.s, clone.q, clone.xx = acc.n.copy(), acc.s.copy(), acc.q.copy(), acc.xx.copy()
+    return clone
+
+def accumulate(df, columns=None, chunk_rows=1 << 20):
+    """CorrelationAccumulator over the given columns of df, fed in row chunks."""
+    acc = CorrelationAccumulator(columns if columns is not None else list(df.columns))
+    for start in range(0, len(df), chunk_rows):
+        acc.update(df.iloc[start:start + chunk_rows])
+    return acc
@@ -0,0 +1,140 @@
+"""
+Shared CSV reader for uploads and dataset loads.
+
+The header line is read and normalized (names stripped) before anything
+else is parsed. Only the requested columns are then parsed, with pinned
+dtypes where given, so columns that are dropped later cost neither parse
+time nor memory. Projected reads of whole files go through pyarrow's
+multithreaded parser when pyarrow is installed, and through pandas' C parser
+otherwise (CSV_ENGINE=c forces it, CSV_ENGINE=pyarrow uses it for every
+read). Chunked streams always use the C parser, the only one that supports
+chunksize.
+
+When a pinned column holds a value that does not convert, the file is
+parsed again with type inference. Validation can then name the offending
+column exactly as it did before.
+
+Columns left out of a projection still tell rows apart for duplicate
+detection: row_hashes parses them on demand, as a full read would.
+"""
+import csv
+import functools
+import io
+import os
+
+import pandas as pd
+
+CSV_ENGINE = os.environ.get("CSV_ENGINE", "auto")
+
+@functools.lru_cache(maxsize=None)
+def _pyarrow_available():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def parse_header(line):
+    """Column names of one header line, as written (not stripped)."""
+    if isinstance(line, bytes):
+        line = line.decode('utf-8-sig')
+    line = line.lstrip('\ufeff').rstrip('\r\n')
+    return next(csv.reader([line]), []) if line else []
+
+def _peek_header(source):
+    """Raw header names of a path or seekable buffer, leaving the buffer where it was."""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            return parse_header(f.readline())
+    position = source.tell()
+    line = source.readline()
+    source.seek(position)
+    return parse_header(line)
+
+def header_columns(source):
+    """Stripped column names of a CSV path or seekable buffer."""
+    return [name.strip() for name in _peek_header(source)]
+
+def _projection(raw_names, columns, dtypes):
+    """usecols and dtype keyed by the raw header names, for stripped columns/dtypes."""
+    dtypes = dtypes or {}
+    dtype = {name: dtypes[name.strip()] for name in raw_names if name.strip() in dtypes}
+    if columns is None:
+        # Keep every column, so pandas still names blank headers "Unnamed: i"
+        return None, dtype
+    wanted = set(columns)
+    usecols = [name for name in raw_names if name.strip() in wanted]
+    return usecols, {name: value for name, value in dtype.items() if name in usecols}
+
+def _engine(engine, projected):
+    engine = engine or CSV_ENGINE
+    if engine == 'auto':
+        # pyarrow infers timestamps in text columns, so whole-schema reads stay on the C parser
+        return 'pyarrow' if projected and _pyarrow_available() else 'c'
+    return engine
+
+# What the C parser gives text columns in this pandas version (object, or str on pandas 3)
+_TEXT_DTYPE = pd.Series([], dtype=str).dtype
+
+def _like_c_parser(df):
+    """Align a pyarrow-parsed frame with the C parser: 'Unnamed: i' headers and text dtype."""
+    df.columns = [name if name.strip() else f"Unnamed: {i}" for i, name in enumerate(df.columns)]
+    if _TEXT_DTYPE != object:
+        for col in df.columns[df.dtypes == object]:
+            df[col] = df[col].astype(_TEXT_DTYPE)
+    return df
+
+def read_csv(source, columns=None, dtypes=None, engine=None, **kwargs):
+    """
+    Parse a CSV path or seekable buffer, keeping only the (stripped) names in
+    columns (None keeps all) with the dtypes pinned by dtypes. Columns that
+    are not in the file are left out; the result has stripped column names.
+    """
+    raw_names = _peek_header(source)
+    if not raw_names:
+        raise pd.errors.EmptyDataError("No columns to parse from file")
+    usecols, dtype = _projection(raw_names, columns, dtypes)
+    engine = _engine(engine, usecols is not None)
+    start = None if isinstance(source, (str, os.PathLike)) else source.tell()
+    if engine == 'pyarrow' and isinstance(source, io.StringIO):
+        # pyarrow parses bytes; one encode beats the C parser on all but tiny uploads
+        source, start = io.BytesIO(source.getvalue()[start:].encode('utf-8')), 0
+    try:
+        df = pd.read_csv(source, usecols=usecols, dtype=dtype or None, engine=engine, **kwargs)
+    except (ValueError, TypeError, OverflowError):
+        if not dtype:
+            raise
+        # A pinned column holds something else: infer types so validation can report it
+        if start is not None:
+            source.seek(start)
+        df = pd.read_csv(source, usecols=usecols, engine=engine, **kwargs)
+    if engine == 'pyarrow':
+        df = _like_c_parser(df)
+    df.columns = df.columns.str.strip()
+    return df
+
+def row_hashes(source, columns):
+    """
+    One uint64 hash per data row of the (stripped) columns of a CSV path or
+    seekable buffer, parsed with type inference like a full read.
+    """
+    # The C parser, so text columns compare as text, as they do in a full read
+    df = read_csv(source, columns, engine='c')
+    return pd.util.hash_pandas_object(df[columns], index=False).to_numpy()
+
+def iter_csv(stream, columns=None, dtypes=None, chunksize=50_000, names=None):
+    """
+    Parse a forward-only binary or text stream in chunks of chunksize rows,
+    keeping only columns. names gives the raw header names when the stream
+    starts after the header. Chunks cannot be parsed again, so a value that
+    does not convert to its pinned dtype raises ValueError here.
+    """
+    raw_names = names if names is not None else parse_header(stream.readline())
+    if not raw_names:
+        raise pd.errors.EmptyDataError("No columns to parse from file")
+    usecols, dtype = _projection(raw_names, columns, dtypes)
+    reader = pd.read_csv(stream, header=None, names=raw_names, usecols=usecols, dtype=dtype or None,
+                         chunksize=chunksize)
+    for chunk in reader:
+        chunk.columns = chunk.columns.str.strip()
+        yield chunk
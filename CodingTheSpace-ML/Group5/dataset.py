@@ -0,0 +1,142 @@
+"""
+Columnar binary cache for the project's CSV datasets.
+
+The first load_dataset() call on a CSV parses it once and writes one raw .npy
+file per column under .dataset_cache/<csv name>/ next to the CSV. Later calls
+memory-map those files instead of parsing text, so loading costs a few
+milliseconds no matter how large the file is. The cache is rebuilt when the
+CSV's size changes, or when its mtime changes and its SHA-256 no longer
+matches the one recorded at build time.
+"""
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+import csv_reader
+
+CACHE_DIR_NAME = os.environ.get("DATASET_CACHE_DIR", ".dataset_cache")
+_FORMAT = 'npy-columns/3'
+
+def _sha256(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def cache_dir_for(csv_path):
+    directory, name = os.path.split(os.path.abspath(csv_path))
+    return os.path.join(directory, CACHE_DIR_NAME, name)
+
+def _read_meta(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, 'meta.json')) as f:
+            meta = json.load(f)
+        return meta if meta.get('format') == _FORMAT else None
+    except (OSError, ValueError):
+        return None
+
+def _is_fresh(meta, csv_path, cache_dir):
+    """Check the cache against the CSV: size first, then mtime, then content hash."""
+    stat = os.stat(csv_path)
+    if meta is None or meta['source_size'] != stat.st_size:
+        return False
+    if meta['source_mtime_ns'] == stat.st_mtime_ns:
+        return True
+    if meta['source_sha256'] != _sha256(csv_path):
+        return False
+    # Same content with a new mtime (e.g. a fresh checkout): remember the new mtime
+    meta['source_mtime_ns'] = stat.st_mtime_ns
+    _write_meta(cache_dir, meta)
+    return True
+
+def _write_meta(cache_dir, meta):
+    tmp = os.path.join(cache_dir, f'meta.json.tmp{os.getpid()}')
+    with open(tmp, 'w') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp, os.path.join(cache_dir, 'meta.json'))
+
+def build_cache(csv_path, cache_dir=None, **read_csv_kwargs):
+    """Parse csv_path and write one .npy file per column; returns the cache's metadata."""
+    cache_dir = cache_dir or cache_dir_for(csv_path)
+    stat = os.stat(csv_path)
+    df = csv_reader.read_csv(csv_path, **read_csv_kwargs)
+
+    # meta.json is written last, so a half-built cache is never considered valid
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    os.makedirs(cache_dir)
+    columns = []
+    for i, col in enumerate(df.columns):
+        values = df[col].to_numpy()
+        filename = f'col_{i:04d}.npy'
+        entry = {'name': col, 'file': filename, 'dtype': str(df[col].dtype)}
+        if values.dtype == object:
+            # Fixed-width unicode keeps text columns memory-mappable; missing
+            # values are kept in a separate mask, as astype(str) makes them 'nan'
+            nulls = pd.isna(values)
+            if nulls.any():
+                entry['nulls'] = f'col_{i:04d}_nulls.npy'
+                np.save(os.path.join(cache_dir, entry['nulls']), nulls, allow_pickle=False)
+            values = values.astype(str)
+        np.save(os.path.join(cache_dir, filename), values, allow_pickle=False)
+        columns.append(entry)
+
+    meta = {
+        'format': _FORMAT,
+        'source': os.path.basename(csv_path),
+        'source_size': stat.st_size,
+        'source_mtime_ns': stat.st_mtime_ns,
+        'source_sha256': _sha256(csv_path),
+        'n_rows': len(df),
+        'columns': columns,
+    }
+    _write_meta(cache_dir, meta)
+    return meta
+
+def _load_column(cache_dir, col, mmap):
+    values = np.load(os.path.join(cache_dir, col['file']), mmap_mode='c' if mmap else None)
+    values = values.view(np.ndarray)  # plain ndarray view on the mapped pages
+    if values.dtype.kind != 'U':
+        return values
+    values = values.astype(object)
+    if 'nulls' in col:
+        values[np.load(os.path.join(cache_dir, col['nulls']))] = np.nan
+    # Back to the dtype the parser gave the column (object, or str on pandas 3)
+    return values if col['dtype'] == 'object' else pd.array(values, dtype=col['dtype'])
+
+def load_dataset(csv_path, columns=None, mmap=True):
+    """
+    Load csv_path as a DataFrame from its columnar cache, (re)building the cache
+    when it is missing or stale. Columns are copy-on-write memory maps, so
+    callers may modify them without touching the files on disk.
+    """
+    if not os.path.exists(csv_path):
+        raise FileNotFoundError(f"The file '{csv_path}' does not exist.")
+    cache_dir = cache_dir_for(csv_path)
+    meta = _read_meta(cache_dir)
+    if not _is_fresh(meta, csv_path, cache_dir):
+        # The first load reads the new cache back, so it returns what later loads do
+        meta = build_cache(csv_path, cache_dir)
+
+    wanted = meta['columns'] if columns is None else [c for c in meta['columns'] if c['name'] in columns]
+    data = {col['name']: _load_column(cache_dir, col, mmap) for col in wanted}
+    df = pd.DataFrame(data, copy=False)
+    return df[columns] if columns is not None else df
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    for path in sys.argv[1:] or ["cleaned_nasa_data1.csv"]:
+        start = time.perf_counter()
+        pd.read_csv(path)
+        parse_time = time.perf_counter() - start
+        load_dataset(path)  # make sure the cache exists
+        start = time.perf_counter()
+        df = load_dataset(path)
+        print(f"{path}: {df.shape[0]:,} rows x {df.shape[1]} columns, "
+              f"read_csv {parse_time * 1e3:.1f} ms, cached load {(time.perf_counter() - start) * 1e3:.1f} ms")
@@ -0,0 +1,122 @@
+"""
+Render every EDA figure off-screen into one HTML report.
+
+Figures are built by the same functions the interactive scripts use
+(Feature_Normality, Feature_Boxplot_By_Class, CorrelationMatrix, Pairplot).
+They are rendered with Agg on a process pool, one task per feature or
+variable set, and written as PNGs next to an index.html. Each worker memory
+maps the dataset from its column cache instead of receiving a copy.
+
+    python eda_report.py cleaned_nasa_data1.csv --out eda_report --workers 4
+"""
+import argparse
+import html
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import plotting
+from dataset import load_dataset
+
+TARGET = 'Hazardous'
+
+_df = None
+
+def _init_worker(path, out_dir):
+    global _df
+    import seaborn as sns
+
+    plotting.report_mode(out_dir)
+    sns.set(style="whitegrid")
+    _df = load_dataset(path)
+
+def render(kind, arg):
+    """Build and save one figure; returns (section, title, png file name)."""
+    if kind == 'normality':
+        from Feature_Normality import normality_figure
+        fig = normality_figure(_df[arg].dropna(), arg)
+        section, title, name = 'Normality', arg, f"normality_{arg}"
+    elif kind == 'boxplot':
+        from Feature_Boxplot_By_Class import boxplot_figure
+        fig = boxplot_figure(_df, arg, TARGET)
+        section, title, name = 'Box plots by class', arg, f"boxplot_{arg}"
+    elif kind == 'correlation':
+        from CorrelationMatrix import correlation_figure
+        fig = correlation_figure(_df)
+        section, title, name = 'Correlation', 'Correlation matrix', 'correlation_matrix'
+    elif kind == 'pairplot':
+        from Pairplot import pairplot_figure, var_sets
+        fig = pairplot_figure(_df, var_sets[arg], TARGET)
+        section, title, name = 'Pair plots', ', '.join(var_sets[arg]), f"pairplot_set{arg + 1}"
+    else:
+        raise ValueError(f"Unknown figure kind '{kind}'")
+    path = plotting.show(fig, name)
+    return section, title, os.path.basename(path)
+
+def report_tasks(df):
+    from Pairplot import var_sets
+
+    features = [col for col in df.select_dtypes('number').columns if col != TARGET]
+    # Slowest figures first so they do not end up alone at the tail of the pool
+    tasks = [('pairplot', i) for i in range(len(var_sets))]
+    tasks.append(('correlation', None))
+    tasks += [('normality', feature) for feature in features]
+    tasks += [('boxplot', feature) for feature in features]
+    return tasks
+
+def write_index(out_dir, source, figures, class_table, seconds):
+    sections = {}
+    for section, title, filename in figures:
+        sections.setdefault(section, []).append((title, filename))
+    parts = [
+        "<!DOCTYPE html>",
+        "<html><head><meta charset='utf-8'><title>EDA report</title>",
+        "<style>body{font-family:sans-serif;margin:2em} img{max-width:100%;border:1px solid #ddd}"
+        " figure{display:inline-block;margin:0 1em 1em 0;vertical-align:top}"
+        " table{border-collapse:collapse} td,th{border:1px solid #ccc;padding:4px 8px}</style>",
+        "</head><body>",
+        f"<h1>EDA report: {html.escape(source)}</h1>",
+        f"<p>{len(figures)} figures rendered in {seconds:.1f}s.</p>",
+        "<h2>Class distribution</h2>",
+        class_table.to_html(index=False),
+    ]
+    for section, items in sections.items():
+        parts.append(f"<h2>{html.escape(section)}</h2>")
+        for title, filename in items:
+            parts.append(f"<figure><img src='{html.escape(filename)}' loading='lazy'>"
+                         f"<figcaption>{html.escape(title)}</figcaption></figure>")
+    parts.append("</body></html>")
+    path = os.path.join(out_dir, 'index.html')
+    with open(path, 'w') as f:
+        f.write('\n'.join(parts))
+    return path
+
+def build_report(path, out_dir='eda_report', workers=None):
+    from Target_Distribution import compute_class_distribution
+
+    start = time.perf_counter()
+    os.makedirs(out_dir, exist_ok=True)
+    df = load_dataset(path)  # builds the column cache once before the workers map it
+    tasks = report_tasks(df)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(path, out_dir)) as pool:
+        futures = [pool.submit(render, kind, arg) for kind, arg in tasks]
+        figures = [future.result() for future in futures]
+    # Keep the report in a stable order regardless of completion order
+    order = {'Normality': 0, 'Box plots by class': 1, 'Correlation': 2, 'Pair plots': 3}
+    figures.sort(key=lambda item: order[item[0]])
+    return write_index(out_dir, path, figures, compute_class_distribution(df, TARGET),
+                       time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description="Render all EDA figures into an HTML report.")
+    parser.add_argument('dataset', nargs='?', default='cleaned_nasa_data1.csv')
+    parser.add_argument('--out', default='eda_report')
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+    start = time.perf_counter()
+    index = build_report(args.dataset, args.out, args.workers)
+    print(f"Report written to {index} in {time.perf_counter() - start:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+Compile a fitted RandomForestClassifier into flat NumPy node arrays.
+
+All trees are packed into one byte buffer holding per-node feature indices,
+thresholds, child indices and normalized leaf values. Nodes are renumbered
+breadth first so the two children of a node are adjacent (right = left + 1).
+CompiledForest walks every tree level by level for a whole batch at once and
+reproduces the sklearn predict_proba/predict results exactly. Missing values
+(NaN) follow each node's missing_go_to_left flag, as in sklearn's traversal.
+
+    python forest_compiler.py final_rf_model.joblib
+"""
+import json
+import os
+import sys
+
+import numpy as np
+
+FORMAT = 'compiled-forest/2'
+
+# (tree, row) pairs evaluated per block; keeps the scratch arrays cache sized
+EVAL_BLOCK = 1 << 18
+
+# Segments of the packed buffer, in layout order (all offsets are 8-byte aligned)
+_SEGMENTS = [
+    ('threshold', np.float64),
+    ('value', np.float64),
+    ('feature', np.int32),
+    ('left', np.int32),
+    ('roots', np.int32),
+    ('missing_right', np.uint8),
+]
+
+class CompiledForest:
+    """Array-based forest evaluator exposing the sklearn classifier prediction API."""
+
+    def __init__(self, buffer, meta):
+        self.buffer = buffer
+        self.meta = meta
+        self.classes_ = np.asarray(meta['classes'])
+        self.n_classes = len(self.classes_)
+        self.n_trees = meta['n_trees']
+        self.max_depth = meta['max_depth']
+        self.n_features_in_ = meta['n_features']
+        if meta.get('feature_names') is not None:
+            self.feature_names_in_ = np.asarray(meta['feature_names'], dtype=object)
+
+        # Zero-copy typed views into the single buffer (works for memory-mapped buffers too)
+        for name, dtype in _SEGMENTS:
+            segment = meta['layout'][name]
+            view = np.frombuffer(buffer, dtype=dtype, count=segment['count'], offset=segment['offset'])
+            setattr(self, name, view)
+        self.value = self.value.reshape(-1, self.n_classes)
+        self.is_leaf = self.left == np.arange(len(self.left), dtype=np.int32)
+
+    def apply(self, X):
+        """Return the leaf index reached in every tree, shape (n_trees, n_rows)."""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_rows, n_features = X.shape
+        flat = X.ravel()
+        leaves = np.empty(self.n_trees * n_rows, dtype=np.intp)
+
+        # One entry per (tree, row) pair still descending; finished pairs are dropped each level
+        pending = np.arange(self.n_trees * n_rows)
+        node = np.repeat(self.roots.astype(np.intp), n_rows)
+        row_offsets = np.tile(np.arange(n_rows, dtype=np.intp) * n_features, self.n_trees)
+        for _ in range(self.max_depth):
+            x = flat[row_offsets + self.feature[node]]
+            # float32 features against float64 thresholds, as sklearn's traversal compares;
+            # leaves have an infinite threshold and point at themselves. NaN compares
+            # False, so it only goes right where the node says missing values do.
+            go_right = x > self.threshold[node]
+            missing = np.isnan(x)
+            if missing.any():
+                go_right |= missing & self.missing_right[node].astype(bool)
+            node = self.left[node] + go_right
+            done = self.is_leaf[node]
+            if done.any():
+                leaves[pending[done]] = node[done]
+                keep = ~done
+                node, row_offsets, pending = node[keep], row_offsets[keep], pending[keep]
+                if not len(pending):
+                    break
+        leaves[pending] = node
+        return leaves.reshape(self.n_trees, n_rows)
+
+    def predict_proba(self, X):
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"X has {X.shape[-1]} features, but the forest expects {self.n_features_in_}.")
+        proba = np.empty((len(X), self.n_classes), dtype=np.float64)
+        block = max(1, EVAL_BLOCK // self.n_trees)
+        for start in range(0, len(X), block):
+            leaves = self.apply(X[start:start + block])
+            # Summing over the leading tree axis adds trees in order, like sklearn's accumulation
+            proba[start:start + block] = self.value[leaves].sum(axis=0)
+        proba /= self.n_trees
+        return proba
+
+    def predict(self, X):
+        return self.classes_.take(self.predict_proba(X).argmax(axis=1))
+
+    def save(self, prefix):
+        """Write <prefix>.npy (packed buffer) and <prefix>.json (layout and metadata)."""
+        np.save(prefix + '.npy', np.frombuffer(self.buffer, dtype=np.uint8))
+        with open(prefix + '.json', 'w') as f:
+            json.dump(self.meta, f, indent=2)
+
+    @classmethod
+    def load(cls, prefix, mmap_mode=None):
+        with open(prefix + '.json') as f:
+            meta = json.load(f)
+        buffer = np.load(prefix + '.npy', mmap_mode=mmap_mode)
+        return cls(buffer, meta)
+
+def _breadth_first_order(tree):
+    """Return the old node ids in breadth-first order, emitting sibling leaves in pairs."""
+    order = [np.array([0])]
+    frontier = order[0]
+    while frontier.size:
+        internal = frontier[tree.children_left[frontier] != -1]
+        frontier = np.column_stack([tree.children_left[internal], tree.children_right[internal]]).ravel()
+        order.append(frontier)
+    return np.concatenate(order)
+
+def compile_forest(model):
+    """Pack the trees of a fitted RandomForestClassifier into a CompiledForest."""
+    trees = [estimator.tree_ for estimator in model.estimators_]
+    n_classes = len(model.classes_)
+    node_offsets = np.cumsum([0] + [tree.node_count for tree in trees])
+    n_nodes = int(node_offsets[-1])
+
+    arrays = {
+        'threshold': np.empty(n_nodes, dtype=np.float64),
+        'value': np.empty((n_nodes, n_classes), dtype=np.float64),
+        'feature': np.empty(n_nodes, dtype=np.int32),
+        'left': np.empty(n_nodes, dtype=np.int32),
+        'roots': node_offsets[:-1].astype(np.int32),
+        'missing_right': np.zeros(n_nodes, dtype=np.uint8),
+    }
+    for tree, offset in zip(trees, node_offsets[:-1]):
+        old_ids = _breadth_first_order(tree)
+        new_ids = np.empty(tree.node_count, dtype=np.intp)
+        new_ids[old_ids] = np.arange(tree.node_count)
+        nodes = slice(offset, offset + tree.node_count)
+
+        children = tree.children_left[old_ids]
+        is_leaf = children == -1
+        own = np.arange(offset, offset + tree.node_count)
+        arrays['left'][nodes] = np.where(is_leaf, own, new_ids[children] + offset)
+        arrays['feature'][nodes] = np.where(is_leaf, 0, tree.feature[old_ids])
+        arrays['threshold'][nodes] = np.where(is_leaf, np.inf, tree.threshold[old_ids])
+        missing_left = getattr(tree, 'missing_go_to_left', None)  # sklearn >= 1.3
+        if missing_left is not None:
+            arrays['missing_right'][nodes] = np.where(is_leaf, 0, 1 - missing_left[old_ids])
+        # Normalize like DecisionTreeClassifier.predict_proba
+        value = tree.value[old_ids, 0, :n_classes].copy()
+        normalizer = value.sum(axis=1)[:, np.newaxis]
+        normalizer[normalizer == 0.0] = 1.0
+        value /= normalizer
+        arrays['value'][nodes] = value
+
+    layout, offset = {}, 0
+    for name, _ in _SEGMENTS:
+        array = arrays[name]
+        layout[name] = {'offset': offset, 'count': int(array.size)}
+        offset += -(-array.nbytes // 8) * 8
+    buffer = np.zeros(offset, dtype=np.uint8)
+    for name, _ in _SEGMENTS:
+        array = arrays[name]
+        start = layout[name]['offset']
+        buffer[start:start + array.nbytes] = array.view(np.uint8).ravel()
+
+    names = getattr(model, 'feature_names_in_', None)
+    meta = {
+        'format': FORMAT,
+        'classes': model.classes_.tolist(),
+        'n_trees': len(trees),
+        'n_nodes': n_nodes,
+        'n_features': int(model.n_features_in_),
+        'feature_names': names.tolist() if names is not None else None,
+        'max_depth': max(int(tree.max_depth) for tree in trees),
+        'layout': layout,
+    }
+    return CompiledForest(buffer, meta)
+
+def export_forest(model_path, prefix=None):
+    """Compile the joblib model at model_path and save it next to it."""
+    import joblib
+
+    prefix = prefix or os.path.splitext(model_path)[0] + '.forest'
+    forest = compile_forest(joblib.load(model_path))
+    forest.save(prefix)
+    return prefix
+
+if __name__ == "__main__":
+    model_path = sys.argv[1] if len(sys.argv) > 1 else "final_rf_model.joblib"
+    prefix = export_forest(model_path, sys.argv[2] if len(sys.argv) > 2 else None)
+    print(f"Compiled forest written to {prefix}.npy / {prefix}.json")
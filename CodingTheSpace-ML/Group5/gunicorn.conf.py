@@ -0,0 +1,29 @@
+import os
+
+bind = os.environ.get("BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+
+# More than one thread switches to the gthread worker, which lets MICROBATCH=1
+# merge concurrent requests inside each worker
+threads = int(os.environ.get("GUNICORN_THREADS", 1))
+
+# Import the app and load the model once in the master process; forked workers
+# then share its pages instead of each paying the unpickle cost. With
+# MODEL_PRELOAD=0 workers start serving at once (/healthz, /readyz answers 503)
+# and each loads the model in the background instead.
+preload_app = True
+MODEL_PRELOAD = os.environ.get("MODEL_PRELOAD", "1") == "1"
+
+def when_ready(server):
+    if MODEL_PRELOAD:
+        import model_store
+        model_store.get_model()
+
+def post_fork(server, worker):
+    # Threads do not survive fork: start the registry watcher and shadow scorer per worker
+    import backend
+    import model_store
+    if not MODEL_PRELOAD:
+        model_store.warm_up_async()
+    model_store.start_watcher()
+    backend.configure_shadow()
@@ -0,0 +1,55 @@
+import os
+import warnings
+
+import numpy as np
+
+from validation import REQUIRED_COLUMNS
+
+# Rows per predict_proba call; large uploads are scored in sub-batches of this size
+PREDICT_BATCH_SIZE = int(os.environ.get("PREDICT_BATCH_SIZE", 65_536))
+
+# Sub-batches up to this many rows go through the compiled forest, which avoids
+# sklearn's per-call overhead; larger ones use sklearn's C traversal (0 disables)
+COMPILED_MAX_ROWS = int(os.environ.get("COMPILED_MAX_ROWS", 256))
+
+def model_feature_order(model):
+    """Return the feature names in the order the model was fitted with."""
+    names = getattr(model, 'feature_names_in_', None)
+    return list(names) if names is not None else list(REQUIRED_COLUMNS)
+
+def build_feature_matrix(df, columns):
+    """
+    Copy the feature columns into one contiguous float32 C-ordered array.
+    The trees compare in float32, so this is the conversion sklearn would
+    otherwise redo on every predict call.
+    """
+    X = np.empty((len(df), len(columns)), dtype=np.float32, order='C')
+    for j, col in enumerate(columns):
+        if col not in df.columns:
+            raise ValueError(f"Required feature '{col}' missing after validation")
+        X[:, j] = df[col].to_numpy()
+    return X
+
+def predict_with_proba(model, X, batch_size=None, compiled=None):
+    """
+    Score X in sub-batches and return (labels, probabilities). Labels are the
+    argmax of the probabilities, exactly as RandomForestClassifier.predict does,
+    so the forest is only traversed once. Small sub-batches use the compiled
+    forest when one is given; both engines return identical probabilities,
+    including for rows with missing (NaN) features.
+    """
+    batch_size = batch_size or PREDICT_BATCH_SIZE
+    proba = np.empty((len(X), len(model.classes_)), dtype=np.float64)
+    with warnings.catch_warnings():
+        # The model was fitted on a DataFrame but is fed plain float32 arrays in its own column order
+        warnings.filterwarnings("ignore", message="X does not have valid feature names")
+        for start in range(0, len(X), batch_size):
+            batch = X[start:start + batch_size]
+            engine = compiled if compiled is not None and len(batch) <= COMPILED_MAX_ROWS else model
+            proba[start:start + len(batch)] = engine.predict_proba(batch)
+    labels = model.classes_.take(proba.argmax(axis=1))
+    return labels, proba
+
+def positive_class_proba(model, proba, positive=1):
+    """Return the column of proba holding the probability of the positive class."""
+    return proba[:, list(model.classes_).index(positive)]
@@ -0,0 +1,192 @@
+"""
+Prometheus-style metrics for the prediction service, without extra dependencies.
+
+Counters and histograms live in one in-process REGISTRY and are rendered in
+the Prometheus text exposition format by backend.py's /metrics. Under
+gunicorn every worker keeps its own registry, so a scrape shows the worker
+that answered it (label the target per worker or scrape with a sidecar to
+aggregate).
+
+RequestTimer times the stages of one request (read, parse, validate,
+features, inference, serialize) into predict_stage_seconds. It records the
+request total, rows and bytes when the request finishes.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+ROW_BUCKETS = (1, 10, 100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+BYTE_BUCKETS = (1e3, 1e4, 1e5, 1e6, 1e7, 1e8, 1e9)
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class Counter:
+    """Monotonic counter per label set."""
+    kind = 'counter'
+
+    def __init__(self, name, help, labelnames=()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(tuple(labels[name] for name in self.labelnames), 0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield self.name, _format_labels(self.labelnames, key), value
+
+class Histogram:
+    """Cumulative-bucket histogram per label set, with _sum and _count."""
+    kind = 'histogram'
+
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.buckets = np.array(sorted(buckets), dtype=np.float64)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        index = int(np.searchsorted(self.buckets, value, side='left'))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [np.zeros(len(self.buckets) + 1, dtype=np.int64), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def count(self, **labels):
+        series = self._series.get(tuple(labels[name] for name in self.labelnames))
+        return int(series[0].sum()) if series else 0
+
+    def samples(self):
+        with self._lock:
+            items = sorted((key, counts.copy(), total) for key, (counts, total) in self._series.items())
+        for key, counts, total in items:
+            cumulative = np.cumsum(counts)
+            for bound, count in zip(list(self.buckets) + [float('inf')], cumulative):
+                labels = _format_labels(self.labelnames, key, [('le', _format_value(bound))])
+                yield f'{self.name}_bucket', labels, count
+            yield f'{self.name}_sum', _format_labels(self.labelnames, key), total
+            yield f'{self.name}_count', _format_labels(self.labelnames, key), cumulative[-1]
+
+class Callback:
+    """Value read from fn() at scrape time, e.g. counters another component already keeps."""
+
+    def __init__(self, name, help, fn, kind='gauge'):
+        self.name, self.help, self.fn, self.kind = name, help, fn, kind
+
+    def samples(self):
+        value = self.fn()
+        if value is not None:
+            yield self.name, '', value
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+
+    def _add(self, metric):
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric '{metric.name}' is already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help, labelnames=()):
+        return self._add(Counter(name, help, labelnames))
+
+    def histogram(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._add(Histogram(name, help, labelnames, buckets))
+
+    def callback(self, name, help, fn, kind='gauge'):
+        return self._add(Callback(name, help, fn, kind))
+
+    def render(self):
+        """All metrics in the Prometheus text format (version 0.0.4)."""
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for name, labels, value in metric.samples():
+                lines.append(f'{name}{labels} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+REGISTRY = Registry()
+REQUEST_SECONDS = REGISTRY.histogram(
+    'predict_request_seconds', 'Wall time per prediction request.', ['endpoint'])
+STAGE_SECONDS = REGISTRY.histogram(
+    'predict_stage_seconds', 'Wall time per pipeline stage of a prediction request.', ['endpoint', 'stage'])
+REQUESTS = REGISTRY.counter(
+    'predict_requests_total', 'Prediction requests by response status.', ['endpoint', 'status'])
+REQUEST_ROWS = REGISTRY.histogram(
+    'predict_request_rows', 'Rows scored per prediction request.', ['endpoint'], ROW_BUCKETS)
+REQUEST_BYTES = REGISTRY.histogram(
+    'predict_request_bytes', 'Request body bytes per prediction request.', ['endpoint'], BYTE_BUCKETS)
+ROWS = REGISTRY.counter('predict_rows_total', 'Rows scored.', ['endpoint'])
+BYTES = REGISTRY.counter('predict_request_bytes_total', 'Request body bytes received.', ['endpoint'])
+VALIDATION_ERRORS = REGISTRY.counter(
+    'validation_errors_total', 'Rejected uploads by validation failure kind.', ['kind'])
+MODEL_INFERENCE_SECONDS = REGISTRY.histogram(
+    'model_inference_seconds', 'Model predict_with_proba time per call (cache misses only).')
+MODEL_INFERENCE_ROWS = REGISTRY.counter('model_inference_rows_total', 'Rows sent to the model.')
+
+class RequestTimer:
+    """Stage timings, rows and bytes of one request, recorded under its endpoint label."""
+
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.start = time.perf_counter()
+        self.rows = 0
+        self.bytes = 0
+        self.finished = False
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            STAGE_SECONDS.observe(time.perf_counter() - start, endpoint=self.endpoint, stage=name)
+
+    def finish(self, status):
+        if self.finished:
+            return
+        self.finished = True
+        REQUEST_SECONDS.observe(time.perf_counter() - self.start, endpoint=self.endpoint)
+        REQUESTS.inc(endpoint=self.endpoint, status=str(status))
+        REQUEST_ROWS.observe(self.rows, endpoint=self.endpoint)
+        REQUEST_BYTES.observe(self.bytes, endpoint=self.endpoint)
+        ROWS.inc(self.rows, endpoint=self.endpoint)
+        BYTES.inc(self.bytes, endpoint=self.endpoint)
+
+def record_validation_error(error):
+    VALIDATION_ERRORS.inc(kind=getattr(error, 'kind', 'other'))
+
+@contextmanager
+def timed_inference(rows):
+    start = time.perf_counter()
+    yield
+    MODEL_INFERENCE_SECONDS.observe(time.perf_counter() - start)
+    MODEL_INFERENCE_ROWS.inc(rows)
@@ -1,19 +1,10 @@
 import os
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import (
-    accuracy_score,
-    f1_score,
-    precision_score,
-    recall_score,
-    classification_report,
-    confusion_matrix,
-    roc_curve,
-    auc
-)
+
+from dataset import load_dataset
+
+# sklearn, matplotlib and seaborn are imported by the helpers that use them,
+# so loading data in a headless training job does not pay for plotting
 
 def load_data(file_path):
     """Load dataset from a CSV file with error handling."""
@@ -21,7 +12,7 @@ def load_data(file_path):
         raise FileNotFoundError(f"The file '{file_path}' does not exist.")
     
     try:
-        df = pd.read_csv(file_path)
+        df = load_dataset(file_path)
     except pd.errors.EmptyDataError:
         raise ValueError(f"The file '{file_path}' is empty or invalid.")
     except pd.errors.ParserError:
@@ -38,6 +29,8 @@ def load_data(file_path):
 
 def split_data(X, y, test_size=0.3, random_state=42):
     """Split dataset into training and test sets."""
+    from sklearn.model_selection import train_test_split
+
     return train_test_split(X, y, test_size=test_size, stratify=y, random_state=random_state)
 
 def validate_training_data(X, y):
@@ -51,6 +44,8 @@ def validate_training_data(X, y):
 
 def print_classification_metrics(y_test, y_pred):
     """Print standard classification metrics."""
+    from sklearn.metrics import accuracy_score, classification_report, f1_score, precision_score, recall_score
+
     try:
         print("Accuracy:", accuracy_score(y_test, y_pred))
         print("F1 Score:", f1_score(y_test, y_pred))
@@ -62,6 +57,12 @@ def print_classification_metrics(y_test, y_pred):
 
 def plot_confusion_matrix(y_test, y_pred):
     """Plot the confusion matrix."""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    from sklearn.metrics import confusion_matrix
+
+    import plotting
+
     try:
         cm = confusion_matrix(y_test, y_pred)
         plt.figure(figsize=(6, 5))
@@ -70,12 +71,17 @@ def plot_confusion_matrix(y_test, y_pred):
         plt.xlabel("Predicted")
         plt.ylabel("Actual")
         plt.tight_layout()
-        plt.show()
+        plotting.show(name="confusion_matrix")
     except Exception as e:
         print(f"Error in plotting confusion matrix: {e}")
 
 def plot_roc_curve(fpr, tpr):
     """Plot ROC curve."""
+    import matplotlib.pyplot as plt
+    from sklearn.metrics import auc
+
+    import plotting
+
     try:
         roc_auc = auc(fpr, tpr)
 
@@ -87,7 +93,7 @@ def plot_roc_curve(fpr, tpr):
         plt.title("ROC Curve")
         plt.legend()
         plt.tight_layout()
-        plt.show()
+        plotting.show(name="roc_curve")
     except Exception as e:
         print(f"Error in plotting ROC curve: {e}")
 
@@ -112,6 +118,8 @@ def evaluate_model_with_proba(model, X_test, y_test):
     except Exception as e:
         print(f"Error during probability prediction: {e}")
         return
+    from sklearn.metrics import roc_curve
+
     fpr, tpr, _ = roc_curve(y_test, y_prob)
     plot_roc_curve(fpr, tpr)
 
@@ -0,0 +1,251 @@
+"""
+Lazy, process-wide access to the hazard model.
+
+The forest is served from its compiled flat-array form (see forest_compiler.py),
+memory-mapped read-only so every worker process shares the same page-cache
+pages. The compiled artifact is rebuilt next to the joblib file whenever the
+joblib file's checksum changes. Nothing is loaded at import time: get_model()
+loads on first use, and gunicorn.conf.py calls it in the master process so
+pre-forked workers inherit the loaded model instead of unpickling it again.
+The preprocessing artifact bundled with the model (see preprocessing.py) is
+loaded and checked against the same checksum.
+
+With MODEL_REGISTRY set, the model is the registry's active version (see
+registry.py). ModelWatcher polls the registry in each worker, loads a newly
+activated version in the background and swaps it in. Requests already holding
+the previous LoadedModel finish with it, so nothing in flight is dropped.
+Swapped-in versions are served from the compiled forest only by default
+(MODEL_SWAP_ENGINE): a worker that unpickled its own sklearn copy would no
+longer share pages with the others.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+
+from forest_compiler import FORMAT, CompiledForest, compile_forest
+from inference import model_feature_order, predict_with_proba
+from metrics import timed_inference
+from preprocessing import load_bundled
+from registry import default_registry
+from validation import DEFAULT_PLAN, ValidationError, ValidationPlan
+
+MODEL_PATH = os.environ.get("MODEL_PATH", "final_rf_model.joblib")
+
+# 'auto' also unpickles sklearn for large batches; 'compiled' serves everything from the mmap
+MODEL_ENGINE = os.environ.get("MODEL_ENGINE", "auto")
+# Engine of hot-swapped versions: 'compiled' keeps workers on shared pages, 'auto' unpickles per worker
+MODEL_SWAP_ENGINE = os.environ.get("MODEL_SWAP_ENGINE", "compiled")
+
+# Seconds between registry polls in each worker (0 disables the watcher)
+MODEL_WATCH_SECONDS = float(os.environ.get("MODEL_WATCH_SECONDS", 5))
+
+def file_checksum(path, block_size=1 << 20):
+    """SHA-256 hex digest of a file, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def compiled_prefix(model_path):
+    return os.path.splitext(model_path)[0] + '.forest'
+
+def ensure_compiled(model_path, checksum):
+    """
+    Make sure an up-to-date compiled forest exists for model_path. Returns the
+    artifact prefix and the sklearn model if it had to be unpickled to compile.
+    """
+    prefix = compiled_prefix(model_path)
+    try:
+        with open(prefix + '.json') as f:
+            meta = json.load(f)
+            if meta.get('format') == FORMAT and meta.get('source_sha256') == checksum \
+                    and os.path.exists(prefix + '.npy'):
+                return prefix, None
+    except (OSError, ValueError):
+        pass
+
+    import joblib
+
+    model = joblib.load(model_path)
+    forest = compile_forest(model)
+    forest.meta['source_sha256'] = checksum
+    # Write under a temporary name and rename, so concurrent loaders never see half a file
+    tmp = f"{prefix}.tmp{os.getpid()}"
+    forest.save(tmp)
+    os.replace(tmp + '.npy', prefix + '.npy')
+    os.replace(tmp + '.json', prefix + '.json')
+    return prefix, model
+
+class LoadedModel:
+    """A loaded model version: the memory-mapped compiled forest plus, optionally, sklearn."""
+
+    def __init__(self, path, version, compiled, model=None, load_seconds=0.0, preprocessing=None, name=None):
+        self.path = path
+        self.version = version
+        self.name = name or os.path.basename(path)
+        self.compiled = compiled
+        self.model = model
+        self.load_seconds = load_seconds
+        self.preprocessing = preprocessing
+        self.classes_ = compiled.classes_
+        self.feature_order = model_feature_order(compiled)
+        self._plans = {}
+
+    def validation_plan(self, units='scaled'):
+        """Validation plan filling (and for raw units, scaling) with this model's training statistics."""
+        plan = self._plans.get(units)
+        if plan is None:
+            if self.preprocessing is not None:
+                plan = ValidationPlan.from_preprocessing(self.preprocessing, units, self.feature_order)
+            elif units == 'scaled':
+                plan = DEFAULT_PLAN
+            else:
+                raise ValidationError("Raw-unit data needs a preprocessing artifact bundled with the model.",
+                                      "units")
+            self._plans[units] = plan
+        return plan
+
+    def score(self, X, batch_size=None):
+        # Large sub-batches go to sklearn when it is loaded, everything else to the compiled forest
+        engine = self.model if self.model is not None else self.compiled
+        return predict_with_proba(engine, X, batch_size=batch_size, compiled=self.compiled)
+
+    def predict_with_proba(self, X, batch_size=None):
+        with timed_inference(len(X)):
+            return self.score(X, batch_size)
+
+def model_source(version=None):
+    """(path, name) of the model to serve: a registry version (default: the active one) or MODEL_PATH."""
+    registry = default_registry()
+    if registry is None:
+        if version is not None:
+            raise ValueError("MODEL_REGISTRY is not set")
+        return MODEL_PATH, None
+    version = version or registry.current()
+    if version is None:
+        return MODEL_PATH, None
+    return registry.path(version), version
+
+def load_model(path=None, engine=None, name=None):
+    """Load (compiling first if needed) the model at path without touching the shared instance."""
+    if path is None:
+        path, name = model_source()
+    engine = engine or MODEL_ENGINE
+    start = time.perf_counter()
+    version = file_checksum(path)
+    registry = default_registry()
+    if name is not None and registry is not None and registry.manifest(name)['sha256'] != version:
+        raise ValueError(f"Model {name} does not match its registry manifest checksum")
+    preprocessing = load_bundled(path, version)
+    prefix, model = ensure_compiled(path, version)
+    compiled = CompiledForest.load(prefix, mmap_mode='r')
+    if engine == 'compiled':
+        model = None
+    elif model is None:
+        import joblib
+        model = joblib.load(path)
+    return LoadedModel(path, version, compiled, model, time.perf_counter() - start, preprocessing, name)
+
+_current = None
+_lock = threading.Lock()
+
+def get_model():
+    """Return the process-wide model, loading it on first use."""
+    global _current
+    if _current is None:
+        with _lock:
+            if _current is None:
+                try:
+                    _current = load_model()
+                    print(f"✅ Model loaded successfully from {_current.path} "
+                          f"({_current.load_seconds:.2f}s, {_current.name}, sha256 {_current.version[:12]})")
+                except Exception as e:
+                    print(f"❌ Error loading model: {e}")
+                    raise
+    return _current
+
+def is_loaded():
+    return _current is not None
+
+# Set when a background warm-up failed; get_model() retries on the next request
+load_error = None
+_warmup = None
+
+def _warm():
+    global load_error
+    try:
+        get_model()
+        load_error = None
+    except Exception as e:
+        load_error = str(e)
+
+def warm_up_async():
+    """Load the model on a background thread, so the server can answer /readyz while it loads."""
+    global _warmup
+    if _current is None and (_warmup is None or not _warmup.is_alive()):
+        _warmup = threading.Thread(target=_warm, name='model-warmup', daemon=True)
+        _warmup.start()
+    return _warmup
+
+def swap_model(loaded):
+    """Make loaded the process-wide model and return the previous one."""
+    global _current
+    with _lock:
+        previous, _current = _current, loaded
+    return previous
+
+def reload_model(version=None):
+    """Load a registry version (default: the active one) and swap it in; returns the new model."""
+    path, name = model_source(version)
+    # Each worker swaps on its own, so by default only the shared memory-mapped form is loaded
+    loaded = load_model(path, engine=MODEL_SWAP_ENGINE, name=name)
+    previous = swap_model(loaded)
+    print(f"🔁 Swapped model {previous.name if previous else None} -> {loaded.name} "
+          f"({loaded.load_seconds:.2f}s, sha256 {loaded.version[:12]})")
+    return loaded
+
+class ModelWatcher:
+    """Polls the registry's active version and hot-swaps the model when it changes."""
+
+    def __init__(self, registry, interval=MODEL_WATCH_SECONDS):
+        self.registry = registry
+        self.interval = interval
+        self.errors = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='model-watcher', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def check(self):
+        version = self.registry.current()
+        if version is not None and (_current is None or _current.name != version):
+            reload_model(version)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                # Keep serving the loaded version; a broken artifact is retried next poll
+                self.errors += 1
+                print(f"❌ Model reload failed: {e}")
+
+_watcher = None
+_watcher_pid = None
+
+def start_watcher():
+    """Start this process's registry watcher (threads do not survive fork, so call it per worker)."""
+    global _watcher, _watcher_pid
+    registry = default_registry()
+    if registry is None or MODEL_WATCH_SECONDS <= 0 or _watcher_pid == os.getpid():
+        return _watcher
+    _watcher, _watcher_pid = ModelWatcher(registry).start(), os.getpid()
+    return _watcher
@@ -0,0 +1,102 @@
+"""
+Shared figure output for the EDA scripts and ml_helpers.
+
+Scripts call plotting.show(fig, name) instead of plt.show(). Interactively
+that is plt.show(). In report mode, when PLOT_REPORT_DIR is set or
+report_mode() was called, the figure is rendered off-screen with Agg, saved
+as <name>.png and closed, so headless runs never block on a window.
+eda_report.py uses this to render every figure in a process pool.
+
+Large inputs are reduced before plotting. Scatter and KDE inputs are sampled
+(stratified by class). Box plots draw exact statistics but only a sample of
+the fliers. Q-Q plots use a fixed number of quantiles.
+"""
+import os
+import re
+
+import matplotlib
+import numpy as np
+
+REPORT_DIR = os.environ.get("PLOT_REPORT_DIR")
+if REPORT_DIR:
+    matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt  # noqa: E402  (after the backend is chosen)
+
+# Above these sizes the inputs are sampled or aggregated before plotting
+KDE_MAX_POINTS = 20_000
+SCATTER_MAX_POINTS = 5_000
+FLIER_MAX_POINTS = 2_000
+BOX_MAX_POINTS = 50_000
+QQ_POINTS = 10_000
+
+def report_mode(directory):
+    """Switch this process to off-screen rendering into directory."""
+    global REPORT_DIR
+    REPORT_DIR = directory
+    os.makedirs(directory, exist_ok=True)
+    plt.switch_backend("Agg")
+
+def slug(text):
+    return re.sub(r'[^A-Za-z0-9]+', '_', str(text)).strip('_').lower()
+
+def show(fig=None, name=None):
+    """plt.show() interactively; in report mode save the figure as <name>.png and close it."""
+    fig = fig or plt.gcf()
+    if not REPORT_DIR:
+        plt.show()
+        return None
+    os.makedirs(REPORT_DIR, exist_ok=True)
+    path = os.path.join(REPORT_DIR, f"{slug(name or fig.number)}.png")
+    fig.savefig(path, dpi=100)
+    plt.close(fig)
+    return path
+
+def sample_rows(df, max_rows, by=None, seed=42):
+    """At most max_rows rows of df, keeping the class ratio of column by."""
+    if len(df) <= max_rows:
+        return df
+    if by is None:
+        return df.sample(n=max_rows, random_state=seed)
+    fraction = max_rows / len(df)
+    return df.groupby(by, group_keys=False).sample(frac=fraction, random_state=seed)
+
+def sample_values(values, max_points, seed=42):
+    values = np.asarray(values)
+    if len(values) <= max_points:
+        return values
+    return np.random.default_rng(seed).choice(values, size=max_points, replace=False)
+
+def qq_points(values, n=QQ_POINTS):
+    """Theoretical normal quantiles, sample quantiles and the least-squares line of a Q-Q plot."""
+    from scipy.stats import norm
+
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) <= n:
+        ordered = np.sort(values)
+        positions = (np.arange(1, len(values) + 1) - 0.5) / len(values)
+    else:
+        positions = (np.arange(1, n + 1) - 0.5) / n
+        ordered = np.quantile(values, positions)
+    theoretical = norm.ppf(positions)
+    slope, intercept = np.polyfit(theoretical, ordered, 1)
+    return theoretical, ordered, slope, intercept
+
+def boxplot_by_class(ax, df, feature, target_col, palette='Set2'):
+    """Box plot per class from exact quartiles and whiskers, drawing a sample of the fliers."""
+    import seaborn as sns
+    from matplotlib.cbook import boxplot_stats
+
+    classes = sorted(df[target_col].dropna().unique())
+    colors = sns.color_palette(palette, len(classes))
+    stats = []
+    for label in classes:
+        values = df.loc[df[target_col] == label, feature].dropna().to_numpy()
+        stat = boxplot_stats(values)[0]
+        stat['fliers'] = sample_values(stat['fliers'], FLIER_MAX_POINTS)
+        stat['label'] = str(label)
+        stats.append(stat)
+    boxes = ax.bxp(stats, patch_artist=True)
+    for patch, color in zip(boxes['boxes'], colors):
+        patch.set_facecolor(color)
+    return ax
@@ -0,0 +1,97 @@
+"""
+Row-level prediction cache in front of the model.
+
+Rows are keyed by the bytes of their six float32 feature values, the exact
+values the forest compares against, so a hit always returns what the model
+would have returned. Entries live in a bounded LRU and are also keyed by the
+model version (the checksum of the loaded artifact). During a hot swap,
+requests still holding the old model and those using the new one therefore
+share the cache without clearing each other's entries; the old version's
+rows simply age out.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# Maximum number of cached rows (0 disables the cache)
+CACHE_MAX_ROWS = int(os.environ.get("PREDICTION_CACHE_ROWS", 100_000))
+
+def row_keys(X):
+    """Return one hashable key per row of the float32 feature matrix X."""
+    X = np.ascontiguousarray(X, dtype=np.float32) + np.float32(0.0)  # fold -0.0 into 0.0
+    return X.view(np.dtype((np.void, X.dtype.itemsize * X.shape[1]))).ravel().tolist()
+
+class PredictionCache:
+    """Bounded LRU of (label, probabilities) per feature row, with hit/miss counters."""
+
+    def __init__(self, max_rows=CACHE_MAX_ROWS):
+        self.max_rows = max_rows
+        self.version = None  # version of the most recent lookup, for stats
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, keys, version):
+        """Return the cached entry (or None) for every key of version, refreshing hits in the LRU."""
+        with self._lock:
+            self.version = version
+            found = [self._entries.get((version, key)) for key in keys]
+            for key, entry in zip(keys, found):
+                if entry is not None:
+                    self._entries.move_to_end((version, key))
+            n_hits = len(found) - found.count(None)
+            self.hits += n_hits
+            self.misses += len(found) - n_hits
+        return found
+
+    def store(self, keys, labels, proba, version):
+        with self._lock:
+            for key, label, row in zip(keys, labels.tolist(), map(tuple, proba.tolist())):
+                self._entries[version, key] = (label, row)
+                self._entries.move_to_end((version, key))
+            overflow = len(self._entries) - self.max_rows
+            for _ in range(max(overflow, 0)):
+                self._entries.popitem(last=False)
+            self.evictions += max(overflow, 0)
+
+    def predict_with_proba(self, model, X):
+        """
+        Score X through the cache: look every row up in bulk, send only the
+        misses to model.predict_with_proba and remember their results.
+        """
+        if self.max_rows <= 0 or len(X) == 0:
+            return model.predict_with_proba(X)
+
+        keys = row_keys(X)
+        found = self.lookup(keys, model.version)
+        miss = np.fromiter((entry is None for entry in found), dtype=bool, count=len(found))
+
+        labels = np.empty(len(X), dtype=model.classes_.dtype)
+        proba = np.empty((len(X), len(model.classes_)), dtype=np.float64)
+        if not miss.all():
+            hit = ~miss
+            hit_entries = [entry for entry in found if entry is not None]
+            labels[hit] = [label for label, _ in hit_entries]
+            proba[hit] = [row for _, row in hit_entries]
+        if miss.any():
+            miss_labels, miss_proba = model.predict_with_proba(X[miss])
+            labels[miss], proba[miss] = miss_labels, miss_proba
+            self.store([key for key, m in zip(keys, miss) if m], miss_labels, miss_proba, model.version)
+        return labels, proba
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_rows': self.max_rows,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'model_version': self.version,
+            }
@@ -0,0 +1,153 @@
+"""
+Fitted preprocessing statistics, saved by cleaning and reused at inference.
+
+cleaning.main writes the artifact as JSON. It holds the StandardScaler
+mean/scale, the median fill values, the columns cleaning dropped and the
+feature order. To bundle it with a model, save it next to the joblib file as
+<model>.preprocessing.json, stamped with the model's SHA-256. model_store
+refuses to serve a model whose bundled preprocessing was stamped for a
+different file.
+
+    python preprocessing.py bundle preprocessing.json final_rf_model.joblib
+    python preprocessing.py fit Cleaned_Without_Standardization_DataSet.csv --model final_rf_model.joblib
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+
+PREPROCESSING_FORMAT = 1
+TARGET = 'Hazardous'
+
+def preprocessing_path(model_path):
+    return os.path.splitext(model_path)[0] + '.preprocessing.json'
+
+class Preprocessing:
+    """Scaler parameters, fill values and column bookkeeping fitted on the training data."""
+
+    def __init__(self, features, mean, scale, fill_values, dropped_columns=(),
+                 target=TARGET, model_sha256=None, format=PREPROCESSING_FORMAT):
+        if format != PREPROCESSING_FORMAT:
+            raise ValueError(f"Unsupported preprocessing format {format} (expected {PREPROCESSING_FORMAT})")
+        self.features = list(features)
+        self.mean = {col: float(mean[col]) for col in self.features}
+        self.scale = {col: float(scale[col]) for col in self.features}
+        self.fill_values = {col: float(value) for col, value in fill_values.items()}
+        self.dropped_columns = list(dropped_columns)
+        self.target = target
+        self.model_sha256 = model_sha256
+
+    @classmethod
+    def from_scaler(cls, scaler, fill_values, dropped_columns=()):
+        """Build from a fitted StandardScaler (fitted on a DataFrame, so it knows its feature names)."""
+        features = list(scaler.feature_names_in_)
+        return cls(features, dict(zip(features, scaler.mean_)), dict(zip(features, scaler.scale_)),
+                   fill_values, dropped_columns)
+
+    @classmethod
+    def fit(cls, df, fill_values=None, dropped_columns=()):
+        """Fit on a cleaned, unscaled frame the way cleaning.standardize_features does."""
+        from sklearn.preprocessing import StandardScaler
+
+        features = df.select_dtypes(include=['float64', 'int64']).drop(columns=[TARGET], errors='ignore').columns
+        scaler = StandardScaler().fit(df[features])
+        medians = df[features].median().to_dict()
+        medians.update(fill_values or {})
+        return cls.from_scaler(scaler, medians, dropped_columns)
+
+    def scaled_fill_values(self):
+        """Fill values in standardized units, for uploads that are already scaled."""
+        return {col: (self.fill_values[col] - self.mean[col]) / self.scale[col]
+                for col in self.features if col in self.fill_values}
+
+    def scaler_arrays(self, columns):
+        """mean and scale as float64 arrays in the given column order."""
+        missing = [col for col in columns if col not in self.mean]
+        if missing:
+            raise ValueError(f"Preprocessing has no scaler parameters for: {missing}")
+        return (np.array([self.mean[col] for col in columns]),
+                np.array([self.scale[col] for col in columns]))
+
+    def to_dict(self):
+        return {
+            'format': PREPROCESSING_FORMAT,
+            'features': self.features,
+            'mean': self.mean,
+            'scale': self.scale,
+            'fill_values': self.fill_values,
+            'dropped_columns': self.dropped_columns,
+            'target': self.target,
+            'model_sha256': self.model_sha256,
+        }
+
+    @classmethod
+    def from_dict(cls, meta):
+        return cls(meta['features'], meta['mean'], meta['scale'], meta['fill_values'],
+                   meta.get('dropped_columns', ()), meta.get('target', TARGET),
+                   meta.get('model_sha256'), meta.get('format', PREPROCESSING_FORMAT))
+
+    def save(self, path):
+        # Write under a temporary name and rename, like the compiled forest
+        tmp = f"{path}.tmp{os.getpid()}"
+        with open(tmp, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+    def bundle(self, model_path, checksum):
+        """Stamp with the model's checksum and save next to it."""
+        self.model_sha256 = checksum
+        path = preprocessing_path(model_path)
+        self.save(path)
+        return path
+
+def load_bundled(model_path, checksum):
+    """
+    Load the preprocessing bundled with model_path, or None when there is none.
+    Raises ValueError when it was stamped for a different model file.
+    """
+    path = preprocessing_path(model_path)
+    if not os.path.exists(path):
+        return None
+    preprocessing = Preprocessing.load(path)
+    if preprocessing.model_sha256 != checksum:
+        raise ValueError(f"{path} was fitted for a different model "
+                         f"(model_sha256 {str(preprocessing.model_sha256)[:12]}, model {checksum[:12]})")
+    return preprocessing
+
+def main():
+    from model_store import file_checksum
+
+    parser = argparse.ArgumentParser(description="Create or bundle a preprocessing artifact.")
+    sub = parser.add_subparsers(dest='command', required=True)
+    bundle = sub.add_parser('bundle', help="stamp an artifact written by cleaning.py and save it next to a model")
+    bundle.add_argument('artifact')
+    bundle.add_argument('model')
+    fit = sub.add_parser('fit', help="fit an artifact from a cleaned, unscaled dataset")
+    fit.add_argument('dataset')
+    fit.add_argument('--output', default='preprocessing.json')
+    fit.add_argument('--model', help="bundle with this model instead of writing --output")
+    args = parser.parse_args()
+
+    if args.command == 'bundle':
+        path = Preprocessing.load(args.artifact).bundle(args.model, file_checksum(args.model))
+    else:
+        from dataset import load_dataset
+
+        df = load_dataset(args.dataset)
+        df = df.drop(columns=[col for col in df.columns if col.startswith('Unnamed')])
+        preprocessing = Preprocessing.fit(df)
+        if args.model:
+            path = preprocessing.bundle(args.model, file_checksum(args.model))
+        else:
+            path = args.output
+            preprocessing.save(path)
+    print(f"Preprocessing written to {path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Versioned model registry on disk.
+
+    <root>/versions/<version>/model.joblib
+    <root>/versions/<version>/model.preprocessing.json   (optional, see preprocessing.py)
+    <root>/versions/<version>/manifest.json               version, sha256, source, created
+    <root>/CURRENT                                        name of the active version
+
+Each version directory is written under a temporary name and renamed into
+place, so it appears complete or not at all. Activating a version first
+checks the artifact against its manifest checksum. It then replaces CURRENT
+atomically, so watchers in every worker (model_store.ModelWatcher) see either
+the old name or the new one.
+
+    python registry.py publish final_rf_model.joblib --activate
+    python registry.py list
+    python registry.py activate v2
+"""
+import argparse
+import json
+import os
+import shutil
+import time
+
+MODEL_REGISTRY = os.environ.get("MODEL_REGISTRY")
+MODEL_FILE = 'model.joblib'
+
+class ModelRegistry:
+    def __init__(self, root):
+        self.root = root
+        self.versions_dir = os.path.join(root, 'versions')
+
+    def versions(self):
+        """Published versions, oldest first."""
+        if not os.path.isdir(self.versions_dir):
+            return []
+        names = [name for name in os.listdir(self.versions_dir)
+                 if os.path.exists(os.path.join(self.versions_dir, name, 'manifest.json'))]
+        return sorted(names, key=lambda name: self.manifest(name)['created'])
+
+    def path(self, version):
+        return os.path.join(self.versions_dir, version, MODEL_FILE)
+
+    def manifest(self, version):
+        try:
+            with open(os.path.join(self.versions_dir, version, 'manifest.json')) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise ValueError(f"Unknown model version '{version}'") from None
+
+    def current(self):
+        """Name of the active version, or None before anything was activated."""
+        try:
+            with open(os.path.join(self.root, 'CURRENT')) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def verify(self, version):
+        """Raise ValueError unless the artifact still matches its manifest checksum."""
+        from model_store import file_checksum
+
+        expected = self.manifest(version)['sha256']
+        actual = file_checksum(self.path(version))
+        if actual != expected:
+            raise ValueError(f"Model {version} is corrupt (sha256 {actual[:12]}, manifest {expected[:12]})")
+        return expected
+
+    def publish(self, model_path, version=None):
+        """Copy a model (and its bundled preprocessing) in as a new version and return its name."""
+        from model_store import file_checksum
+        from preprocessing import preprocessing_path
+
+        existing = self.versions()
+        version = version or f"v{len(existing) + 1}"
+        if version in existing:
+            raise ValueError(f"Version {version} already exists")
+        os.makedirs(self.versions_dir, exist_ok=True)
+        tmp = os.path.join(self.versions_dir, f".{version}.tmp{os.getpid()}")
+        os.makedirs(tmp)
+        shutil.copyfile(model_path, os.path.join(tmp, MODEL_FILE))
+        if os.path.exists(preprocessing_path(model_path)):
+            shutil.copyfile(preprocessing_path(model_path), preprocessing_path(os.path.join(tmp, MODEL_FILE)))
+        manifest = {
+            'version': version,
+            'sha256': file_checksum(os.path.join(tmp, MODEL_FILE)),
+            'source': os.path.abspath(model_path),
+            'created': time.time(),
+        }
+        with open(os.path.join(tmp, 'manifest.json'), 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.rename(tmp, os.path.join(self.versions_dir, version))
+        return version
+
+    def activate(self, version):
+        self.verify(version)
+        tmp = os.path.join(self.root, f".CURRENT.tmp{os.getpid()}")
+        with open(tmp, 'w') as f:
+            f.write(version + '\n')
+        os.replace(tmp, os.path.join(self.root, 'CURRENT'))
+
+def default_registry():
+    return ModelRegistry(MODEL_REGISTRY) if MODEL_REGISTRY else None
+
+def main():
+    parser = argparse.ArgumentParser(description="Publish and activate model versions.")
+    parser.add_argument('--root', default=MODEL_REGISTRY or 'models')
+    sub = parser.add_subparsers(dest='command', required=True)
+    publish = sub.add_parser('publish')
+    publish.add_argument('model')
+    publish.add_argument('--version')
+    publish.add_argument('--activate', action='store_true')
+    sub.add_parser('list')
+    activate = sub.add_parser('activate')
+    activate.add_argument('version')
+    args = parser.parse_args()
+
+    registry = ModelRegistry(args.root)
+    if args.command == 'publish':
+        version = registry.publish(args.model, args.version)
+        print(f"Published {version}")
+        if args.activate:
+            registry.activate(version)
+            print(f"Activated {version}")
+    elif args.command == 'activate':
+        registry.activate(args.version)
+        print(f"Activated {args.version}")
+    else:
+        current = registry.current()
+        for version in registry.versions():
+            manifest = registry.manifest(version)
+            marker = '*' if version == current else ' '
+            print(f"{marker} {version:<10} {manifest['sha256'][:12]}  {manifest['source']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Response encodings for /predict, chosen by content negotiation.
+
+Format ('?format=' or the Accept header)        Body
+json      application/json                       the original layout, one record per row
+columnar  application/vnd.hazard.columnar+json   one list per column, no per-row dicts
+msgpack   application/msgpack                    packed little-endian arrays (needs msgpack)
+arrow     application/vnd.apache.arrow.stream    one Arrow IPC record batch (needs pyarrow)
+
+In msgpack, predictions is an int8 array and probabilities and each data
+column are float64. Each is sent as raw bytes, with the dtypes listed under
+'dtypes'. Arrow sends the same arrays as typed columns. ?echo=0 leaves the
+cleaned input data out of every format.
+"""
+import functools
+import json
+
+import numpy as np
+
+MEDIA_TYPES = {
+    'json': 'application/json',
+    'columnar': 'application/vnd.hazard.columnar+json',
+    'msgpack': 'application/msgpack',
+    'arrow': 'application/vnd.apache.arrow.stream',
+}
+ALIASES = {
+    'application/x-msgpack': 'msgpack',
+    'application/vnd.apache.arrow.file': 'arrow',
+}
+
+class NotAcceptable(ValueError):
+    """The requested response format is unknown or its library is not installed."""
+
+@functools.lru_cache(maxsize=None)
+def available(fmt):
+    module = {'msgpack': 'msgpack', 'arrow': 'pyarrow'}.get(fmt)
+    if module is None:
+        return fmt in MEDIA_TYPES
+    try:
+        __import__(module)
+    except ImportError:
+        return False
+    return True
+
+def negotiate(args, accept):
+    """Format name from ?format= (strict) or else from the Accept header, defaulting to json."""
+    requested = args.get('format')
+    if requested:
+        if requested not in MEDIA_TYPES:
+            raise NotAcceptable(f"Unknown format '{requested}', expected one of {sorted(MEDIA_TYPES)}.")
+        if not available(requested):
+            raise NotAcceptable(f"Format '{requested}' is not available on this server.")
+        return requested
+    offered = {media: fmt for fmt, media in MEDIA_TYPES.items() if available(fmt)}
+    offered.update({media: fmt for media, fmt in ALIASES.items() if available(fmt)})
+    # json first, so */* and missing Accept headers keep the original response
+    best = accept.best_match(list(offered), default='application/json')
+    return offered.get(best, 'json')
+
+def echo_requested(args):
+    return args.get('echo', '1').lower() not in ('0', 'false', 'no')
+
+def packed_labels(labels):
+    """Labels as int8 when they fit (the 0/1 hazard classes do), else int64."""
+    labels = np.asarray(labels)
+    packed = labels.astype(np.int8)
+    return packed if np.array_equal(packed, labels) else labels.astype(np.int64)
+
+def _column_values(df, columns):
+    return {col: df[col].to_numpy(dtype=np.float64) for col in columns}
+
+def encode(fmt, labels, probabilities, df=None, columns=()):
+    """
+    Body bytes of a columnar, msgpack or arrow prediction response (json
+    keeps going through jsonify). df is None when the data is not echoed;
+    otherwise its columns are included in order.
+    """
+    if fmt == 'columnar':
+        body = {'rows': len(labels), 'predictions': labels.tolist(), 'probabilities': probabilities.tolist()}
+        if df is not None:
+            body['columns'] = list(columns)
+            body['data'] = {col: values.tolist() for col, values in _column_values(df, columns).items()}
+        return json.dumps(body, separators=(',', ':')).encode()
+    if fmt == 'msgpack':
+        import msgpack
+
+        labels = packed_labels(labels)
+        probabilities = np.ascontiguousarray(probabilities, dtype='<f8')
+        body = {
+            'rows': len(labels),
+            'predictions': labels.astype(labels.dtype.newbyteorder('<')).tobytes(),
+            'probabilities': probabilities.tobytes(),
+            'dtypes': {'predictions': labels.dtype.newbyteorder('<').str, 'probabilities': '<f8', 'data': '<f8'},
+        }
+        if df is not None:
+            body['columns'] = list(columns)
+            body['data'] = {col: values.astype('<f8').tobytes()
+                            for col, values in _column_values(df, columns).items()}
+        return msgpack.packb(body, use_bin_type=True)
+    if fmt == 'arrow':
+        import pyarrow as pa
+
+        arrays = [pa.array(packed_labels(labels)), pa.array(np.asarray(probabilities, dtype=np.float64))]
+        names = ['prediction', 'probability']
+        if df is not None:
+            for col, values in _column_values(df, columns).items():
+                arrays.append(pa.array(values))
+                names.append(col)
+        batch = pa.RecordBatch.from_arrays(arrays, names=names)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, batch.schema) as writer:
+            writer.write_batch(batch)
+        return sink.getvalue().to_pybytes()
+    raise NotAcceptable(f"Unknown format '{fmt}'.")
@@ -0,0 +1,135 @@
+"""
+Shadow scoring of a candidate model on live traffic.
+
+After a request has been answered by the serving model, ShadowScorer.offer()
+samples it with probability `rate` and queues the feature matrix together
+with the serving model and its labels and probabilities. A background thread
+scores the queued matrices with the candidate model, off the request path.
+It records row agreement, the mean absolute probability difference and the
+inference latency of both versions. Both latencies are measured on that
+thread with LoadedModel.score, without the prediction cache, so they compare
+like for like. The queue is bounded:
+when the candidate falls behind, samples are dropped instead of requests
+being slowed. stop() never blocks either: queued samples are discarded.
+"""
+import os
+import queue
+import random
+import threading
+import time
+
+from metrics import REGISTRY
+
+SHADOW_QUEUE = int(os.environ.get("SHADOW_QUEUE", 64))
+
+SHADOW_ROWS = REGISTRY.counter('shadow_rows_total', 'Rows scored by the shadow candidate.', ['candidate'])
+SHADOW_AGREEMENTS = REGISTRY.counter(
+    'shadow_agreements_total', 'Shadow rows where the candidate label matched the served label.', ['candidate'])
+SHADOW_DROPPED = REGISTRY.counter('shadow_dropped_total', 'Sampled requests dropped because the shadow queue was full.')
+SHADOW_SECONDS = REGISTRY.histogram(
+    'shadow_inference_seconds', 'Inference time per shadowed request, by model role.', ['role'])
+
+class ShadowScorer:
+    """Scores a sample of served requests with a candidate LoadedModel on a background thread."""
+
+    def __init__(self, candidate, rate=0.1, max_queue=SHADOW_QUEUE, seed=None):
+        self.candidate = candidate
+        self.rate = rate
+        self.requests = 0
+        self.rows = 0
+        self.agreements = 0
+        self.abs_proba_diff = 0.0
+        self.primary_seconds = 0.0
+        self.candidate_seconds = 0.0
+        self.dropped = 0
+        self.errors = 0
+        self._random = random.Random(seed)
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='shadow-scorer', daemon=True)
+        self._thread.start()
+
+    def offer(self, X, labels, proba, primary):
+        """Maybe queue one served request for shadow scoring; never blocks."""
+        if self._stopped.is_set() or self._random.random() >= self.rate:
+            return False
+        try:
+            self._queue.put_nowait((X, labels, proba, primary))
+        except queue.Full:
+            self.dropped += 1
+            SHADOW_DROPPED.inc()
+            return False
+        return True
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None or self._stopped.is_set():
+                self._queue.task_done()
+                return
+            try:
+                self._compare(*item)
+            except Exception as e:
+                self.errors += 1
+                print(f"❌ Shadow scoring with {self.candidate.name} failed: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _compare(self, X, labels, proba, primary):
+        start = time.perf_counter()
+        primary.score(X)
+        primary_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        candidate_labels, candidate_proba = self.candidate.score(X)
+        seconds = time.perf_counter() - start
+        agree = int((candidate_labels == labels).sum())
+        with self._lock:
+            self.requests += 1
+            self.rows += len(X)
+            self.agreements += agree
+            self.abs_proba_diff += float(abs(candidate_proba - proba).max(axis=1).sum())
+            self.primary_seconds += primary_seconds
+            self.candidate_seconds += seconds
+        SHADOW_ROWS.inc(len(X), candidate=self.candidate.name)
+        SHADOW_AGREEMENTS.inc(agree, candidate=self.candidate.name)
+        SHADOW_SECONDS.observe(primary_seconds, role='primary')
+        SHADOW_SECONDS.observe(seconds, role='candidate')
+
+    def stop(self):
+        """Stop scoring without waiting: discard the queued samples and wake the thread."""
+        self._stopped.set()
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+            self._queue.task_done()
+        try:
+            self._queue.put_nowait(None)
+        except queue.Full:
+            pass  # the thread checks _stopped before its next sample
+
+    def drain(self, timeout=10.0):
+        """Wait until every queued sample has been scored (for tests and benchmarks)."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def stats(self):
+        with self._lock:
+            rows, requests = self.rows, self.requests
+            return {
+                'candidate': self.candidate.name,
+                'candidate_sha256': self.candidate.version,
+                'rate': self.rate,
+                'requests': requests,
+                'rows': rows,
+                'agreement': self.agreements / rows if rows else None,
+                'mean_abs_proba_diff': self.abs_proba_diff / rows if rows else None,
+                'mean_primary_seconds': self.primary_seconds / requests if requests else None,
+                'mean_candidate_seconds': self.candidate_seconds / requests if requests else None,
+                'queued': self._queue.qsize(),
+                'dropped': self.dropped,
+                'errors': self.errors,
+            }
@@ -0,0 +1,99 @@
+"""
+Mergeable quantile sketch for streaming statistics.
+
+QuantileSketch is a KLL-style compactor stack. Level i holds items that each
+stand for 2**i original values. When a level grows past k items it is sorted
+and every other item (random offset) moves up a level with double weight. Up to
+k values nothing is compacted and every answer is exact, with the same linear
+interpolation as numpy/pandas quantiles. Beyond that the rank error stays
+around n/k. Sketches built on separate chunks or processes can be merged.
+"""
+import numpy as np
+
+class QuantileSketch:
+    """Approximate quantiles and ranks of a stream of floats, exact up to k values."""
+
+    def __init__(self, k=8192, seed=None):
+        self.k = k
+        self.n = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def is_exact(self):
+        return len(self.levels) == 1
+
+    def update(self, values):
+        """Add an array of values; NaNs are ignored."""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return self
+        self.n += len(values)
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        """Fold another sketch into this one."""
+        if other.n == 0:
+            return self
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self.k:
+                items = np.sort(items)
+                # An odd item out stays behind so the total weight is preserved
+                keep = items[-1:] if len(items) % 2 else items[:0]
+                pairs = items[:len(items) - len(keep)]
+                promoted = pairs[self._rng.integers(2)::2]
+                self.levels[level] = keep
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def _weighted(self):
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2 ** level, dtype=np.float64)
+                                  for level, items in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        return items[order], weights[order]
+
+    def quantile(self, q):
+        """Value at quantile q (scalar or array), linear interpolation when exact."""
+        if self.n == 0:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+        if self.is_exact:
+            return np.quantile(self.levels[0], q)
+        items, weights = self._weighted()
+        # Item j covers ranks [cum[j] - w[j], cum[j]) of the weighted stream
+        cum = np.cumsum(weights)
+        target = np.asarray(q, dtype=np.float64) * (cum[-1] - 1)
+        index = np.minimum(np.searchsorted(cum, target, side='right'), len(items) - 1)
+        result = np.clip(items[index], self.min, self.max)
+        return result if np.ndim(q) else float(result)
+
+    def rank(self, x, inclusive=False):
+        """Number of values < x (<= x when inclusive), estimated from the sketch."""
+        side = 'right' if inclusive else 'left'
+        if self.is_exact:
+            return int(np.searchsorted(np.sort(self.levels[0]), x, side=side))
+        items, weights = self._weighted()
+        cum = np.concatenate([[0.0], np.cumsum(weights)])
+        return int(round(cum[np.searchsorted(items, x, side=side)]))
@@ -0,0 +1,182 @@
+"""
+One-pass, mergeable summary statistics.
+
+ColumnStats keeps, for one column:
+- count, mean and M2 (Welford, with Chan's formula to fold in whole chunks);
+- min and max;
+- the number of missing values;
+- a QuantileSketch for the median and quartiles.
+
+Accumulators built on different chunks or in different processes merge into
+the same result. The IQR outlier counts come from the sketch's ranks, so no
+second pass over the data is needed. Everything is exact while a column has
+at most QuantileSketch.k values and approximate beyond that.
+
+    python streaming_stats.py cleaned_nasa_data1.csv --workers 4
+"""
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from sketches import QuantileSketch
+
+# Rows per block when summarizing a memory-mapped dataset
+BLOCK_ROWS = 1 << 20
+
+class ColumnStats:
+    """Mergeable count/mean/variance/min/max/missing plus a quantile sketch for one column."""
+
+    def __init__(self, k=8192):
+        self.count = 0
+        self.missing = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.sketch = QuantileSketch(k)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        present = values[~np.isnan(values)]
+        self.missing += len(values) - len(present)
+        if len(present):
+            mean = float(present.mean())
+            self._combine(len(present), mean, float(np.square(present - mean).sum()))
+            self.min = min(self.min, float(present.min()))
+            self.max = max(self.max, float(present.max()))
+            self.sketch.update(present)
+        return self
+
+    def _combine(self, count, mean, m2):
+        # Chan et al. pairwise update of (count, mean, M2)
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+
+    def merge(self, other):
+        if other.count:
+            self._combine(other.count, other.mean, other.m2)
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+            self.sketch.merge(other.sketch)
+        self.missing += other.missing
+        return self
+
+    def var(self, ddof=1):
+        return self.m2 / (self.count - ddof) if self.count > ddof else np.nan
+
+    def std(self, ddof=1):
+        return float(np.sqrt(self.var(ddof)))
+
+    def quantile(self, q):
+        return self.sketch.quantile(q)
+
+    def iqr_bounds(self, factor=1.5):
+        q1, q3 = self.quantile([0.25, 0.75])
+        iqr = q3 - q1
+        return q1 - factor * iqr, q3 + factor * iqr
+
+    def outlier_count(self, factor=1.5):
+        """Values strictly outside the IQR fences, counted from the sketch's ranks."""
+        if not self.count:
+            return 0
+        lower, upper = self.iqr_bounds(factor)
+        return self.sketch.rank(lower) + (self.count - self.sketch.rank(upper, inclusive=True))
+
+    def summary(self):
+        """The statistics describe() reports, with pandas' conventions (std with ddof=1)."""
+        q1, median, q3 = self.quantile([0.25, 0.5, 0.75]) if self.count else (np.nan,) * 3
+        return {
+            'count': self.count,
+            'mean': self.mean if self.count else np.nan,
+            'std': self.std(),
+            'min': self.min if self.count else np.nan,
+            '25%': q1,
+            'median': median,
+            '75%': q3,
+            'max': self.max if self.count else np.nan,
+            'missing': self.missing,
+        }
+
+class FrameStats:
+    """ColumnStats for a set of columns, updated with DataFrame chunks."""
+
+    def __init__(self, columns, k=8192):
+        self.columns = list(columns)
+        self.stats = {col: ColumnStats(k) for col in self.columns}
+
+    def update(self, df):
+        for col in self.columns:
+            self.stats[col].update(df[col].to_numpy(dtype=np.float64, na_value=np.nan))
+        return self
+
+    def merge(self, other):
+        for col in self.columns:
+            self.stats[col].merge(other.stats[col])
+        return self
+
+    def summary(self):
+        """One column per feature, one row per statistic, like describe()."""
+        return pd.DataFrame({col: self.stats[col].summary() for col in self.columns})
+
+    def outlier_counts(self, factor=1.5):
+        return pd.Series({col: self.stats[col].outlier_count(factor) for col in self.columns})
+
+def numeric_columns(df, exclude=('Hazardous',)):
+    return [col for col in df.select_dtypes(include=[np.number]).columns if col not in exclude]
+
+def summarize_frame(df, columns=None, block_rows=BLOCK_ROWS):
+    """FrameStats of an in-memory (or memory-mapped) DataFrame, in row blocks."""
+    stats = FrameStats(columns if columns is not None else numeric_columns(df))
+    for start in range(0, len(df), block_rows):
+        stats.update(df.iloc[start:start + block_rows])
+    return stats
+
+def summarize_csv(path, columns=None, chunksize=100_000):
+    """FrameStats of a CSV read in chunks, so memory is bounded by chunksize."""
+    stats = None
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        stats = stats or FrameStats(columns if columns is not None else numeric_columns(chunk))
+        stats.update(chunk)
+    return stats
+
+def _summarize_rows(path, columns, start, stop):
+    from dataset import load_dataset
+
+    return summarize_frame(load_dataset(path, columns).iloc[start:stop], columns)
+
+def summarize_dataset(path, columns=None, workers=None, block_rows=BLOCK_ROWS):
+    """
+    FrameStats of a cached dataset, with row blocks summarized in parallel
+    and the per-block accumulators merged.
+    """
+    from dataset import load_dataset
+
+    df = load_dataset(path)
+    columns = columns if columns is not None else numeric_columns(df)
+    bounds = [(start, min(start + block_rows, len(df))) for start in range(0, len(df), block_rows)]
+    if workers == 1 or len(bounds) <= 1:
+        return summarize_frame(df, columns, block_rows)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        parts = pool.map(_summarize_rows, *zip(*[(path, columns, start, stop) for start, stop in bounds]))
+        stats = FrameStats(columns)
+        for part in parts:
+            stats.merge(part)
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description="One-pass summary statistics and IQR outlier counts.")
+    parser.add_argument('dataset', nargs='?', default='cleaned_nasa_data1.csv')
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+    stats = summarize_dataset(args.dataset, workers=args.workers)
+    print(stats.summary().T.round(4))
+    print("\nIQR outliers per column:")
+    print(stats.outlier_counts())
+
+if __name__ == "__main__":
+    main()
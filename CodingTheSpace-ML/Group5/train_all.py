@@ -0,0 +1,218 @@
+"""
+Retrain every model of the notebooks in one run.
+
+The dataset is parsed once into its memory-mapped column cache (dataset.py),
+so every worker process maps the same pages instead of holding its own copy.
+The train/test split and the CV folds are generated once and saved to the
+results directory; all searches score candidates on exactly those folds.
+Jobs run on a process pool in which each job gets an explicit core budget
+(n_jobs and BLAS/OpenMP threads), instead of every notebook asking for all
+cores at once.
+
+    python train_all.py cleaned_nasa_data1.csv --results results --cores-per-job 2
+
+Each job writes <results>/<model>/model.joblib, metrics.json and its search
+report; <results>/summary.json collects the metrics of all jobs.
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import (
+    accuracy_score,
+    f1_score,
+    precision_score,
+    recall_score,
+    roc_auc_score,
+)
+from sklearn.model_selection import StratifiedKFold
+from threadpoolctl import threadpool_limits
+
+import feature_selection
+import ml_helpers as hlp
+import tuning
+from model_store import file_checksum
+
+RANDOM_STATE = 42
+
+# Same grids as the notebooks
+RF_PARAM_GRID = {
+    'n_estimators': [100, 200, 300],
+    'max_depth': [None, 10, 20, 30],
+    'min_samples_split': [2, 5, 10],
+    'min_samples_leaf': [1, 2, 4],
+    'max_features': ['sqrt', 'log2', None],
+    'bootstrap': [True, False],
+    'criterion': ['gini', 'entropy'],
+}
+
+SVC_PARAM_GRID = {
+    'C': [0.1, 1, 10, 50],
+    'kernel': ['linear', 'poly', 'rbf', 'sigmoid'],
+    'degree': [2, 3],
+    'gamma': ['scale', 'auto'],
+}
+
+def logistic_param_grid(n_features):
+    return [
+        {
+            'feature_selection__n_features_to_select': list(range(1, n_features + 1)),
+            'classifier__C': [0.1, 1, 10, 20, 50],
+            'classifier__penalty': ['l1'],
+            'classifier__solver': ['liblinear', 'saga'],
+        },
+        {
+            'feature_selection__n_features_to_select': list(range(1, n_features + 1)),
+            'classifier__C': [0.1, 1, 10, 20, 50],
+            'classifier__penalty': ['l2'],
+            'classifier__solver': ['liblinear', 'saga', 'lbfgs', 'newton-cg'],
+        },
+    ]
+
+def make_splits(data_path, results_dir):
+    """Split once and save the test rows and the 3- and 5-fold CV splits of the training rows."""
+    X, y = hlp.load_data(data_path)
+    X_train, X_test, _, _ = hlp.split_data(X, y, random_state=RANDOM_STATE)
+    y_train = y.to_numpy()[X_train.index.to_numpy()]
+    splits = {'train': X_train.index.to_numpy(), 'test': X_test.index.to_numpy()}
+    for cv in (3, 5):
+        for k, (train, val) in enumerate(StratifiedKFold(n_splits=cv).split(X_train, y_train)):
+            splits[f'cv{cv}_{k}_train'] = train
+            splits[f'cv{cv}_{k}_val'] = val
+    path = os.path.join(results_dir, 'splits.npz')
+    np.savez(path, **splits)
+    return path
+
+def load_splits(path, cv):
+    splits = np.load(path)
+    folds = [(splits[f'cv{cv}_{k}_train'], splits[f'cv{cv}_{k}_val']) for k in range(cv)]
+    return splits['train'], splits['test'], folds
+
+def classification_metrics(model, X_test, y_test):
+    y_pred = model.predict(X_test)
+    metrics = {
+        'accuracy': accuracy_score(y_test, y_pred),
+        'f1': f1_score(y_test, y_pred),
+        'precision': precision_score(y_test, y_pred),
+        'recall': recall_score(y_test, y_pred),
+    }
+    scores = model.predict_proba(X_test)[:, 1] if hasattr(model, 'predict_proba') else model.decision_function(X_test)
+    metrics['roc_auc'] = roc_auc_score(y_test, scores)
+    return metrics
+
+def train_random_forest(X_train, y_train, splits_path, n_jobs, out_dir):
+    folds = load_splits(splits_path, 5)[2]
+    _, best_params, report = tuning.tune_random_forest(
+        X_train, y_train, RF_PARAM_GRID, n_jobs=n_jobs, folds=folds,
+        report_path=os.path.join(out_dir, 'search_report.csv'))
+    # Like the notebook: refit on the 6 most important features of the tuned forest
+    forest = RandomForestClassifier(**best_params, random_state=RANDOM_STATE, n_jobs=n_jobs).fit(X_train, y_train)
+    importances = pd.DataFrame({'Feature': X_train.columns, 'Importance': forest.feature_importances_})
+    importances = importances.sort_values(by='Importance', ascending=False)
+    importances.to_csv(os.path.join(out_dir, 'feature_importances.csv'), index=False)
+    features = importances.head(6)['Feature'].tolist()
+    model = RandomForestClassifier(**best_params, random_state=RANDOM_STATE).fit(X_train[features], y_train)
+    return model, features, best_params
+
+def train_svm(X_train, y_train, splits_path, n_jobs, out_dir):
+    features, selection = feature_selection.select_features(
+        X_train, y_train, 6, 10, method='sffs', folds=load_splits(splits_path, 3)[2])
+    with open(os.path.join(out_dir, 'feature_search.json'), 'w') as f:
+        json.dump(selection, f, indent=2)
+    model, best_params, _ = tuning.tune_svc(
+        X_train[features], y_train, SVC_PARAM_GRID, n_jobs=n_jobs, folds=load_splits(splits_path, 5)[2],
+        report_path=os.path.join(out_dir, 'search_report.csv'))
+    return model, features, best_params
+
+def train_logistic(X_train, y_train, splits_path, n_jobs, out_dir):
+    model, best_params, _ = tuning.tune_logistic_rfe(
+        X_train, y_train, logistic_param_grid(X_train.shape[1]), n_jobs=n_jobs,
+        folds=load_splits(splits_path, 5)[2], report_path=os.path.join(out_dir, 'search_report.csv'))
+    support = model.named_steps['feature_selection'].support_
+    return model, X_train.columns[support].tolist(), best_params
+
+JOBS = {
+    'random_forest': train_random_forest,
+    'svm': train_svm,
+    'logistic_regression': train_logistic,
+}
+
+def run_job(name, data_path, splits_path, results_dir, cores):
+    """Train one model within its core budget and write its artifacts."""
+    with threadpool_limits(limits=cores):
+        start = time.perf_counter()
+        out_dir = os.path.join(results_dir, name)
+        os.makedirs(out_dir, exist_ok=True)
+
+        X, y = hlp.load_data(data_path)
+        train, test, _ = load_splits(splits_path, 5)
+        X_train, y_train = X.iloc[train], y.iloc[train]
+        model, features, best_params = JOBS[name](X_train, y_train, splits_path, cores, out_dir)
+
+        X_test = X.iloc[test]
+        # The logistic pipeline selects its own columns
+        X_test = X_test if name == 'logistic_regression' else X_test[features]
+        metrics = classification_metrics(model, X_test, y.iloc[test])
+        joblib.dump(model, os.path.join(out_dir, 'model.joblib'))
+        result = {
+            'model': name,
+            'features': features,
+            'best_params': best_params,
+            'test_metrics': metrics,
+            'cores': cores,
+            'seconds': time.perf_counter() - start,
+        }
+        with open(os.path.join(out_dir, 'metrics.json'), 'w') as f:
+            json.dump(result, f, indent=2, default=str)
+        return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Retrain all models in parallel on shared folds.")
+    parser.add_argument('dataset', nargs='?', default='cleaned_nasa_data1.csv')
+    parser.add_argument('--results', default='results')
+    parser.add_argument('--models', nargs='+', choices=sorted(JOBS), default=list(JOBS))
+    parser.add_argument('--cores-per-job', type=int, default=None,
+                        help="cores for each job (default: available cores split evenly across jobs)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    os.makedirs(args.results, exist_ok=True)
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count()
+    cores = args.cores_per_job or max(1, cpus // len(args.models))
+    workers = max(1, min(len(args.models), cpus // cores))
+
+    # Parse once into the shared column cache, then split once
+    splits_path = make_splits(args.dataset, args.results)
+    print(f"Training {args.models} on {workers} worker(s) x {cores} core(s)")
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run_job, name, args.dataset, splits_path, args.results, cores): name
+                   for name in args.models}
+        for future in as_completed(futures):
+            result = future.result()
+            results[result['model']] = result
+            print(f"{result['model']}: F1 {result['test_metrics']['f1']:.4f} "
+                  f"in {result['seconds']:.1f}s -> {os.path.join(args.results, result['model'])}")
+
+    summary = {
+        'dataset': args.dataset,
+        'dataset_sha256': file_checksum(args.dataset),
+        'random_state': RANDOM_STATE,
+        'cores_per_job': cores,
+        'workers': workers,
+        'seconds': time.perf_counter() - start,
+        'models': results,
+    }
+    with open(os.path.join(args.results, 'summary.json'), 'w') as f:
+        json.dump(summary, f, indent=2, default=str)
+    print(f"Done in {summary['seconds']:.1f}s, summary in {os.path.join(args.results, 'summary.json')}")
+
+if __name__ == "__main__":
+    main()
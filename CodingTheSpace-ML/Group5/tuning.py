@@ -0,0 +1,309 @@
+"""
+Budgeted hyperparameter search shared by the training notebooks.
+
+Successive halving scores every candidate on a small budget, keeps the best
+1/eta and re-scores the survivors on eta times the budget until the full
+budget is reached. Hyperband runs several halving brackets that trade the
+number of candidates against the starting budget.
+
+For random forests the budget is the number of trees. Forests are grown in
+place with warm_start, so a survivor only fits its new trees and ends up
+identical to a forest fitted from scratch with the same random_state. For the
+other models the budget is the number of training rows per fold.
+
+Fold splits are computed once, and fitted preprocessing (e.g. RFE rankings) is
+cached per fold and shared by every candidate. Full-budget scores use the same
+StratifiedKFold splits as GridSearchCV(cv=k), so they match a grid search's
+mean_test_score exactly.
+"""
+import copy
+import math
+import time
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.feature_selection import RFE
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import f1_score
+from sklearn.model_selection import ParameterGrid, StratifiedKFold
+from sklearn.svm import SVC
+
+import ml_helpers as hlp
+
+class FoldCache:
+    """Training data as one array, its CV splits and anything fitted per fold."""
+
+    def __init__(self, X, y, cv=5, folds=None):
+        hlp.validate_training_data(X, y)
+        self.columns = list(X.columns) if hasattr(X, 'columns') else None
+        self.X = np.ascontiguousarray(X, dtype=np.float64)
+        self.y = np.asarray(y)
+        # folds given as (train, val) position arrays are shared with other searches
+        self.folds = list(folds) if folds is not None else list(StratifiedKFold(n_splits=cv).split(self.X, self.y))
+        self._orders = {}
+        self._fitted = {}
+
+    def train_rows(self, fold, n_rows=None):
+        """
+        Training rows of fold, or the first n_rows of a fixed stratified shuffle
+        of them. Smaller budgets see a subset of the rows of larger ones.
+        """
+        train = self.folds[fold][0]
+        if n_rows is None or n_rows >= len(train):
+            return train
+        order = self._orders.get(fold)
+        if order is None:
+            # Spread each class evenly over the order so every prefix keeps the class ratio
+            rng = np.random.default_rng(fold)
+            position = np.empty(len(train))
+            labels = self.y[train]
+            for label in np.unique(labels):
+                members = np.flatnonzero(labels == label)
+                position[members] = (rng.permutation(len(members)) + rng.random()) / len(members)
+            order = self._orders[fold] = train[np.argsort(position, kind='stable')]
+        return np.sort(order[:n_rows])
+
+    def fitted(self, key, fold, fit):
+        """Return fit() for (key, fold), computing it only once."""
+        value = self._fitted.get((key, fold))
+        if value is None:
+            value = self._fitted[(key, fold)] = fit()
+        return value
+
+    def score(self, estimator, fold, columns=None):
+        val = self.folds[fold][1]
+        X = self.X[val] if columns is None else self.X[np.ix_(val, columns)]
+        return f1_score(self.y[val], estimator.predict(X))
+
+class Evaluator:
+    """Scores candidates at a budget; subclasses implement score_fold."""
+
+    def __init__(self, cache, candidates, n_jobs=None):
+        self.cache = cache
+        self.candidates = list(candidates)
+        self.n_jobs = n_jobs
+
+    def score_fold(self, index, fold, resource):
+        raise NotImplementedError
+
+    def scores(self, indices, resource):
+        """Mean F1 over the folds for each candidate index."""
+        n_folds = len(self.cache.folds)
+        tasks = [(i, f) for i in indices for f in range(n_folds)]
+        # Fitting releases the GIL, and threads avoid copying fitted state between processes
+        results = Parallel(n_jobs=self.n_jobs, prefer='threads')(
+            delayed(self.score_fold)(i, f, resource) for i, f in tasks)
+        return np.asarray(results).reshape(len(indices), n_folds).mean(axis=1)
+
+    def discard(self, indices):
+        """Forget any state kept for candidates that were eliminated."""
+
+def first_trees(forest, n_trees):
+    """View of a fitted forest restricted to its first n_trees trees."""
+    if n_trees >= len(forest.estimators_):
+        return forest
+    view = copy.copy(forest)
+    view.estimators_ = forest.estimators_[:n_trees]
+    view.n_estimators = n_trees
+    return view
+
+class ForestEvaluator(Evaluator):
+    """Budget = n_estimators. Each (candidate, fold) forest is grown in place between rungs."""
+
+    def __init__(self, cache, candidates, base=None, n_jobs=None):
+        super().__init__(cache, candidates, n_jobs)
+        self.base = base if base is not None else RandomForestClassifier(random_state=42)
+        self.forests = {}
+
+    def forest(self, index, fold, n_trees):
+        forest = self.forests.get((index, fold))
+        if forest is None:
+            forest = clone(self.base).set_params(**self.candidates[index], warm_start=True, n_jobs=1)
+            self.forests[(index, fold)] = forest
+        elif len(forest.estimators_) >= n_trees:
+            return first_trees(forest, n_trees)
+        rows = self.cache.train_rows(fold)
+        forest.set_params(n_estimators=n_trees).fit(self.cache.X[rows], self.cache.y[rows])
+        return forest
+
+    def score_fold(self, index, fold, resource):
+        return self.cache.score(self.forest(index, fold, resource), fold)
+
+    def discard(self, indices):
+        for index in indices:
+            for fold in range(len(self.cache.folds)):
+                self.forests.pop((index, fold), None)
+
+class SubsampleEvaluator(Evaluator):
+    """
+    Budget = training rows per fold. prepare(params, cache, fold, rows) returns
+    the unfitted estimator and the column indices it uses (None for all).
+    """
+
+    def __init__(self, cache, candidates, prepare, n_jobs=None):
+        super().__init__(cache, candidates, n_jobs)
+        self.prepare = prepare
+
+    def score_fold(self, index, fold, resource):
+        rows = self.cache.train_rows(fold, resource)
+        estimator, columns = self.prepare(self.candidates[index], self.cache, fold, rows)
+        X = self.cache.X[rows] if columns is None else self.cache.X[np.ix_(rows, columns)]
+        estimator.fit(X, self.cache.y[rows])
+        return self.cache.score(estimator, fold, columns)
+
+def rung_resources(n_candidates, min_resource, max_resource, eta=3):
+    """Budgets per rung: geometric with ratio eta, ending at max_resource, no more rungs than needed."""
+    n_rungs = int(math.floor(math.log(max_resource / min_resource, eta) + 1e-9)) + 1
+    n_rungs = max(1, min(n_rungs, int(math.ceil(math.log(max(n_candidates, 1), eta) - 1e-9)) + 1))
+    return [int(round(max_resource / eta ** (n_rungs - 1 - r))) for r in range(n_rungs)]
+
+def successive_halving(evaluator, indices, min_resource, max_resource, eta=3,
+                       report=None, bracket=0, start=None):
+    """
+    Run one halving bracket over the candidate indices. Returns the last rung
+    as a list of (score, index) sorted best first and appends one row per rung
+    to report.
+    """
+    start = time.perf_counter() if start is None else start
+    survivors = list(indices)
+    resources = rung_resources(len(survivors), min_resource, max_resource, eta)
+    for rung, resource in enumerate(resources):
+        rung_start = time.perf_counter()
+        scores = evaluator.scores(survivors, resource)
+        ranked = sorted(zip(scores.tolist(), survivors), key=lambda item: (-item[0], item[1]))
+        if report is not None:
+            report.append({
+                'bracket': bracket,
+                'rung': rung,
+                'resource': resource,
+                'candidates': len(survivors),
+                'rung_seconds': time.perf_counter() - rung_start,
+                'elapsed_seconds': time.perf_counter() - start,
+                'best_score': ranked[0][0],
+                'best_params': evaluator.candidates[ranked[0][1]],
+            })
+        if rung == len(resources) - 1:
+            return ranked
+        keep = max(1, int(math.ceil(len(survivors) / eta)))
+        evaluator.discard([index for _, index in ranked[keep:]])
+        survivors = [index for _, index in ranked[:keep]]
+
+def hyperband(evaluator, min_resource, max_resource, eta=3, report=None, random_state=42):
+    """
+    Hyperband over the evaluator's candidates: brackets from many candidates
+    at min_resource down to a few at max_resource, each drawing its own
+    random subset. Returns every bracket's last rung merged, best first.
+    """
+    start = time.perf_counter()
+    rng = np.random.default_rng(random_state)
+    n_total = len(evaluator.candidates)
+    s_max = int(math.floor(math.log(max_resource / min_resource, eta) + 1e-9))
+    finalists = []
+    for s in range(s_max, -1, -1):
+        n = min(n_total, int(math.ceil((s_max + 1) / (s + 1) * eta ** s)))
+        indices = sorted(rng.choice(n_total, size=n, replace=False).tolist())
+        bracket_min = max(min_resource, int(round(max_resource / eta ** s)))
+        finalists += successive_halving(evaluator, indices, bracket_min, max_resource, eta,
+                                        report, bracket=s_max - s, start=start)
+    best = {}
+    for score, index in finalists:
+        best[index] = max(score, best.get(index, -np.inf))
+    return sorted(((score, index) for index, score in best.items()), key=lambda item: (-item[0], item[1]))
+
+def search(evaluator, min_resource, max_resource, method='halving', eta=3, report=None):
+    if method == 'halving':
+        return successive_halving(evaluator, range(len(evaluator.candidates)),
+                                  min_resource, max_resource, eta, report)
+    if method == 'hyperband':
+        return hyperband(evaluator, min_resource, max_resource, eta, report)
+    raise ValueError(f"Unknown search method '{method}', expected 'halving' or 'hyperband'.")
+
+def report_frame(report, path=None):
+    """Time-vs-score report as a DataFrame, optionally saved as CSV."""
+    df = pd.DataFrame(report)
+    if path:
+        df.to_csv(path, index=False)
+        print(f"Search report saved to {path}")
+    return df
+
+def tune_random_forest(X_train, y_train, param_grid, method='halving', eta=3, min_trees=10,
+                       cv=5, n_jobs=-1, report_path=None, folds=None):
+    """
+    Budgeted replacement for GridSearchCV over a RandomForestClassifier grid.
+    n_estimators in param_grid is the budget: survivors of the last rung are
+    compared at each of its values. Returns the refitted best model, its
+    params and the time-vs-score report.
+    """
+    grid = dict(param_grid)
+    n_estimators = sorted(grid.pop('n_estimators', [100]))
+    cache = FoldCache(X_train, y_train, cv, folds)
+    evaluator = ForestEvaluator(cache, ParameterGrid(grid), n_jobs=n_jobs)
+    report = []
+    finalists = search(evaluator, min_trees, n_estimators[-1], method, eta, report)
+
+    # Smaller n_estimators from the grid are the first trees of the grown forests
+    best_score, best_params = -np.inf, None
+    for _, index in finalists:
+        for n_trees in n_estimators:
+            score = evaluator.scores([index], n_trees)[0]
+            if score > best_score:
+                best_score, best_params = score, {**evaluator.candidates[index], 'n_estimators': n_trees}
+    print(f"Best Parameters Found: {best_params} (F1 {best_score:.4f})")
+
+    model = clone(evaluator.base).set_params(**best_params).fit(X_train, y_train)
+    return model, best_params, report_frame(report, report_path)
+
+def tune_logistic_rfe(X_train, y_train, param_grid, method='halving', eta=3, min_rows=200,
+                      cv=5, n_jobs=-1, report_path=None, folds=None):
+    """
+    Budgeted search over the RFE + LogisticRegression pipeline grid of the
+    logistic notebook. The RFE elimination order is fitted once per fold (and
+    row budget) and shared by every n_features_to_select. Returns the refitted
+    best pipeline, its params and the report.
+    """
+    from sklearn.pipeline import Pipeline
+
+    cache = FoldCache(X_train, y_train, cv, folds)
+
+    def prepare(params, cache, fold, rows):
+        def fit_ranking():
+            rfe = RFE(LogisticRegression(max_iter=1000, solver='liblinear'), n_features_to_select=1)
+            return rfe.fit(cache.X[rows], cache.y[rows]).ranking_
+        ranking = cache.fitted(('rfe', len(rows)), fold, fit_ranking)
+        columns = np.flatnonzero(ranking <= params['feature_selection__n_features_to_select'])
+        classifier = {key.split('__', 1)[1]: value for key, value in params.items()
+                      if key.startswith('classifier__')}
+        return LogisticRegression(max_iter=1000, **classifier), columns
+
+    evaluator = SubsampleEvaluator(cache, ParameterGrid(param_grid), prepare, n_jobs=n_jobs)
+    report = []
+    finalists = search(evaluator, min_rows, len(cache.folds[0][0]), method, eta, report)
+    best_score, best_index = finalists[0]
+    best_params = evaluator.candidates[best_index]
+    print(f"Best Parameters Found: {best_params} (F1 {best_score:.4f})")
+
+    pipe = Pipeline([
+        ('feature_selection', RFE(estimator=LogisticRegression(max_iter=1000, solver='liblinear'))),
+        ('classifier', LogisticRegression(max_iter=1000))
+    ])
+    model = pipe.set_params(**best_params).fit(X_train, y_train)
+    return model, best_params, report_frame(report, report_path)
+
+def tune_svc(X_train, y_train, param_grid, method='halving', eta=3, min_rows=200,
+             cv=5, n_jobs=-1, report_path=None, folds=None):
+    """Budgeted replacement for GridSearchCV over an SVC grid. Returns the refitted best model, its params and the report."""
+    cache = FoldCache(X_train, y_train, cv, folds)
+
+    def prepare(params, cache, fold, rows):
+        return SVC(random_state=42, **params), None
+
+    evaluator = SubsampleEvaluator(cache, ParameterGrid(param_grid), prepare, n_jobs=n_jobs)
+    report = []
+    finalists = search(evaluator, min_rows, len(cache.folds[0][0]), method, eta, report)
+    best_params = evaluator.candidates[finalists[0][1]]
+    print(f"Best Parameters Found: {best_params} (F1 {finalists[0][0]:.4f})")
+    model = SVC(random_state=42, **best_params).fit(X_train, y_train)
+    return model, best_params, report_frame(report, report_path)
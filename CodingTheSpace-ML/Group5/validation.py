@@ -1,24 +1,71 @@
+import io
+import os
+
+import numpy as np
 import pandas as pd
 
+import csv_reader
+
+# Schema of required columns shared by the backend and the offline validator
+REQUIRED_COLUMNS = [
+    'Minimum Orbit Intersection',
+    'Absolute Magnitude',
+    'Avg_Diameter_KM',
+    'Perihelion Distance',
+    'Orbit Uncertainity',
+    'Inclination'
+]
+
+DEFAULT_MEANS = {
+    'Minimum Orbit Intersection': 0.4768977851980138,
+    'Absolute Magnitude': 0.1591059336579516,
+    'Avg_Diameter_KM': 0.13758845293463146,
+    'Perihelion Distance': 0.0479985661169944,
+    'Orbit Uncertainity': 0.04306290759519788,
+    'Inclination': 0.04022213144882968
+}
+
+# Columns parsed from uploads, with pinned dtypes; the plan copies features into float64 anyway
+UPLOAD_COLUMNS = REQUIRED_COLUMNS + ['Hazardous']
+UPLOAD_DTYPES = {**{col: np.float64 for col in REQUIRED_COLUMNS}, 'Hazardous': np.int8}
+
+class ValidationError(ValueError):
+    """A rejected upload; kind names the failed rule for error metrics."""
+
+    def __init__(self, message, kind):
+        super().__init__(message)
+        self.kind = kind
+
 #make sure the file is .csv
 def validate_file_type(filepath):
     if not str(filepath).endswith(".csv"):
-        raise ValueError("Invalid file type. Please upload a CSV file.")
+        raise ValidationError("Invalid file type. Please upload a CSV file.", "file_type")
 
-#make sure that it will load without errors
-def load_csv(filepath):
+#make sure that it will load without errors; columns limits what is parsed
+def load_csv(filepath, columns=None, dtypes=None):
     try:
-        df = pd.read_csv(filepath)
-        df.columns = df.columns.str.strip()  # normalize columns
-        return df
+        return csv_reader.read_csv(filepath, columns, dtypes)  # column names come back stripped
     except Exception as e:
-        raise ValueError(f"Failed to load CSV file: {e}")
+        raise ValidationError(f"Failed to load CSV file: {e}", "unreadable")
+
+def unparsed_row_keys(source, columns):
+    """
+    Callable returning per-row hashes of the columns of source (a path or bytes)
+    outside columns, for ValidationPlan.apply; None when there are no others.
+    """
+    def open_source():
+        return io.BytesIO(source) if isinstance(source, bytes) else source
+
+    others = [col for col in csv_reader.header_columns(open_source()) if col not in columns]
+    if not others:
+        return None
+    return lambda: csv_reader.row_hashes(open_source(), others)
 
 def validate_required_columns(df, required_columns, default_means):
     missing_cols = [col for col in required_columns if col not in df.columns]
 
     if len(missing_cols) >= 3:
-        raise ValueError(f"Too many required columns are missing: {missing_cols}")
+        raise ValidationError(f"Too many required columns are missing: {missing_cols}", "missing_columns")
 
     if 0 < len(missing_cols) <= 2:
         print(f"Missing columns detected: {missing_cols}")
@@ -30,14 +77,14 @@ def validate_required_columns(df, required_columns, default_means):
 def validate_numeric_columns(df, numeric_columns):
     for col in numeric_columns:
         if not pd.api.types.is_numeric_dtype(df[col]):
-            raise ValueError(f"Column '{col}' must be numeric.")
+            raise ValidationError(f"Column '{col}' must be numeric.", "non_numeric")
 
 def validate_missing_values(df, default_means):
 
     # Check per row
     rows_with_many_missing = df.isnull().sum(axis=1) > 2
     if rows_with_many_missing.any():
-        raise ValueError("One or more rows have more than 2 missing values. File rejected.")
+        raise ValidationError("One or more rows have more than 2 missing values. File rejected.", "missing_values")
 
     # Fill per column
     missing_cols = df.columns[df.isnull().any()].tolist()
@@ -49,58 +96,205 @@ def validate_missing_values(df, default_means):
             if default is not None:
                 df[col] = df[col].fillna(default)
             else:
-                raise ValueError(f"No default mean provided for column: {col}")
+                raise ValidationError(f"No default mean provided for column: {col}", "missing_values")
 
     return df
 
 def validate_row_count(df):
     if len(df) == 0:
-        raise ValueError("CSV file contains no rows.")
+        raise ValidationError("CSV file contains no rows.", "empty")
 
 def remove_duplicates(df):
     return df.drop_duplicates()
 
+#read the CSV in fixed-size row chunks so large files never load all at once
+def iter_csv_chunks(source, chunksize=50_000, columns=None):
+    reader = csv_reader.iter_csv(source, columns, chunksize=chunksize)
+    try:
+        # The header is read and the first chunk parsed on the first step
+        first = next(reader, None)
+    except pd.errors.EmptyDataError:
+        raise ValidationError("CSV file contains no rows.", "empty")
+    except Exception as e:
+        raise ValidationError(f"Failed to load CSV file: {e}", "unreadable")
+    if first is not None:
+        yield first
+        yield from reader
 
-def validate_input_data(filepath):
+#run the per-row checks on one chunk and return the required columns only
+def validate_chunk(df, plan=None):
+    plan = plan or DEFAULT_PLAN
+    # duplicates are only dropped within the chunk to keep memory bounded
+    return plan.apply(df)
 
-    validate_file_type(filepath)
 
-    df = load_csv(filepath)
+class ValidationPlan:
+    """
+    Single-pass validator compiled once from the required-column schema and
+    default means. It runs the same rules as the functions above (missing
+    columns, rows with too many missing values, numeric columns, duplicates)
+    over one float64 matrix instead of copying the DataFrame at each step.
+    With mean and scale it also standardizes the filled matrix in place, so
+    raw-unit uploads get the training scaler in the same pass.
+    """
 
-    # Define schema of required columns
-    required_columns = [
-        'Minimum Orbit Intersection',
-        'Absolute Magnitude',
-        'Avg_Diameter_KM',
-        'Perihelion Distance',
-        'Orbit Uncertainity',
-        'Inclination'
-    ]
-    numeric_columns = required_columns
+    def __init__(self, required_columns=REQUIRED_COLUMNS, default_means=DEFAULT_MEANS,
+                 max_missing_columns=2, max_missing_per_row=2, mean=None, scale=None):
+        self.columns = list(required_columns)
+        self.fill_values = np.array([default_means.get(col, 0.0) for col in self.columns],
+                                    dtype=np.float64)
+        self.max_missing_columns = max_missing_columns
+        self.max_missing_per_row = max_missing_per_row
+        self.mean = None if mean is None else np.array([mean[col] for col in self.columns])
+        self.scale = None if scale is None else np.array([scale[col] for col in self.columns])
 
-    allowed_orbits = ['Earth']  # update if needed
+    @classmethod
+    def from_preprocessing(cls, preprocessing, units='scaled', required_columns=REQUIRED_COLUMNS):
+        """
+        Plan that fills gaps with the training medians. units='scaled' expects
+        already standardized uploads; units='raw' standardizes them as well.
+        """
+        if units == 'raw':
+            return cls(required_columns, preprocessing.fill_values,
+                       mean=preprocessing.mean, scale=preprocessing.scale)
+        if units != 'scaled':
+            raise ValidationError(f"Unknown units '{units}', expected 'scaled' or 'raw'.", "units")
+        return cls(required_columns, preprocessing.scaled_fill_values())
+
+    def build_matrix(self, df, passthrough=()):
+        """Copy the schema (and passthrough) columns into one C-ordered float64 matrix."""
+        missing_cols = [col for col in self.columns if col not in df.columns]
+        if len(missing_cols) > self.max_missing_columns:
+            raise ValidationError(f"Too many required columns are missing: {missing_cols}", "missing_columns")
+        if missing_cols:
+            print(f"Missing columns detected: {missing_cols}")
+            print("Filling missing columns with default mean values…")
+
+        columns = self.columns + list(passthrough)
+        X = np.empty((len(df), len(columns)), dtype=np.float64)
+        for j, col in enumerate(columns):
+            if col not in df.columns:
+                X[:, j] = self.fill_values[j]
+                continue
+            values = df[col]
+            if not pd.api.types.is_numeric_dtype(values):
+                raise ValidationError(f"Column '{col}' must be numeric.", "non_numeric")
+            X[:, j] = values.to_numpy(dtype=np.float64, na_value=np.nan)
+        return X
+
+    def fill_missing(self, X):
+        """Reject rows with too many gaps, then fill the rest with the default means in place."""
+        k = len(self.columns)
+        missing = np.isnan(X[:, :k])
+        missing_per_row = missing.sum(axis=1)
+        if (missing_per_row > self.max_missing_per_row).any():
+            raise ValidationError(f"One or more rows have more than {self.max_missing_per_row} "
+                                  "missing values. File rejected.", "missing_values")
+        if missing_per_row.any():
+            np.copyto(X[:, :k], np.broadcast_to(self.fill_values, missing.shape), where=missing)
+        return missing_per_row
+
+    @staticmethod
+    def duplicate_mask(X, extra_keys=None):
+        """
+        Mark rows equal to an earlier row. Rows are hashed, sorted stably by hash
+        and compared to their sorted neighbour, so a collision of the row hashes
+        can only keep an extra row. extra_keys holds per-row uint64 hashes of any
+        columns that are not part of X; those are compared as hashes, so a 64-bit
+        collision there can drop a row that differs only in those columns.
+        """
+        if len(X) < 2:
+            return np.zeros(len(X), dtype=bool)
+        X += 0.0  # fold -0.0 into 0.0 so equal values share a bit pattern
+        bits = X.view(np.uint64)
+        if extra_keys is not None:
+            bits = np.column_stack([bits, extra_keys])
+        hashes = bits[:, 0].copy()
+        for j in range(1, bits.shape[1]):
+            hashes *= np.uint64(0x9E3779B97F4A7C15)
+            hashes ^= bits[:, j]
+        order = np.argsort(hashes, kind='stable')
+        ordered = bits[order]
+        duplicated = np.zeros(len(X), dtype=bool)
+        duplicated[order[1:]] = (ordered[1:] == ordered[:-1]).all(axis=1)
+        return duplicated
+
+    def apply(self, df, passthrough=(), drop_duplicates=True, other_keys=None):
+        """
+        Validate and clean df, returning the schema columns plus any passthrough
+        columns. other_keys returns per-row uint64 hashes of uploaded columns
+        that were not parsed into df; it is only called when some rows repeat.
+        """
+        passthrough = [col for col in passthrough if col in df.columns]
+        X = self.build_matrix(df, passthrough)
+        self.fill_missing(X)
+        if self.mean is not None:
+            k = len(self.columns)
+            X[:, :k] -= self.mean
+            X[:, :k] /= self.scale
+        if len(X) == 0:
+            raise ValidationError("CSV file contains no rows.", "empty")
+
+        index = df.index
+        if drop_duplicates:
+            # Like drop_duplicates on the full frame: other uploaded columns count too,
+            # whether they are in df or only hashed on demand by other_keys
+            extras = [col for col in df.columns if col not in self.columns and col not in passthrough]
+            extra_keys = pd.util.hash_pandas_object(df[extras], index=False).to_numpy() if extras else None
+            keep = ~self.duplicate_mask(X, extra_keys)
+            if other_keys is not None and not keep.all():
+                # Rows repeat in the parsed columns; only now are the others worth parsing
+                other = other_keys()
+                extra_keys = other if extra_keys is None else np.column_stack([extra_keys, other])
+                keep = ~self.duplicate_mask(X, extra_keys)
+            if not keep.all():
+                X = X[keep]
+                index = index[keep]
+
+        cleaned = pd.DataFrame(X, columns=self.columns + passthrough, index=index, copy=False)
+        for col in passthrough:
+            cleaned[col] = cleaned[col].astype(df[col].dtype)
+        return cleaned
 
-    default_means = {
-    'Minimum Orbit Intersection': 0.4768977851980138,
-    'Absolute Magnitude': 0.1591059336579516,
-    'Avg_Diameter_KM': 0.13758845293463146,
-    'Perihelion Distance': 0.0479985661169944,
-    'Orbit Uncertainity': 0.04306290759519788,
-    'Inclination': 0.04022213144882968
-    }
 
+DEFAULT_PLAN = ValidationPlan()
 
-    #  Run validations
-    df = validate_required_columns(df, required_columns, default_means)
-    validate_numeric_columns(df, numeric_columns)
-    validate_missing_values(df, default_means)
-    validate_row_count(df)
 
-    #  Clean up
-    df = remove_duplicates(df)
+def load_model_preprocessing():
+    """Preprocessing bundled with the configured model, or None without one."""
+    from model_store import file_checksum, model_source
+    from preprocessing import load_bundled, preprocessing_path
+
+    model_path, _ = model_source()
+    if not os.path.exists(preprocessing_path(model_path)):
+        return None
+    return load_bundled(model_path, file_checksum(model_path))
+
+
+def validate_input_data(filepath, preprocessing=None, units='scaled'):
+
+    validate_file_type(filepath)
+
+    df = load_csv(filepath, UPLOAD_COLUMNS, UPLOAD_DTYPES)
+    other_keys = unparsed_row_keys(filepath, UPLOAD_COLUMNS)
+
+    # Define schema of required columns
+    required_columns = REQUIRED_COLUMNS
+
+    allowed_orbits = ['Earth']  # update if needed
+
+    # Prefer the training statistics bundled with the model over the literal defaults
+    if preprocessing is None:
+        preprocessing = load_model_preprocessing()
 
-    final_columns = required_columns + (['Hazardous'] if 'Hazardous' in df.columns else [])
-    df_ready = df[final_columns]
+    #  Run validations and clean up in a single pass
+    if preprocessing is not None:
+        plan = ValidationPlan.from_preprocessing(preprocessing, units, required_columns)
+    elif units == 'raw':
+        raise ValidationError("Raw-unit data needs a preprocessing artifact bundled with the model.", "units")
+    else:
+        plan = ValidationPlan(required_columns, DEFAULT_MEANS)
+    df_ready = plan.apply(df, passthrough=['Hazardous'], other_keys=other_keys)
 
     print("Input data validated successfully.")
     return df_ready